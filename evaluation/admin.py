@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Instructor, Evaluation
+from .models import Instructor, InstructorRating, Evaluation
 
 
 @admin.register(Evaluation)
@@ -15,3 +15,10 @@ class InstructorAdmin(admin.ModelAdmin):
     search_fields = ["name"]
     list_display = ["name", "department"]
     list_filter = ["department"]
+
+
+@admin.register(InstructorRating)
+class InstructorRatingAdmin(admin.ModelAdmin):
+    search_fields = ["instructor__name"]
+    list_display = ["instructor", "count", "overall_float"]
+    ordering = ["-score"]
@@ -0,0 +1,20 @@
+"""
+A django custom command to rebuild the `InstructorRating` summaries,
+e.g., after evaluations were changed bypassing their signals.
+"""
+
+from django.core.management.base import BaseCommand
+
+from evaluation.models import InstructorRating
+
+
+class Command(BaseCommand):
+    """a command that recomputes all instructors' ratings from their evaluations"""
+
+    help = "Rebuild the rating summary of every instructor from its evaluations"
+
+    def handle(self, *args, **options):
+        count = InstructorRating.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt the ratings of {count} instructors")
+        )
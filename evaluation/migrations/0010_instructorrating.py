@@ -0,0 +1,83 @@
+# Generated by Django 4.2.16 on 2026-10-18 12:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def build_ratings(apps, schema_editor):
+    """The `InstructorRating.rebuild` of the existing evaluations"""
+
+    Evaluation = apps.get_model("evaluation", "Evaluation")
+    Instructor = apps.get_model("evaluation", "Instructor")
+    InstructorRating = apps.get_model("evaluation", "InstructorRating")
+
+    totals = {
+        row["instructor"]: row
+        for row in Evaluation.objects.values("instructor").annotate(
+            count=models.Count("id"),
+            grading_sum=models.Sum("grading"),
+            teaching_sum=models.Sum("teaching"),
+            personality_sum=models.Sum("personality"),
+        )
+    }
+    ratings = []
+    for pk in Instructor.objects.values_list("pk", flat=True):
+        row = totals.get(pk, {})
+        count = row.get("count", 0)
+        sums = [row.get(f"{c}_sum", 0) for c in ("grading", "teaching", "personality")]
+        # rounded as `Instructor.summarize` did when this was written
+        avgs = [round(s / count) if count else None for s in sums]
+        overall = sum(avgs) / 60 if count else 0
+        ratings.append(
+            InstructorRating(
+                instructor_id=pk,
+                count=count,
+                grading_sum=sums[0],
+                teaching_sum=sums[1],
+                personality_sum=sums[2],
+                grading_avg=avgs[0],
+                teaching_avg=avgs[1],
+                personality_avg=avgs[2],
+                overall=round(overall),
+                overall_float=round(overall, 1),
+                score=sum(sums) / (3 * count) if count else 0,
+            )
+        )
+
+    InstructorRating.objects.bulk_create(ratings, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("evaluation", "0009_alter_instructor_department"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="InstructorRating",
+            fields=[
+                (
+                    "instructor",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="rating",
+                        serialize=False,
+                        to="evaluation.instructor",
+                    ),
+                ),
+                ("count", models.PositiveIntegerField(default=0)),
+                ("grading_sum", models.IntegerField(default=0)),
+                ("teaching_sum", models.IntegerField(default=0)),
+                ("personality_sum", models.IntegerField(default=0)),
+                ("grading_avg", models.IntegerField(default=None, null=True)),
+                ("teaching_avg", models.IntegerField(default=None, null=True)),
+                ("personality_avg", models.IntegerField(default=None, null=True)),
+                ("overall", models.IntegerField(default=0)),
+                ("overall_float", models.FloatField(default=0)),
+                ("score", models.FloatField(db_index=True, default=0)),
+            ],
+        ),
+        migrations.RunPython(build_ratings, migrations.RunPython.noop),
+    ]
@@ -1,11 +1,30 @@
 from os import name
-from django.db import models
-from django.db.models import Avg, UniqueConstraint
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models import Count, Sum, UniqueConstraint
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
 from django.contrib.auth.models import User
 from django.utils.translation import gettext as _
 from data import DepartmentEnum
 from cloudinary.models import CloudinaryField
 from django_choices_field import TextChoicesField
+from notifier.models import Revision
+
+# the cache & `Revision` key of the evaluated instructors' global IDs,
+# see `evaluation.schema`
+EVALUATED_INSTRUCTORS = "evaluated_instructors"
+
+
+def bump_evaluated() -> None:
+    """Once committed, tell every process the evaluated instructors changed."""
+
+    def bump():
+        Revision.bump(EVALUATED_INSTRUCTORS)
+        cache.delete(EVALUATED_INSTRUCTORS)
+
+    transaction.on_commit(bump)
+
 
 class Instructor(models.Model):
     """
@@ -24,13 +43,18 @@ class Instructor(models.Model):
     )
 
     def avg(self):
-        """Uses the Aggregation function `Avg` to find the avg values for each criterion."""
+        """The avg values for each criterion, from its `InstructorRating`."""
+
+        try:
+            return self.rating.as_avg()
+        except InstructorRating.DoesNotExist:
+            return InstructorRating().as_avg()
+
+    @staticmethod
+    def summarize(result):
+        """Rounds the `<criterion>__avg` values in `result`, and adds
+        the `overall` & `overall_float` of them, as `avg` returns."""
 
-        result = self.evaluation_set.aggregate(
-            Avg("grading"),
-            Avg("teaching"),
-            Avg("personality"),
-        )
         try:
             result["grading__avg"] = round(result["grading__avg"])
             result["teaching__avg"] = round(result["teaching__avg"])
@@ -101,7 +125,208 @@ class Evaluation(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     instructor = models.ForeignKey(Instructor, on_delete=models.CASCADE)
 
+    def save(self, *args, **kwargs):
+        # with its `InstructorRating` update, see `update_rating`
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            return super().delete(*args, **kwargs)
+
     def __str__(self):
         return (
             "user: " + str(self.user.username) + " instructor: " + self.instructor.name
         )
+
+
+class InstructorRating(models.Model):
+    """
+    The summary of all :model:`evaluation.Evaluation` of an instructor,
+    kept up to date on every evaluation write, so reading, sorting by,
+    and listing the ratings never aggregates the evaluations.
+    """
+
+    instructor = models.OneToOneField(
+        Instructor, primary_key=True, on_delete=models.CASCADE, related_name="rating"
+    )
+    count = models.PositiveIntegerField(default=0)
+    grading_sum = models.IntegerField(default=0)
+    teaching_sum = models.IntegerField(default=0)
+    personality_sum = models.IntegerField(default=0)
+
+    # rounded, as `Instructor.avg` returns them
+    grading_avg = models.IntegerField(null=True, default=None)
+    teaching_avg = models.IntegerField(null=True, default=None)
+    personality_avg = models.IntegerField(null=True, default=None)
+    overall = models.IntegerField(default=0)
+    overall_float = models.FloatField(default=0)
+    # the not rounded avg of all criteria, to sort by
+    score = models.FloatField(default=0, db_index=True)
+
+    def compute(self) -> None:
+        """Set the averages from the counts & sums."""
+
+        count = self.count
+        result = Instructor.summarize(
+            {
+                "grading__avg": self.grading_sum / count if count else None,
+                "teaching__avg": self.teaching_sum / count if count else None,
+                "personality__avg": self.personality_sum / count if count else None,
+            }
+        )
+        self.grading_avg = result["grading__avg"]
+        self.teaching_avg = result["teaching__avg"]
+        self.personality_avg = result["personality__avg"]
+        self.overall = result["overall"]
+        self.overall_float = result["overall_float"]
+        self.score = (
+            (self.grading_sum + self.teaching_sum + self.personality_sum) / (3 * count)
+            if count
+            else 0
+        )
+
+    def as_avg(self) -> dict:
+        """The same dict `Instructor.avg` used to aggregate, with the `count`."""
+
+        return {
+            "grading__avg": self.grading_avg,
+            "teaching__avg": self.teaching_avg,
+            "personality__avg": self.personality_avg,
+            "overall": self.overall,
+            "overall_float": self.overall_float,
+            "count": self.count,
+        }
+
+    @classmethod
+    def apply(
+        cls,
+        instructor_id: int,
+        grading: int,
+        teaching: int,
+        personality: int,
+        sign: int,
+    ) -> None:
+        """Add (`sign=1`) or remove (`sign=-1`) an evaluation's values."""
+
+        cls.objects.get_or_create(instructor_id=instructor_id)
+        rating = cls.objects.select_for_update().get(instructor_id=instructor_id)
+        rating.count += sign
+        rating.grading_sum += sign * grading
+        rating.teaching_sum += sign * teaching
+        rating.personality_sum += sign * personality
+        rating.compute()
+        rating.save()
+
+    @classmethod
+    def rebuild(cls) -> int:
+        """Recompute the summaries of all instructors from their evaluations.
+
+        Returns:
+            int: the number of instructors
+        """
+
+        totals = {
+            row["instructor"]: row
+            for row in Evaluation.objects.values("instructor").annotate(
+                count=Count("id"),
+                grading_sum=Sum("grading"),
+                teaching_sum=Sum("teaching"),
+                personality_sum=Sum("personality"),
+            )
+        }
+        ratings = []
+        for pk in Instructor.objects.values_list("pk", flat=True):
+            row = totals.get(pk, {})
+            rating = cls(
+                instructor_id=pk,
+                count=row.get("count", 0),
+                grading_sum=row.get("grading_sum", 0),
+                teaching_sum=row.get("teaching_sum", 0),
+                personality_sum=row.get("personality_sum", 0),
+            )
+            rating.compute()
+            ratings.append(rating)
+
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(ratings, batch_size=1000)
+            bump_evaluated()
+
+        return len(ratings)
+
+    def __str__(self):
+        return f"{self.instructor_id} - {self.overall_float}"
+
+
+@receiver(pre_save, sender=Evaluation)
+def remember_rating(sender, instance, **kwargs):
+    """Keep the values an updated evaluation had, for `update_rating`."""
+
+    instance._rated = (
+        Evaluation.objects.filter(pk=instance.pk)
+        .values_list("instructor_id", "grading", "teaching", "personality")
+        .first()
+        if instance.pk
+        else None
+    )
+
+
+@receiver(post_save, sender=Evaluation)
+@receiver(post_delete, sender=Evaluation)
+def update_rating(sender, instance, **kwargs):
+    """Apply an evaluation's write to its `InstructorRating`,
+    within the transaction of the write."""
+
+    if isinstance(kwargs.get("origin"), Instructor):
+        # deleted with its instructor, and its rating
+        return
+
+    with transaction.atomic():
+        if kwargs.get("signal") is post_delete:
+            previous, current = (
+                (
+                    instance.instructor_id,
+                    instance.grading,
+                    instance.teaching,
+                    instance.personality,
+                ),
+                None,
+            )
+        else:
+            previous = getattr(instance, "_rated", None)
+            current = (
+                instance.instructor_id,
+                instance.grading,
+                instance.teaching,
+                instance.personality,
+            )
+
+        if previous:
+            InstructorRating.apply(*previous, sign=-1)
+        if current:
+            InstructorRating.apply(*current, sign=1)
+
+
+@receiver(post_save, sender=Evaluation)
+@receiver(post_delete, sender=Evaluation)
+def invalidate_evaluated(sender, instance, **kwargs):
+    """Forget the evaluated instructors once an evaluation is created,
+    deleted, or moved to another instructor."""
+
+    previous = getattr(instance, "_rated", None)
+    if (
+        kwargs.get("created") is False
+        and previous
+        and previous[0] == instance.instructor_id
+    ):
+        return
+
+    bump_evaluated()
+
+
+@receiver(post_save, sender=Instructor)
+def create_rating(sender, instance, created, **kwargs):
+    if created:
+        # by id, not to cache a `rating` on the instance that evaluations outdate
+        InstructorRating.objects.get_or_create(instructor_id=instance.pk)
@@ -1,20 +1,25 @@
-from typing import List, Optional, Iterable, Type
+import time
+from typing import Dict, List, Optional, Iterable, Type
 from base64 import b64encode
+from hashlib import sha1
 
 import strawberry
 import strawberry.django
 from strawberry import ID, relay
 from strawberry.types.info import Info
-from django.db.models import Avg, Count
+from django.core.cache import cache
+from django.db.models.functions import Coalesce
 from strawberry_django.permissions import IsAuthenticated
 
 from data import DepartmentEnum
-from .models import Evaluation, Instructor
+from notifier.models import Revision
+from .models import EVALUATED_INSTRUCTORS, Evaluation, Instructor, InstructorRating
 from .types import (
     PkInput,
     OwnsObjPerm,
     MatchIdentity,
     InstructorNode,
+    InstructorConnection,
     EvaluationType,
     EvaluationInput,
     InstructorFilter,
@@ -22,6 +27,14 @@ from .types import (
 )
 
 
+EVALUATED_TTL = 60 * 10
+# seconds between two reads of the `Revision` stamp
+EVALUATED_CHECK_EVERY = 1.0
+
+_revision = None
+_checked_on = 0.0
+
+
 def resolve_department_list(root, info: Info, short: bool = True) -> List[str]:
     dep_short: List[str] = []
     dep_long: List[str] = []
@@ -45,12 +58,49 @@ def crete_global_id(cls: Type[strawberry.relay.Node], id: int | str) -> str:
     return b64encode(bytes(f"{cls.__name__}:{id}", "utf-8")).decode()
 
 
+def evaluated_revision() -> int:
+    """The `Revision` stamp of the evaluated instructors, read at most
+    once every `EVALUATED_CHECK_EVERY` seconds."""
+
+    global _revision, _checked_on
+
+    if _revision is None or time.monotonic() - _checked_on >= EVALUATED_CHECK_EVERY:
+        _revision = Revision.current(EVALUATED_INSTRUCTORS)
+        _checked_on = time.monotonic()
+
+    return _revision
+
+
+def evaluated_instructors() -> Dict:
+    """The global IDs of the instructors having evaluations, with their `version`,
+    a hash of them. Cached until an evaluation is created or deleted."""
+
+    revision = evaluated_revision()
+    evaluated = cache.get(EVALUATED_INSTRUCTORS)
+    # the stamp is in the DB, so a per-process cache notices other processes' writes
+    if evaluated is None or evaluated["revision"] != revision:
+        ids = [
+            crete_global_id(InstructorNode, pk)
+            for pk in InstructorRating.objects.filter(count__gt=0)
+            .order_by("pk")
+            .values_list("instructor_id", flat=True)
+        ]
+        evaluated = {
+            "ids": ids,
+            "version": sha1("\n".join(ids).encode()).hexdigest()[:16],
+            "revision": revision,
+        }
+        cache.set(EVALUATED_INSTRUCTORS, evaluated, EVALUATED_TTL)
+
+    return evaluated
+
+
 def resolve_evaluated_instructors(root, info: Info) -> List[str]:
-    ids: List[str] = []
-    for i in Instructor.objects.all():
-        if i.evaluation_set.exists():
-            ids.append(crete_global_id(InstructorNode, i.pk))
-    return ids
+    return evaluated_instructors()["ids"]
+
+
+def resolve_evaluated_instructors_version(root, info: Info) -> str:
+    return evaluated_instructors()["version"]
 
 
 @strawberry.type
@@ -64,24 +114,18 @@ class Query:
 
     instructor: Optional[InstructorNode] = relay.node()
 
-    @relay.connection(
-        strawberry.django.relay.ListConnectionWithTotalCount[InstructorNode]
-    )
+    @relay.connection(InstructorConnection)
     def instructors(self, data: InstructorFilter) -> Iterable[Instructor]:
         filters = {"name__icontains": data.name} | (
             {"department": data.department} if data.department else {}
         )
 
+        # sorted by the kept `InstructorRating`, not aggregating the evaluations
         sorted_by_overall = (
             Instructor.objects.filter(**filters)
             .alias(
-                count=Count("evaluation"),
-                overall=(
-                    Avg("evaluation__grading", default=0)
-                    + Avg("evaluation__teaching", default=0)
-                    + Avg("evaluation__personality", default=0)
-                )
-                / 3,
+                count=Coalesce("rating__count", 0),
+                overall=Coalesce("rating__score", 0.0),
             )
             .order_by("-overall", "-count")
         )
@@ -92,6 +136,10 @@ class Query:
     evaluated_instructors: List[str] = strawberry.field(
         resolver=resolve_evaluated_instructors
     )
+    # changes only with `evaluated_instructors`, to skip refetching it
+    evaluated_instructors_version: str = strawberry.field(
+        resolver=resolve_evaluated_instructors_version
+    )
     has_evaluated = strawberry.django.field(
         resolver=resolve_has_evaluated, extensions=[IsAuthenticated()]
     )
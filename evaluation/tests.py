@@ -11,9 +11,18 @@ This module is to test all possible use cases of the `account` app.
 """
 
 
+from unittest import mock
+
+from django.core.cache import cache
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 
+from notifier.models import Revision
+from . import schema
+from .loaders import RatingsLoader
+from .models import EVALUATED_INSTRUCTORS, Evaluation, Instructor, InstructorRating
+from .schema import evaluated_instructors
+
 User = get_user_model()
 
 
@@ -43,3 +52,148 @@ class InstructorTestCase(UserTestCase):
     def test_create_instructor(self) -> None:
         """Test create an instance of `Instructor`"""
         self.assertIsNotNone(self.user)
+
+
+class RatingsLoaderTestCase(UserTestCase):
+    """
+    To test loading the ratings of many instructors at once.
+    """
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.rated, self.unrated = (
+            Instructor.objects.create(name=name, department="ICS")
+            for name in ("Ahmad Alharbi", "Sara Alqahtani")
+        )
+        Evaluation.objects.create(
+            user=self.user,
+            instructor=self.rated,
+            grading=100,
+            teaching=80,
+            personality=60,
+        )
+
+    def test_prime(self) -> None:
+        loader = RatingsLoader()
+        with self.assertNumQueries(1):
+            loader.prime([self.rated.pk, self.unrated.pk])
+
+        with self.assertNumQueries(0):
+            rated = loader.load(self.rated.pk)
+            unrated = loader.load(self.unrated.pk)
+
+        self.assertEqual(rated["count"], 1)
+        self.assertEqual(rated["overall_float"], self.rated.avg()["overall_float"])
+        self.assertEqual(unrated["count"], 0)
+        self.assertEqual(unrated["overall"], 0)
+
+
+class InstructorRatingTestCase(UserTestCase):
+    """
+    To test keeping the `InstructorRating` on evaluations' writes.
+    """
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.instructor = Instructor.objects.create(name="Ahmad", department="ICS")
+
+    def rating(self) -> InstructorRating:
+        return InstructorRating.objects.get(instructor=self.instructor)
+
+    def test_create_update_delete(self) -> None:
+        self.assertEqual(self.rating().count, 0)
+
+        evaluation = Evaluation.objects.create(
+            user=self.user,
+            instructor=self.instructor,
+            grading=100,
+            teaching=80,
+            personality=60,
+        )
+        rating = self.rating()
+        self.assertEqual(
+            (rating.count, rating.grading_avg, rating.overall), (1, 100, 4)
+        )
+        self.assertEqual(rating.score, 80)
+
+        evaluation.grading = 40
+        evaluation.save()
+        rating = self.rating()
+        self.assertEqual((rating.count, rating.grading_sum), (1, 40))
+        self.assertEqual(rating.score, 60)
+
+        evaluation.delete()
+        rating = self.rating()
+        self.assertEqual((rating.count, rating.grading_sum, rating.score), (0, 0, 0))
+        self.assertEqual(self.instructor.avg()["overall"], 0)
+
+    def test_rebuild(self) -> None:
+        Evaluation.objects.create(
+            user=self.user,
+            instructor=self.instructor,
+            grading=100,
+            teaching=80,
+            personality=60,
+        )
+        kept = self.rating().as_avg()
+        InstructorRating.objects.all().delete()
+
+        self.assertEqual(InstructorRating.rebuild(), 1)
+        self.assertEqual(self.rating().as_avg(), kept)
+
+
+class EvaluatedInstructorsTestCase(UserTestCase):
+    """
+    To test caching the evaluated instructors.
+    """
+
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        schema._revision = None
+        self.instructor = Instructor.objects.create(name="Ahmad", department="ICS")
+
+    def evaluate(self) -> Evaluation:
+        with self.captureOnCommitCallbacks(execute=True):
+            return Evaluation.objects.create(
+                user=self.user,
+                instructor=self.instructor,
+                grading=100,
+                teaching=80,
+                personality=60,
+            )
+
+    def test_cached_until_changed(self) -> None:
+        # the stamp, then the IDs
+        with self.assertNumQueries(2):
+            empty = evaluated_instructors()
+        with self.assertNumQueries(0):
+            self.assertEqual(evaluated_instructors(), empty)
+        self.assertEqual(empty["ids"], [])
+
+        evaluation = self.evaluate()
+        evaluated = evaluated_instructors()
+        self.assertEqual(len(evaluated["ids"]), 1)
+        self.assertNotEqual(evaluated["version"], empty["version"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            evaluation.delete()
+        self.assertEqual(evaluated_instructors()["ids"], empty["ids"])
+        self.assertEqual(evaluated_instructors()["version"], empty["version"])
+
+    def test_changed_elsewhere(self) -> None:
+        empty = evaluated_instructors()
+        # evaluated in another process, whose cache isn't this one
+        Evaluation.objects.create(
+            user=self.user,
+            instructor=self.instructor,
+            grading=100,
+            teaching=80,
+            personality=60,
+        )
+        Revision.bump(EVALUATED_INSTRUCTORS)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(evaluated_instructors(), empty)
+        with mock.patch.object(schema, "EVALUATED_CHECK_EVERY", 0):
+            self.assertEqual(len(evaluated_instructors()["ids"]), 1)
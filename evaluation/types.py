@@ -14,7 +14,9 @@ from strawberry_django.filters import FilterLookup
 from strawberry_django.utils.typing import UserType
 from graphql.type.definition import GraphQLResolveInfo
 from strawberry_django.permissions import DjangoNoPermission, DjangoPermissionExtension
+from strawberry_django.relay import ListConnectionWithTotalCount
 
+from .loaders import ratings_loader
 from .models import Instructor, Evaluation
 
 
@@ -37,35 +39,50 @@ class InstructorNode(relay.Node):
 
     @strawberry.django.field
     def instructor_count(self: Instructor, info: Info) -> str:
-        return Instructor.objects.count()
+        return ratings_loader(info).instructor_count()
 
     @strawberry.django.field
     def profile_pic(self: Instructor, info: Info) -> str:
         return self.profile_pic.url
 
+    # the ratings & counts of the whole page are loaded together,
+    # see `evaluation.loaders`
+
     @strawberry.django.field
     def evaluation_set_count(self: Instructor, info: Info) -> int:
-        return self.evaluation_set.count()
+        return ratings_loader(info).load(self.pk)["count"]
 
     @strawberry.django.field
     def grading_avg(self: Instructor, info) -> float:
-        return self.avg()["grading__avg"] or 0
+        return ratings_loader(info).load(self.pk)["grading__avg"] or 0
 
     @strawberry.django.field
     def teaching_avg(self: Instructor, info) -> float:
-        return self.avg()["teaching__avg"] or 0
+        return ratings_loader(info).load(self.pk)["teaching__avg"] or 0
 
     @strawberry.django.field
     def personality_avg(self: Instructor, info) -> float:
-        return self.avg()["personality__avg"] or 0
+        return ratings_loader(info).load(self.pk)["personality__avg"] or 0
 
     @strawberry.django.field
     def overall(self: Instructor, info) -> int:
-        return self.avg()["overall"]
+        return ratings_loader(info).load(self.pk)["overall"]
 
     @strawberry.django.field
     def overall_float(self: Instructor, info) -> float:
-        return self.avg()["overall_float"]
+        return ratings_loader(info).load(self.pk)["overall_float"]
+
+
+@strawberry.type(name="InstructorNodeListConnectionWithTotalCount")
+class InstructorConnection(ListConnectionWithTotalCount[InstructorNode]):
+    """The same connection, which loads the ratings of its page's nodes at once."""
+
+    @classmethod
+    def resolve_connection(cls, nodes, *, info: Info, **kwargs):
+        connection = super().resolve_connection(nodes, info=info, **kwargs)
+        ratings_loader(info).prime(edge.node.pk for edge in connection.edges)
+
+        return connection
 
 
 @strawberry.django.type(Evaluation)
@@ -221,18 +221,21 @@ class EvaluationUpdateView(UpdateView):
 
     def post(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
         self.object = self.get_object()
-        evaluation = Evaluation.objects.filter(pk=self.object.pk)
+        evaluation = self.object
 
         # get the criterion values, if no star is slected use the old one
         # Note the 5 stars are sotored as 100, calculations is needed
         data = {
-            'grading': int(request.POST.get("rating", evaluation[0].grading//20)) * 20,
-            'teaching': int(request.POST.get("ratingtwo", evaluation[0].teaching//20)) * 20,
-            'personality': int(request.POST.get("ratingthree", evaluation[0].personality//20)) * 20,
+            'grading': int(request.POST.get("rating", evaluation.grading//20)) * 20,
+            'teaching': int(request.POST.get("ratingtwo", evaluation.teaching//20)) * 20,
+            'personality': int(request.POST.get("ratingthree", evaluation.personality//20)) * 20,
             'course': request.POST["course"],
             'comment': request.POST["comment"],
         }        
-        evaluation.update(**data)
+        # saved, not `.update()`, to update its `InstructorRating` too
+        for field, value in data.items():
+            setattr(evaluation, field, value)
+        evaluation.save()
 
         messages.success(request, "Evaluation Was Updated.")
         return redirect(reverse("evaluation:evaluation_list", kwargs={"pk": request.user.pk}))
@@ -3,22 +3,65 @@ Customization of the admin site for `notifier` app.
 """
 
 from django.contrib import admin
+from django.template.response import TemplateResponse
+from django.urls import path
 
-from . import models
+from . import models, scheduler, tracing
 
 admin.site.register(
     [
-        models.NotificationEvent,
         models.Status,
+        models.Cursor,
+        models.Revision,
+        models.Lease,
     ]
 )
 
 
-def repeats(obj: models.Banner) -> str:
-    if obj.scheduler:
-        return abs(obj.scheduler.repeats) - 1
-    else:
-        return "0"
+@admin.register(models.NotificationEvent)
+class NotificationEventAdmin(admin.ModelAdmin):
+    """
+    Custom admin model site for `NotificationEvent` model,
+    with a report of the latency of each stage.
+    """
+
+    change_list_template = "admin/notifier/notificationevent/change_list.html"
+    list_display = ["id", "to", "course", "channel", "success", "delivered_on"]
+    list_filter = [
+        "channel",
+        "success",
+    ]
+    raw_id_fields = ["to", "course"]
+    search_fields = [
+        "to__username",
+    ]
+
+    def get_urls(self):
+        return [
+            path(
+                "report/",
+                self.admin_site.admin_view(self.report_view),
+                name="notifier_notificationevent_report",
+            ),
+            *super().get_urls(),
+        ]
+
+    def report_view(self, request):
+        try:
+            days = max(int(request.GET.get("days", 7)), 1)
+        except ValueError:
+            days = 7
+
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": "Notification latency",
+            "days": days,
+            "rows": tracing.report(days),
+        }
+        return TemplateResponse(
+            request, "admin/notifier/notificationevent/report.html", context
+        )
 
 
 @admin.register(models.BannerEvent)
@@ -27,7 +70,7 @@ class BannerEventAdmin(admin.ModelAdmin):
     Custom admin model site for `BannerEvent` model.
     """
 
-    list_display = ["id", "banner", "term", "created_on"]
+    list_display = ["id", "banner", "term", "time_to_submit", "created_on"]
     list_filter = [
         "term",
     ]
@@ -46,7 +89,7 @@ class BannerAdmin(admin.ModelAdmin):
         "id",
         "user",
         "active",
-        repeats,
+        "checked_on",
         "updated_on",
         "created_on",
     ]
@@ -75,6 +118,30 @@ class TrackingListAdmin(admin.ModelAdmin):
     ]
 
 
+@admin.register(models.RegisterPlan)
+class RegisterPlanAdmin(admin.ModelAdmin):
+    """
+    Custom settings for `RegisterPlan` app in admin site.
+    """
+
+    list_display = [
+        "register_course",
+        "user",
+        "term",
+        "add_crns",
+        "drop_crns",
+        "strategy",
+        "updated_on",
+    ]
+    list_filter = [
+        "strategy",
+    ]
+    raw_id_fields = ["register_course", "user", "course"]
+    search_fields = [
+        "user__username",
+    ]
+
+
 @admin.register(models.RegisterCourse)
 class RegisterCourseAdmin(admin.ModelAdmin):
     """
@@ -117,19 +184,36 @@ class CacheAdmin(admin.ModelAdmin):
         "term",
         "department",
         "updated_on",
+        "changed_on",
         "stale",
         valid,
+        "refresh_interval",
+        "churn",
+        "refresh_reason",
     ]
     list_filter = [
         "term",
         "department",
     ]
-    actions = ["add_5_seconds", "sub_5_seconds", "make_stale_false"]
+    readonly_fields = [
+        "refresh_interval",
+        "refresh_reason",
+        "churn",
+        "digest",
+        "changed_on",
+    ]
+    actions = ["add_5_seconds", "sub_5_seconds", "make_stale_false", "plan_refresh"]
 
     def make_stale_false(self, request, queryset):
         """Toggle the value of `stale` field"""
         queryset.update(stale=False)
 
+    @admin.action(description="Re-plan refresh intervals of all cache items")
+    def plan_refresh(self, request, queryset):
+        """Run `scheduler.plan` now instead of waiting for the notifier"""
+        count = scheduler.plan()
+        self.message_user(request, f"Planned {count} cache items.")
+
     def add_5_seconds(self, request, queryset):
         """add 5 to `swr` & age"""
         for q in queryset:
@@ -145,6 +229,30 @@ class CacheAdmin(admin.ModelAdmin):
             q.save()
 
 
+@admin.register(models.CatalogChange)
+class CatalogChangeAdmin(admin.ModelAdmin):
+    """
+    Custom settings for `CatalogChange` model in admin site.
+    """
+
+    list_display = [
+        "id",
+        "kind",
+        "crn",
+        "term",
+        "department",
+        "seats_available",
+        "wait_available",
+        "created_on",
+    ]
+    list_filter = [
+        "kind",
+        "term",
+        "department",
+    ]
+    search_fields = ["crn"]
+
+
 @admin.register(models.Course)
 class CourseAdmin(admin.ModelAdmin):
     """
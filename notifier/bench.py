@@ -0,0 +1,39 @@
+"""
+Helpers shared by the notifier benchmark commands.
+
+The benchmarks write synthetic data, so they run against a throw-away
+test database, and swap `banner_api` for a local fake.
+"""
+
+from contextlib import contextmanager
+from typing import Iterator
+
+from django.db import connections
+
+from . import utils
+
+
+@contextmanager
+def isolated_database(alias: str = "default") -> Iterator[None]:
+    """Create a fresh test database for the duration of the block,
+    the same way `manage.py test` does, then destroy it."""
+
+    connection = connections[alias]
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+@contextmanager
+def patched_banner_api(api) -> Iterator[None]:
+    """Make `notifier.utils` use `api` instead of `banner_api`."""
+
+    original = utils.banner_api
+    utils.banner_api = api
+    try:
+        yield
+    finally:
+        utils.banner_api = original
@@ -0,0 +1,229 @@
+"""
+An in-process catalog of the sections stored in `Cache` rows.
+
+Every (term, department) payload is decoded once and indexed by CRN
+and by `subjectCourse`, so looking up a section is a dict access
+instead of a scan over the whole department list.
+The index is rebuilt only when `Cache.version` moves,
+so refreshes which returned the same data don't rebuild it.
+
+The words of each section are indexed too, on the first `search`,
+so a search over one department or a whole term is a few bisects
+per department instead of decoding and scanning all the payloads.
+"""
+
+import html
+import re
+import threading
+from bisect import bisect_left
+from datetime import datetime
+from typing import Dict, Iterable, List, Set, Tuple
+
+from . import storage
+from .models import Cache, CatalogChange
+
+
+class DepartmentIndex:
+    """
+    The sections of one (term, department), as returned from the API,
+    with two indexes pointing into them:
+        - `by_crn`: `courseReferenceNumber` -> position
+        - `by_course`: `subjectCourse` -> positions
+
+    and, once searched, the sorted `words` of the sections, see `search`.
+
+    The section dicts are shared between callers, treat them as read-only.
+    """
+
+    __slots__ = ("version", "sections", "by_crn", "by_course", "words", "postings")
+
+    def __init__(self, sections: List[Dict], version: datetime) -> None:
+        self.version = version
+        self.sections: Tuple[Dict, ...] = tuple(sections)
+        self.by_crn: Dict[str, int] = {}
+        by_course: Dict[str, List[int]] = {}
+
+        for i, section in enumerate(self.sections):
+            self.by_crn[section["courseReferenceNumber"]] = i
+            by_course.setdefault(section["subjectCourse"], []).append(i)
+
+        self.by_course: Dict[str, Tuple[int, ...]] = {
+            key: tuple(value) for key, value in by_course.items()
+        }
+        # built by the first `search`, the notifier never needs them
+        self.words: List[str] | None = None
+        self.postings: Dict[str, Tuple[int, ...]] = {}
+
+    def _index_words(self) -> None:
+        postings: Dict[str, Set[int]] = {}
+        for i, section in enumerate(self.sections):
+            for word in section_words(section):
+                postings.setdefault(word, set()).add(i)
+
+        self.postings = {word: tuple(sorted(pos)) for word, pos in postings.items()}
+        self.words = sorted(self.postings)
+
+    def search(self, query: str) -> List[Dict]:
+        """The sections having, for each word of `query`, a word starting
+        with it, case-insensitive, in their `subjectCourse`, `courseTitle`,
+        CRN, or instructors' names. All sections if `query` has no words.
+        """
+
+        terms = tokenize(query)
+        if not terms:
+            return list(self.sections)
+
+        if self.words is None:
+            self._index_words()
+
+        found: Set[int] | None = None
+        for term in terms:
+            matches = set()
+            i = bisect_left(self.words, term)
+            while i < len(self.words) and self.words[i].startswith(term):
+                matches.update(self.postings[self.words[i]])
+                i += 1
+
+            found = matches if found is None else found & matches
+            if not found:
+                return []
+
+        return [self.sections[i] for i in sorted(found)]
+
+    def get(self, crn: str) -> Dict:
+        """The section with this `crn`, or an empty dict."""
+
+        try:
+            return self.sections[self.by_crn[crn]]
+        except KeyError:
+            return {}
+
+    def of_course(self, subject_course: str) -> List[Dict]:
+        """All sections of a course, e.g., `ICS104`."""
+
+        return [self.sections[i] for i in self.by_course.get(subject_course, ())]
+
+    def __len__(self) -> int:
+        return len(self.sections)
+
+
+_WORD = re.compile(r"[a-z0-9]+")
+_PART = re.compile(r"[a-z]+|[0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """The lowercase alphanumeric words of `text`"""
+
+    return _WORD.findall(html.unescape(text).lower())
+
+
+def section_words(section: Dict) -> Set[str]:
+    """The searchable words of a section, where `ICS104` is
+    also split into `ics` and `104`, so either finds it."""
+
+    texts = [
+        section.get("subjectCourse") or "",
+        section.get("courseTitle") or "",
+        section.get("courseReferenceNumber") or "",
+        *(faculty.get("displayName") or "" for faculty in section.get("faculty", ())),
+    ]
+    words = set()
+    for word in tokenize(" ".join(texts)):
+        words.add(word)
+        words.update(_PART.findall(word))
+
+    return words
+
+
+def copy_section(section: Dict) -> Dict:
+    """A copy of an indexed section which callers can modify,
+    e.g., to add the instructors info into its `faculty`."""
+
+    return {
+        **section,
+        "faculty": [dict(faculty) for faculty in section.get("faculty", ())],
+    }
+
+
+def search(objs: Iterable[Cache], query: str) -> List[Dict]:
+    """Copies of the sections matching `query`, see `DepartmentIndex.search`,
+    in the given `Cache` rows, which can be loaded with their data deferred."""
+
+    return [
+        copy_section(section)
+        for obj in objs
+        for section in index_for(obj, full=True).search(query)
+    ]
+
+
+def diff(old: List[Dict], new: List[Dict]) -> List[Tuple[str, str, int, int]]:
+    """Compare two payloads of the same (term, department), by CRN.
+
+    Returns:
+        list: (crn, kind, seatsAvailable, waitAvailable) of each section
+        that changed its seats or waiting list, was added, or was removed,
+        `kind` is one of `CatalogChange.KindEnum`.
+    """
+
+    seats = {
+        section["courseReferenceNumber"]: (
+            section["seatsAvailable"],
+            section["waitAvailable"],
+        )
+        for section in old
+    }
+    changes = []
+
+    for section in new:
+        crn = section["courseReferenceNumber"]
+        current = (section["seatsAvailable"], section["waitAvailable"])
+        previous = seats.pop(crn, None)
+
+        if previous is None:
+            changes.append((crn, CatalogChange.KindEnum.ADDED, *current))
+        elif previous != current:
+            changes.append((crn, CatalogChange.KindEnum.CHANGED, *current))
+
+    for crn, previous in seats.items():
+        changes.append((crn, CatalogChange.KindEnum.REMOVED, *previous))
+
+    return changes
+
+
+_indexes: Dict[Tuple[str, str, bool], DepartmentIndex] = {}
+_lock = threading.Lock()
+
+
+def index_for(obj: Cache, full: bool = False) -> DepartmentIndex:
+    """Return the index of the given `Cache` obj.
+
+    `obj` may be loaded with its data deferred, it's only read
+    when the stored index is older than `obj.version()`.
+
+    With `CACHE_STORAGE=packed` the index has only the projected fields
+    the notifier reads, unless `full`, for the sections served as
+    the API returned them, e.g., to the frontend.
+    """
+
+    full = full and storage.is_packed()
+    key = (obj.term, obj.department, full)
+    index = _indexes.get(key)
+    version = obj.version()
+    if index is not None and index.version == version:
+        return index
+
+    index = DepartmentIndex(obj.full_data() if full else obj.sections(), version)
+    with _lock:
+        current = _indexes.get(key)
+        # another thread might have stored a newer one meanwhile
+        if current is None or current.version <= index.version:
+            _indexes[key] = index
+
+    return index
+
+
+def clear() -> None:
+    """Drop all indexes, mostly useful in tests."""
+
+    with _lock:
+        _indexes.clear()
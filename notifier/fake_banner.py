@@ -0,0 +1,316 @@
+"""
+A local fake of the KFUPM Banner API, for benchmarks and load tests.
+
+- `FakeBannerServer` serves per-term, per-department section payloads
+  in the same shape as the real API, from a background thread.
+  It can inject latency, server errors, API-down answers,
+  timeouts and proxy errors, each with its own rate.
+- `FakeBannerAPI` has the same interface `notifier.utils` uses from
+  `banner_api`, so it can replace it and drive the real fetch path
+  against the fake server.
+"""
+
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import requests as rq
+
+# the response of each fault, except timeouts which never respond
+FAULT_CODES = {"error": 500, "down": 503, "proxy": 407}
+
+DAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+
+def make_section(
+    rnd: random.Random,
+    term: str,
+    department: str,
+    course: int,
+    sequence: int,
+    crn: str | None = None,
+) -> Dict:
+    """A section in the same shape as the API data."""
+
+    crn = crn or f"{rnd.randrange(10_000, 99_999)}"
+    begin = rnd.choice(["0700", "0800", "0900", "1000", "1300", "1400"])
+    schedule_type = rnd.choice(["LEC", "LEC", "LAB"])
+    instructor = f"{rnd.choice(['Ahmad', 'Ali', 'Omar', 'Sara'])} {rnd.choice(['Alharbi', 'Alqahtani', 'Alghamdi'])}"
+
+    return {
+        "id": rnd.randrange(1_000_000),
+        "term": term,
+        "termDesc": f"Term {term}",
+        "courseReferenceNumber": crn,
+        "partOfTerm": "1",
+        "courseNumber": str(course),
+        "subject": department,
+        "subjectDescription": department,
+        "sequenceNumber": f"{sequence:02d}",
+        "campusDescription": "Main",
+        "scheduleTypeDescription": schedule_type,
+        "courseTitle": f"{department} Course {course}",
+        "creditHours": None,
+        "maximumEnrollment": 40,
+        "enrollment": rnd.randrange(0, 40),
+        "seatsAvailable": rnd.randrange(0, 5),
+        "waitCapacity": 10,
+        "waitCount": 0,
+        "waitAvailable": rnd.randrange(0, 10),
+        "openSection": True,
+        "subjectCourse": f"{department}{course}",
+        "faculty": [
+            {
+                "bannerId": str(rnd.randrange(1_000_000)),
+                "courseReferenceNumber": crn,
+                "displayName": instructor,
+                "emailAddress": "instructor@kfupm.edu.sa",
+                "primaryIndicator": True,
+                "term": term,
+            }
+        ],
+        "meetingsFaculty": [
+            {
+                "category": "01",
+                "courseReferenceNumber": crn,
+                "faculty": [],
+                "meetingTime": {
+                    "beginTime": begin,
+                    "endTime": f"{int(begin[:2]) + 1:02d}50",
+                    "building": "22",
+                    "room": str(rnd.randrange(100, 400)),
+                    "meetingScheduleType": schedule_type[:2],
+                    **{day: rnd.random() < 0.4 for day in DAYS},
+                },
+                "term": term,
+            }
+        ],
+        "sectionAttributes": [],
+    }
+
+
+class FakeBanner:
+    """The in-memory state of the fake API:
+    a generated catalog for each (term, department)."""
+
+    def __init__(
+        self,
+        terms: List[str],
+        departments: List[str],
+        sections: int = 100,
+        seed: int = 0,
+        churn: float = 0.0,
+    ) -> None:
+        self.rnd = random.Random(seed)
+        self.lock = threading.Lock()
+        self.catalog: Dict[Tuple[str, str], List[Dict]] = {}
+        self.requests = 0
+        # fraction of a department's sections changing seats on each request
+        self.churn_rate = churn
+
+        per_course = 4
+        for term in terms:
+            # CRNs are unique within a term
+            crns = iter(range(10_000, 99_999))
+            for department in departments:
+                self.catalog[(term, department)] = [
+                    make_section(
+                        self.rnd,
+                        term,
+                        department,
+                        100 + i // per_course,
+                        i % per_course + 1,
+                        crn=str(next(crns)),
+                    )
+                    for i in range(sections)
+                ]
+
+    def sections(self, term: str, department: str) -> List[Dict]:
+        with self.lock:
+            self.requests += 1
+            sections = self.catalog.get((term, department), [])
+            if self.churn_rate:
+                self._churn(sections, self.churn_rate)
+
+            # a copy, so it's serialized outside the lock
+            return [dict(section) for section in sections]
+
+    def _churn(self, sections: List[Dict], rate: float) -> int:
+        changed = 0
+        for section in sections:
+            if self.rnd.random() < rate:
+                seats = self.rnd.randrange(0, 5)
+                section["seatsAvailable"] = seats
+                section["enrollment"] = section["maximumEnrollment"] - seats
+                section["waitAvailable"] = self.rnd.randrange(0, 10)
+                changed += 1
+
+        return changed
+
+    def churn(self, rate: float) -> int:
+        """Change the seats of about `rate` of all sections,
+        returns how many were changed."""
+
+        with self.lock:
+            return sum(
+                self._churn(sections, rate) for sections in self.catalog.values()
+            )
+
+
+class FakeBannerServer:
+    """Serves a `FakeBanner` over HTTP in a background thread,
+    `GET /sections?term=<term>&subject=<department>`.
+
+    Each `/sections` request fails with one of these rates:
+        - `error_rate`: a 500 response.
+        - `down_rate`: a 503 response, what `FakeBannerAPI` reads as API down.
+        - `timeout_rate`: answers after `hang` seconds, past the client timeout.
+        - `proxy_rate`: a 407 response, what `FakeBannerAPI` reads as a
+            proxy error.
+    Setting `down` makes every request, `/ping` included, answer 503.
+    The count of each outcome is in `stats`.
+    """
+
+    def __init__(
+        self,
+        banner: FakeBanner,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        down_rate: float = 0.0,
+        timeout_rate: float = 0.0,
+        proxy_rate: float = 0.0,
+        hang: float = 30.0,
+    ) -> None:
+        self.banner = banner
+        self.latency = latency
+        self.faults = (
+            ("error", error_rate),
+            ("down", down_rate),
+            ("timeout", timeout_rate),
+            ("proxy", proxy_rate),
+        )
+        self.hang = hang
+        self.down = False
+        self.rnd = random.Random(banner.rnd.random())
+        self.stats: Dict[str, int] = defaultdict(int)
+        self.stats_lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = {key: value[0] for key, value in parse_qs(url.query).items()}
+
+                if url.path == "/ping":
+                    server.count("ping")
+                    server.respond(
+                        self, 503 if server.down else 200, {"ok": not server.down}
+                    )
+                    return
+
+                if server.latency:
+                    time.sleep(server.latency)
+
+                fault = "down" if server.down else server.pick_fault()
+                if fault == "timeout":
+                    server.count(fault)
+                    time.sleep(server.hang)
+                    return
+
+                if fault:
+                    server.count(fault)
+                    server.respond(self, FAULT_CODES[fault], {})
+                    return
+
+                server.count("ok")
+                server.respond(
+                    self,
+                    200,
+                    server.banner.sections(query.get("term"), query.get("subject")),
+                )
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def pick_fault(self) -> str | None:
+        """The fault of the next request, or None to answer normally."""
+
+        with self.stats_lock:
+            roll = self.rnd.random()
+
+        for name, rate in self.faults:
+            if roll < rate:
+                return name
+            roll -= rate
+
+        return None
+
+    def count(self, outcome: str) -> None:
+        with self.stats_lock:
+            self.stats[outcome] += 1
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @staticmethod
+    def respond(handler: BaseHTTPRequestHandler, code: int, payload) -> None:
+        body = json.dumps(payload).encode()
+        handler.send_response(code)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def __enter__(self) -> "FakeBannerServer":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class FakeBannerAPI:
+    """A drop-in for `notifier.banner_api` pointing to a `FakeBannerServer`,
+    with one keep-alive session shared by all threads."""
+
+    class APIDownException(Exception):
+        """Same as `banner_api.APIDownException`"""
+
+    def __init__(self, url: str, pool_size: int = 32, timeout: float = 10) -> None:
+        self.url = url
+        self.timeout = timeout
+        self.session = rq.Session()
+        adapter = rq.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+
+    def fetch(self, term: str, department: str) -> List[Dict]:
+        res = self.session.get(
+            f"{self.url}/sections",
+            params={"term": term, "subject": department},
+            timeout=self.timeout,
+        )
+        if res.status_code == 503:
+            raise self.APIDownException()
+        if res.status_code == 407:
+            # what `requests` raises when the proxy in front of Banner fails
+            raise rq.exceptions.ProxyError(f"Proxy refused {department}")
+        res.raise_for_status()
+
+        return res.json()
+
+    def test_connection(self) -> bool:
+        return self.session.get(f"{self.url}/ping", timeout=self.timeout).ok
@@ -0,0 +1,164 @@
+"""
+Matching the instructors' names from the API data to our `Instructor`s.
+
+All instructors are loaded once, with their kept `InstructorRating`s,
+into a `NameIndex` of their normalized name words by department.
+It's rebuilt every `REBUILD_EVERY` seconds, and what each displayName
+matched is remembered until then, so enriching a search response
+costs no queries most of the time, instead of two per instructor.
+"""
+
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, FrozenSet, Iterable, List, Set, Tuple
+
+from data import DepartmentEnum, SubjectEnum
+from evaluation.models import Instructor, InstructorRating
+from evaluation.schema import crete_global_id
+from evaluation.types import InstructorNode
+
+REBUILD_EVERY = 60 * 5
+
+# ignored words of the names, e.g., `Dr. Ahmad`
+HONORIFICS = frozenset({"dr", "mr", "mrs", "ms", "prof", "eng"})
+
+# the subjects taught by a department of another name
+SUBJECT_DEPARTMENTS: Dict[str, str] = {
+    SubjectEnum.ACCT: DepartmentEnum.ACFN,
+    SubjectEnum.MKT: DepartmentEnum.ACFN,
+    SubjectEnum.BUS: DepartmentEnum.ACFN,
+    SubjectEnum.ECON: DepartmentEnum.ACFN,
+    SubjectEnum.MIS: DepartmentEnum.ISOM,
+    SubjectEnum.OM: DepartmentEnum.ISOM,
+    SubjectEnum.ENGL: DepartmentEnum.ELD,
+    SubjectEnum.CGS: DepartmentEnum.ELD,
+    SubjectEnum.SWE: DepartmentEnum.ICS,
+    SubjectEnum.STAT: DepartmentEnum.MATH,
+    SubjectEnum.ISE: DepartmentEnum.SE,
+    SubjectEnum.GEOL: DepartmentEnum.ERTH,
+    SubjectEnum.GEOP: DepartmentEnum.CPG,
+}
+
+_WORD = re.compile(r"[^\W\d_]+")
+
+
+def name_words(name: str) -> FrozenSet[str]:
+    """The lowercase words of a name, without honorifics"""
+
+    return frozenset(
+        word for word in _WORD.findall(name.lower()) if word not in HONORIFICS
+    )
+
+
+def department_of(subject: str) -> str:
+    return SUBJECT_DEPARTMENTS.get(subject, subject)
+
+
+class NameIndex:
+    """All instructors by department, as the info `match` returns,
+    with their names' words."""
+
+    def __init__(self) -> None:
+        ratings = dict(
+            InstructorRating.objects.values_list("instructor_id", "overall_float")
+        )
+
+        # department -> [(name, words, info)]
+        self.instructors: Dict[str, List[Tuple[str, FrozenSet[str], Dict]]] = (
+            defaultdict(list)
+        )
+        # (department, word) -> positions in `instructors[department]`
+        self.by_word: Dict[Tuple[str, str], Set[int]] = defaultdict(set)
+
+        for instructor in Instructor.objects.only(
+            "pk", "name", "department", "profile_pic"
+        ):
+            department = str(instructor.department)
+            words = name_words(instructor.name)
+            for word in words:
+                self.by_word[(department, word)].add(len(self.instructors[department]))
+            self.instructors[department].append(
+                (
+                    instructor.name.lower(),
+                    words,
+                    {
+                        "pk": crete_global_id(InstructorNode, instructor.pk),
+                        "profilePic": instructor.profile_pic.url,
+                        "rating": ratings.get(instructor.pk, 0),
+                    },
+                )
+            )
+
+        self.built_on = time.monotonic()
+        self.matches: Dict[Tuple[str, str], Dict] = {}
+
+    def match(self, name: str, department: str) -> Dict:
+        """The info of the only instructor of `department` having all
+        the words of `name`, or an empty dict."""
+
+        key = (name, department)
+        if key in self.matches:
+            return self.matches[key]
+
+        words = name_words(name)
+        instructors = self.instructors.get(department, [])
+        found: Set[int] = set()
+        if words:
+            found = set.intersection(
+                *(self.by_word.get((department, word), set()) for word in words)
+            )
+            if not found:
+                # a word spelled as part of another, as `icontains` matched
+                found = {
+                    i
+                    for i, (full_name, _, _) in enumerate(instructors)
+                    if all(word in full_name for word in words)
+                }
+
+        info = instructors[found.pop()][2] if len(found) == 1 else {}
+        self.matches[key] = info
+
+        return info
+
+
+_index: NameIndex | None = None
+_lock = threading.Lock()
+
+
+def get_index() -> NameIndex:
+    global _index
+
+    with _lock:
+        if _index is None or time.monotonic() - _index.built_on > REBUILD_EVERY:
+            _index = NameIndex()
+        return _index
+
+
+def invalidate() -> None:
+    """Rebuild the index on its next use."""
+
+    global _index
+
+    with _lock:
+        _index = None
+
+
+def match(name: str, subject: str) -> Dict:
+    """The info of the instructor named `name`, who teaches `subject`,
+    `{"pk", "profilePic", "rating"}`, or an empty dict."""
+
+    return get_index().match(name, department_of(subject))
+
+
+def enrich(sections: Iterable[Dict], subject: str | None = None) -> None:
+    """Add the info of each instructor into the `faculty` of the `sections`,
+    of the `subject` if given, otherwise of each section's own."""
+
+    index = get_index()
+    for section in sections:
+        department = department_of(subject or section.get("subject", ""))
+        for faculty in section.get("faculty", ()):
+            if len(faculty.get("displayName") or "") > 1:
+                faculty |= index.match(faculty["displayName"], department)
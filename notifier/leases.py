@@ -0,0 +1,158 @@
+"""
+Splitting the notifier work across many `startnotifier` processes.
+
+The work is partitioned by (term, department), and each partition is
+owned through a `Lease` row that expires unless its owner renews it.
+Every worker also holds a `worker:<owner>` lease, so the live workers
+can be counted and each takes about an equal share of the partitions.
+A crashed worker stops renewing, and its partitions are taken over
+once they expire.
+
+Each partition has its own `Cursor`, and a worker saves it only while
+it still owns the partition (see `ensure_owned`), so a change is never
+consumed, and notified, by two workers.
+"""
+
+import math
+import os
+import random
+import socket
+import uuid
+from typing import Iterable, Set, Tuple
+
+from django.db.models import Q
+from django.utils.timezone import now, timedelta
+
+from .models import Lease
+
+# seconds a lease lasts without a heartbeat
+TTL = int(os.environ.get("NOTIFIER_LEASE_TTL", 60))
+
+WORKER = "worker:"
+PARTITION = "partition:"
+LEADER = "leader"
+
+
+class LeaseLost(Exception):
+    """Raised when a worker no longer owns a partition it's working on."""
+
+
+def make_owner() -> str:
+    """A unique name of this worker process"""
+
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+def partition_key(term: str, department: str) -> str:
+    return f"{PARTITION}{term}-{department}"
+
+
+def _claim(key: str, owner: str) -> bool:
+    """Take the lease `key` if it's free, expired or already ours."""
+
+    stamp = now()
+    expires = stamp + timedelta(seconds=TTL)
+
+    taken = (
+        Lease.objects.filter(key=key)
+        .filter(Q(owner=owner) | Q(expires_on__lt=stamp))
+        .update(owner=owner, expires_on=expires, heartbeat_on=stamp)
+    )
+    if taken:
+        return True
+
+    _, created = Lease.objects.get_or_create(
+        key=key,
+        defaults={"owner": owner, "expires_on": expires, "heartbeat_on": stamp},
+    )
+    return created
+
+
+def _release(owner: str, keys: Iterable[str]) -> None:
+    Lease.objects.filter(key__in=list(keys), owner=owner).update(expires_on=now())
+
+
+def sync(owner: str, partitions: Iterable[Tuple[str, str]]) -> Set[Tuple[str, str]]:
+    """Renew the leases of `owner`, then claim or release partitions
+    to hold its share of all `partitions`.
+
+    Returns:
+        set: the (term, department) it owns now
+    """
+
+    stamp = now()
+    _claim(WORKER + owner, owner)
+    renew(owner)
+
+    keys = {partition_key(*partition): partition for partition in partitions}
+    workers = Lease.objects.filter(key__startswith=WORKER, expires_on__gt=stamp).count()
+    share = math.ceil(len(keys) / max(workers, 1))
+
+    owned = set(
+        Lease.objects.filter(owner=owner, key__startswith=PARTITION).values_list(
+            "key", flat=True
+        )
+    )
+    # partitions nobody tracks anymore
+    _release(owner, owned - keys.keys())
+    owned &= keys.keys()
+
+    if len(owned) > share:
+        # give some back, for the workers that just joined
+        extra = sorted(owned)[share:]
+        _release(owner, extra)
+        owned.difference_update(extra)
+
+    else:
+        held = set(
+            Lease.objects.filter(key__in=list(keys), expires_on__gt=stamp)
+            .exclude(owner=owner)
+            .values_list("key", flat=True)
+        )
+        free = list(keys.keys() - owned - held)
+        # so workers starting together don't race for the same ones
+        random.shuffle(free)
+        for key in free:
+            if len(owned) >= share:
+                break
+            if _claim(key, owner):
+                owned.add(key)
+
+    return {keys[key] for key in owned}
+
+
+def renew(owner: str) -> None:
+    """Extend all the leases `owner` still holds, without claiming any,
+    e.g., while it waits for the API, or after a long `reconcile`."""
+
+    stamp = now()
+    Lease.objects.filter(owner=owner).update(
+        expires_on=stamp + timedelta(seconds=TTL), heartbeat_on=stamp
+    )
+
+
+def is_leader(owner: str) -> bool:
+    """Wether `owner` holds the leader lease, for the work
+    only one worker should do, e.g., `scheduler.plan`."""
+
+    return _claim(LEADER, owner)
+
+
+def ensure_owned(owner: str, partitions: Iterable[Tuple[str, str]]) -> None:
+    """Raise `LeaseLost` unless `owner` still holds all `partitions`.
+    Call it within the transaction saving their cursors."""
+
+    keys = {partition_key(*partition) for partition in partitions}
+    held = set(
+        Lease.objects.select_for_update()
+        .filter(key__in=list(keys), owner=owner, expires_on__gt=now())
+        .values_list("key", flat=True)
+    )
+    if held != keys:
+        raise LeaseLost(f"{owner} lost {sorted(keys - held)}")
+
+
+def release_all(owner: str) -> None:
+    """Let the other workers take over right away, e.g., on shutdown."""
+
+    Lease.objects.filter(owner=owner).update(expires_on=now())
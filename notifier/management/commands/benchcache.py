@@ -0,0 +1,83 @@
+"""
+A django custom command to compare the `Cache` storage formats,
+the `data` JSONField against the packed format of `notifier.storage`.
+"""
+
+import json
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from notifier import storage
+from notifier.fake_banner import make_section
+from notifier.models import Cache
+
+
+class Command(BaseCommand):
+    """a command that measures size and decoding time of each format"""
+
+    help = "Compare row size and decode time of the Cache storage formats"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--term", help="Read a real Cache row of this term")
+        parser.add_argument(
+            "--department", help="Read a real Cache row of this department"
+        )
+        parser.add_argument(
+            "--sections", type=int, default=600, help="Synthetic sections otherwise"
+        )
+        parser.add_argument("--repeat", type=int, default=50)
+
+    def handle(self, *args, **options):
+        if options["term"] and options["department"]:
+            data = Cache.objects.get(
+                term=options["term"], department=options["department"]
+            ).full_data()
+        else:
+            rnd = random.Random(0)
+            data = [
+                make_section(rnd, "202410", "ICS", 100 + i // 4, i % 4 + 1)
+                for i in range(options["sections"])
+            ]
+
+        text = json.dumps(data)
+        packed = storage.pack(storage.project(data))
+        blob = storage.pack(data)
+
+        result = {
+            "sections": len(data),
+            "json_bytes": len(text.encode()),
+            "packed_bytes": len(packed),
+            "blob_bytes": len(blob),
+            # what the JSONField does on every read
+            "json_decode_ms": self.measure(json.loads, text, options["repeat"]),
+            "packed_decode_ms": self.measure(storage.unpack, packed, options["repeat"]),
+            "blob_decode_ms": self.measure(storage.unpack, blob, options["repeat"]),
+        }
+
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT pg_column_size(%s::jsonb), pg_column_size(%s::bytea)",
+                    [text, packed],
+                )
+                result["jsonb_column_bytes"], result["packed_column_bytes"] = (
+                    cursor.fetchone()
+                )
+
+        self.stdout.write(json.dumps(result, indent=2))
+
+    @staticmethod
+    def measure(func, arg, repeat: int) -> float:
+        """Median of `repeat` runs in milliseconds."""
+
+        timings = []
+        for _ in range(repeat):
+            t_start = time.perf_counter()
+            func(arg)
+            timings.append(time.perf_counter() - t_start)
+
+        return round(statistics.median(timings) * 1000, 3)
@@ -0,0 +1,280 @@
+"""
+A django custom command to benchmark the notifier hot path,
+refresh -> consume changes -> group -> enqueue -> send, on synthetic data.
+
+Banner is a local fake server and Telegram a stub, the data lives in a
+throw-away test database, and the result is a JSON report to compare
+between commits, e.g.:
+
+    python manage.py benchnotifier --cycles 10 --output bench.json
+"""
+
+import json
+import resource
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Callable, Dict, List
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from notifier import registry, tracing, utils
+from notifier.bench import isolated_database, patched_banner_api
+from notifier.fake_banner import FakeBanner, FakeBannerAPI, FakeBannerServer
+from notifier.models import (
+    Cache,
+    ChannelEnum,
+    Course,
+    RegisterCourse,
+    Status,
+    StatusEnum,
+    Term,
+    TrackingList,
+)
+from telegram_bot import utils as bot_utils
+from telegram_bot.models import TelegramProfile
+
+User = get_user_model()
+TERM = "202410"
+BATCH = 5000
+
+
+class Command(BaseCommand):
+    """a command that benchmarks the notifier cycle"""
+
+    help = "Benchmark the notifier cycle on synthetic data"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--departments", type=int, default=50)
+        parser.add_argument("--sections", type=int, default=300)
+        parser.add_argument("--users", type=int, default=20_000)
+        parser.add_argument("--register-courses", type=int, default=100_000)
+        parser.add_argument("--cycles", type=int, default=5)
+        parser.add_argument(
+            "--churn",
+            type=float,
+            default=0.05,
+            help="Fraction of sections changing their seats each cycle",
+        )
+        parser.add_argument(
+            "--reconcile",
+            action="store_true",
+            help="Compare all tracked courses each cycle, not only the changed ones",
+        )
+        parser.add_argument(
+            "--send",
+            type=int,
+            default=200,
+            help="Number of `send_notification` tasks to run inline each cycle",
+        )
+        parser.add_argument(
+            "--trace-memory",
+            action="store_true",
+            help="Report each stage's peak memory with tracemalloc, slows it down",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="Write the JSON report to this file")
+
+    def handle(self, *args, **options):
+        departments = registry.SUBJECT_LIST[: options["departments"]]
+        banner = FakeBanner(
+            [TERM], departments, sections=options["sections"], seed=options["seed"]
+        )
+        self.timings: Dict[str, List[float]] = defaultdict(list)
+        self.queries: Dict[str, List[int]] = defaultdict(list)
+        self.memory: Dict[str, int] = defaultdict(int)
+        self.trace_memory = options["trace_memory"]
+        counts = defaultdict(list)
+        sent = []
+
+        def send_telegram_changes(chat_id, msg):
+            sent.append(chat_id)
+            return True
+
+        with isolated_database(), FakeBannerServer(
+            banner
+        ) as server, patched_banner_api(FakeBannerAPI(server.url)), mock.patch.object(
+            bot_utils, "send_telegram_changes", send_telegram_changes
+        ):
+            t_start = time.perf_counter()
+            self.populate(banner, options)
+            setup_time = time.perf_counter() - t_start
+
+            if self.trace_memory:
+                tracemalloc.start()
+
+            for _ in range(options["cycles"]):
+                counts["churned"].append(banner.churn(options["churn"]))
+
+                self.measure(
+                    "refresh",
+                    lambda: [utils.request_data(*pair) for pair in banner.catalog],
+                )
+                if options["reconcile"]:
+                    changed, _, checked = self.measure("reconcile", utils.reconcile)
+                else:
+                    changed, checked = self.measure("consume", utils.consume_changes)
+
+                by_tracker = self.measure(
+                    "group", lambda: utils.group_by_tracker(changed)
+                )
+                self.measure(
+                    "enqueue",
+                    lambda: [
+                        utils.enqueue_notification(tracker_pk, entries)
+                        for tracker_pk, entries in by_tracker.items()
+                    ],
+                )
+                sample = list(by_tracker.items())[: options["send"]]
+                self.measure(
+                    "send",
+                    lambda: [
+                        utils.send_notification(tracker_pk, utils.dump_changes(entries))
+                        for tracker_pk, entries in sample
+                    ],
+                )
+
+                counts["checked"].append(checked)
+                counts["changed"].append(len(changed))
+                counts["trackers"].append(len(by_tracker))
+
+            if self.trace_memory:
+                tracemalloc.stop()
+
+            # while the tables exist, not at exit
+            tracing.flush()
+
+        report = {
+            "scale": {
+                "departments": len(departments),
+                "sections": options["sections"],
+                "users": options["users"],
+                "register_courses": options["register_courses"],
+                "cycles": options["cycles"],
+                "churn": options["churn"],
+                "reconcile": options["reconcile"],
+            },
+            "setup_seconds": round(setup_time, 2),
+            "stages": {
+                stage: {
+                    "p50": round(tracing.percentile(values, 50), 4),
+                    "p99": round(tracing.percentile(values, 99), 4),
+                    "queries": round(sum(self.queries[stage]) / len(values), 1),
+                    **(
+                        {"peak_memory_mb": round(self.memory[stage] / 2**20, 2)}
+                        if self.trace_memory
+                        else {}
+                    ),
+                }
+                for stage, values in self.timings.items()
+            },
+            "per_cycle": {
+                key: round(sum(values) / len(values), 1)
+                for key, values in counts.items()
+            },
+            "telegram_sent": len(sent),
+            # KiB on Linux, bytes on macOS
+            "max_rss_mb": round(
+                resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                / (2**20 if sys.platform == "darwin" else 2**10),
+                1,
+            ),
+        }
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                file.write(output)
+        self.stdout.write(output)
+
+    def measure(self, stage: str, fn: Callable):
+        """Run `fn` and record its duration, queries & peak memory under `stage`."""
+
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+
+        with CaptureQueriesContext(connection) as queries:
+            t_start = time.perf_counter()
+            result = fn()
+            self.timings[stage].append(time.perf_counter() - t_start)
+
+        self.queries[stage].append(len(queries))
+        if self.trace_memory:
+            self.memory[stage] = max(
+                self.memory[stage], tracemalloc.get_traced_memory()[1]
+            )
+
+        return result
+
+    def populate(self, banner: FakeBanner, options: Dict) -> None:
+        """The terms, caches, users and their tracked courses,
+        then a first refresh and reconcile as the baseline."""
+
+        Term.objects.create(long=TERM, short="241", allowed=True)
+        Status.objects.create(key="API", status=StatusEnum.UP)
+        Cache.objects.bulk_create(
+            Cache(term=term, department=department, refresh_interval=10**6)
+            for term, department in banner.catalog
+        )
+        for term, department in banner.catalog:
+            utils.request_data(term, department)
+
+        Course.objects.bulk_create(
+            (
+                Course(
+                    crn=section["courseReferenceNumber"],
+                    term=term,
+                    department=department,
+                    available_seats=section["seatsAvailable"],
+                    waiting_list_count=section["waitAvailable"],
+                    raw=section,
+                )
+                for (term, department), sections in banner.catalog.items()
+                for section in sections
+            ),
+            batch_size=BATCH,
+        )
+        course_pks = list(Course.objects.values_list("pk", flat=True))
+
+        User.objects.bulk_create(
+            (
+                User(username=f"bench-{i}", email=f"bench-{i}@petroly.co")
+                for i in range(options["users"])
+            ),
+            batch_size=BATCH,
+        )
+        user_pks = list(
+            User.objects.filter(username__startswith="bench-").values_list(
+                "pk", flat=True
+            )
+        )
+        TelegramProfile.objects.bulk_create(
+            (TelegramProfile(id=10**9 + pk, user_id=pk) for pk in user_pks),
+            batch_size=BATCH,
+        )
+        TrackingList.objects.bulk_create(
+            (
+                TrackingList(user_id=pk, channels=[ChannelEnum.TELEGRAM])
+                for pk in user_pks
+            ),
+            batch_size=BATCH,
+        )
+        list_pks = list(TrackingList.objects.values_list("pk", flat=True))
+
+        rnd = banner.rnd
+        per_user = max(options["register_courses"] // max(len(list_pks), 1), 1)
+        RegisterCourse.objects.bulk_create(
+            (
+                RegisterCourse(tracking_list_id=list_pk, course_id=course_pk)
+                for list_pk in list_pks
+                for course_pk in rnd.sample(course_pks, min(per_user, len(course_pks)))
+            ),
+            batch_size=BATCH,
+        )
+
+        utils.reconcile()
@@ -0,0 +1,121 @@
+"""
+A django custom command to benchmark refreshing a full term,
+with the `request_data` tasks against the async refresher,
+both served by a local fake Banner server.
+
+The concurrent writes need Postgres, SQLite locks its tables under them,
+so on SQLite both run one department at a time.
+"""
+
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils.timezone import now, timedelta
+
+from data import SubjectEnum
+from notifier import refresher
+from notifier.bench import isolated_database, patched_banner_api
+from notifier.fake_banner import FakeBanner, FakeBannerAPI, FakeBannerServer
+from notifier.models import Cache, Status, StatusEnum, Term
+
+TERM = "202410"
+
+
+class Command(BaseCommand):
+    """a command that benchmarks a full-term refresh"""
+
+    help = "Benchmark a full-term Cache refresh against a fake Banner server"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--departments", type=int, default=len(SubjectEnum.values))
+        parser.add_argument("--sections", type=int, default=300)
+        parser.add_argument(
+            "--latency", type=float, default=0.5, help="Seconds per API response"
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.Q_CLUSTER["workers"],
+            help="Q_CLUSTER workers running the `request_data` tasks",
+        )
+        parser.add_argument("--concurrency", type=int, default=16)
+
+    def handle(self, *args, **options):
+        if connection.vendor == "sqlite" and (
+            options["concurrency"] > 1 or options["workers"] > 1
+        ):
+            self.stderr.write(
+                "SQLite can't write concurrently, running with one worker "
+                "and a concurrency of 1, set DATABASE_URL to a Postgres database."
+            )
+            options["concurrency"] = options["workers"] = 1
+
+        departments = SubjectEnum.values[: options["departments"]]
+        pairs = [(TERM, department) for department in departments]
+        banner = FakeBanner([TERM], departments, sections=options["sections"])
+
+        with isolated_database(), FakeBannerServer(
+            banner, latency=options["latency"]
+        ) as server, patched_banner_api(
+            FakeBannerAPI(server.url, pool_size=max(options["concurrency"], 1))
+        ):
+            Term.objects.create(long=TERM, short="241", allowed=True)
+            Status.objects.create(key="API", status=StatusEnum.UP)
+            Cache.objects.bulk_create(
+                Cache(term=TERM, department=department) for department in departments
+            )
+
+            self.expire()
+            t_start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+                # each django_q worker runs one task at a time
+                list(
+                    executor.map(
+                        lambda pair: refresher._refresh_one(*pair),
+                        pairs,
+                    )
+                )
+            tasks_time = time.perf_counter() - t_start
+            self.check_refreshed(len(pairs))
+
+            self.expire()
+            t_start = time.perf_counter()
+            asyncio.run(refresher.refresh(pairs, options["concurrency"]))
+            refresher_time = time.perf_counter() - t_start
+            self.check_refreshed(len(pairs))
+
+        result = {
+            "departments": len(pairs),
+            "sections": options["sections"],
+            "latency": options["latency"],
+            "workers": options["workers"],
+            "concurrency": options["concurrency"],
+            "tasks_seconds": round(tasks_time, 4),
+            "refresher_seconds": round(refresher_time, 4),
+            "speedup": round(tasks_time / refresher_time, 2),
+        }
+        self.stdout.write(json.dumps(result, indent=2))
+
+    @staticmethod
+    def expire():
+        # as never fetched, so both runs fetch, decode and store every department
+        Cache.objects.update(
+            updated_on=now() - timedelta(days=1),
+            data=[],
+            digest="",
+            changed_on=None,
+            packed=None,
+            blob=None,
+        )
+
+    @staticmethod
+    def check_refreshed(count: int):
+        refreshed = Cache.objects.filter(
+            updated_on__gte=now() - timedelta(hours=1)
+        ).count()
+        assert refreshed == count, f"Only {refreshed} of {count} were refreshed"
@@ -0,0 +1,146 @@
+"""
+A django custom command to load test the fetch path, `request_data`
+through the async refresher, against a faulty fake Banner server.
+
+It reports the refresh throughput, how each fault was handled,
+how often the API was marked down, and how fresh the cache stayed.
+"""
+
+import json
+import time
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.utils.timezone import now
+
+from notifier import refresher, registry
+from notifier.bench import isolated_database, patched_banner_api
+from notifier.fake_banner import FakeBanner, FakeBannerAPI, FakeBannerServer
+from notifier.models import Cache, Status, StatusEnum, Term
+from notifier.tracing import percentile
+
+TERM = "202410"
+
+
+class Command(BaseCommand):
+    """a command that load tests refreshing the cache"""
+
+    help = "Load test the Cache refresh against a faulty fake Banner server"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--departments", type=int, default=50)
+        parser.add_argument("--sections", type=int, default=300)
+        parser.add_argument("--duration", type=float, default=60, help="Seconds")
+        parser.add_argument(
+            "--age", type=int, default=10, help="Seconds each row stays valid"
+        )
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument("--latency", type=float, default=0.2)
+        parser.add_argument("--error-rate", type=float, default=0.02)
+        parser.add_argument("--down-rate", type=float, default=0.0)
+        parser.add_argument("--timeout-rate", type=float, default=0.01)
+        parser.add_argument("--proxy-rate", type=float, default=0.0)
+        parser.add_argument(
+            "--client-timeout", type=float, default=2, help="Seconds per API request"
+        )
+        parser.add_argument("--churn", type=float, default=0.05)
+        parser.add_argument("--output", help="Write the JSON report to this file")
+
+    def handle(self, *args, **options):
+        departments = registry.SUBJECT_LIST[: options["departments"]]
+        banner = FakeBanner(
+            [TERM], departments, sections=options["sections"], churn=options["churn"]
+        )
+        server = FakeBannerServer(
+            banner,
+            latency=options["latency"],
+            error_rate=options["error_rate"],
+            down_rate=options["down_rate"],
+            timeout_rate=options["timeout_rate"],
+            proxy_rate=options["proxy_rate"],
+            hang=options["client_timeout"] * 3,
+        )
+        api = FakeBannerAPI(
+            server.url,
+            pool_size=max(options["concurrency"], 1),
+            timeout=options["client_timeout"],
+        )
+        ages = []
+        valid = []
+        counts = defaultdict(int)
+
+        with isolated_database(), server, patched_banner_api(api):
+            Term.objects.create(long=TERM, short="241", allowed=True)
+            Status.objects.create(key="API", status=StatusEnum.UP)
+            Cache.objects.bulk_create(
+                Cache(term=TERM, department=department, refresh_interval=options["age"])
+                for department in departments
+            )
+
+            t_start = time.perf_counter()
+            while time.perf_counter() - t_start < options["duration"]:
+                counts["rounds"] += 1
+
+                if not Status.is_up("API"):
+                    counts["down_rounds"] += 1
+                    # the same probe `startnotifier` does
+                    if api.test_connection():
+                        api_status = Status.objects.get(key="API")
+                        api_status.status = StatusEnum.UP
+                        api_status.save()
+                    else:
+                        time.sleep(1)
+                    continue
+
+                before = dict(Cache.objects.values_list("pk", "updated_on"))
+                counts["requests"] += len(
+                    refresher.refresh_expired(options["concurrency"])
+                )
+                after = dict(Cache.objects.values_list("pk", "updated_on"))
+                counts["refreshed"] += sum(
+                    1
+                    for pk, updated_on in after.items()
+                    if updated_on != before.get(pk)
+                )
+
+                if not Status.is_up("API"):
+                    counts["marked_down"] += 1
+
+                # freshness of every row after the round
+                stamp = now()
+                for obj in Cache.objects.only("updated_on", "refresh_interval"):
+                    ages.append((stamp - obj.updated_on).total_seconds())
+                    valid.append(obj.is_valid())
+
+                time.sleep(0.5)
+
+            elapsed = time.perf_counter() - t_start
+
+        report = {
+            "departments": len(departments),
+            "sections": options["sections"],
+            "duration_seconds": round(elapsed, 2),
+            "concurrency": options["concurrency"],
+            "faults": {
+                "latency": options["latency"],
+                "error_rate": options["error_rate"],
+                "down_rate": options["down_rate"],
+                "timeout_rate": options["timeout_rate"],
+                "proxy_rate": options["proxy_rate"],
+            },
+            **counts,
+            "refreshes_per_second": round(counts["refreshed"] / elapsed, 2),
+            "server": dict(server.stats),
+            "freshness": {
+                "age_p50": round(percentile(ages, 50), 2) if ages else None,
+                "age_p99": round(percentile(ages, 99), 2) if ages else None,
+                "age_max": round(max(ages), 2) if ages else None,
+                "valid_ratio": round(sum(valid) / len(valid), 3) if valid else None,
+            },
+        }
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                file.write(output)
+        self.stdout.write(output)
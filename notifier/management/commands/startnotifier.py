@@ -15,8 +15,9 @@ from django.utils.timezone import now
 from django_q.tasks import Schedule, async_task
 
 from account.models import Profile
-from notifier import utils
+from notifier import leases, metrics, scheduler, utils, wakeup
 from notifier.models import Status, StatusEnum
+from notifier.registrar import Registrar
 
 warnings.simplefilter("ignore", CacheKeyWarning)
 warnings.simplefilter("ignore", DeprecationWarning)
@@ -24,6 +25,13 @@ warnings.simplefilter("ignore", DeprecationWarning)
 # setting up the logger
 logger = logging.getLogger(__name__)
 
+# seconds between two runs of `scheduler.plan`
+PLAN_EVERY = 60
+# seconds between two full comparisons of all tracked courses
+RECONCILE_EVERY = 60 * 10
+# seconds between two cycles when no refresh signal arrives
+WAIT_AT_MOST = 10
+
 
 class GracefulKiller:
     """To catch SIGINT $ SIGTERM signals
@@ -49,28 +57,31 @@ class Command(BaseCommand):
         and grouped the notification by user
         then send a notification details
 
+        Each cycle consumes the `CatalogChange` log, so only the
+        changed courses are compared, and every `RECONCILE_EVERY`
+        all tracked courses are compared against the cached data.
+        Stage durations and counts go to `notifier.metrics`.
+
+        Many processes can run it, each works only on the
+        (term, department) partitions it holds, see `notifier.leases`.
+
         This method is infinite loop,
         it should be called from a async context.
 
-        return: the structure is
-        {
-            'user1_pk': [
-                    {
-                        'course1': <Course1>,
-                        'status': {
-                            'available_seats': 0
-                            'waiting_list_count': 0
-                            'available_seats_old': 0
-                            'waiting_list_count_old': 0
-                        }
-                    },
-                ], ...
-            'user2_pk': ...,
-        }
+        Each tracker gets one `send_notification` task, with
+        its changed courses as `utils.ChangeEntry` made by `utils.dump_changes`
         """
 
         logger.info("Starting the Notifier Checking")
         killer = GracefulKiller()
+        planned_on = 0.0
+        reconciled_on = 0.0
+        started_on = 0.0
+        owner = leases.make_owner()
+        waiter = wakeup.Waiter()
+        registrar = Registrar()
+        metrics.serve()
+        logger.info("Notifier worker %s", owner)
 
         while not killer.kill_now:
             api_status, status_created = Status.objects.get_or_create(key="API")
@@ -80,6 +91,13 @@ class Command(BaseCommand):
 
             if api_status.status == StatusEnum.DOWN:
                 logger.warning("API is still Down")
+                try:
+                    # keep the partitions, to not hand them to other workers
+                    # which would be waiting for the API as well
+                    leases.renew(owner)
+                except Exception as exc:
+                    logger.error(exc)
+
                 time.sleep(30)
 
                 try:
@@ -97,73 +115,114 @@ class Command(BaseCommand):
                 finally:
                     continue
 
+            cycle_start = time.perf_counter()
+            if started_on:
+                metrics.cycle_lag.set(time.monotonic() - started_on)
+            started_on = time.monotonic()
+
             try:
-                t_start = time.perf_counter()
+                with metrics.stage_seconds.time("leases"):
+                    partitions = leases.sync(owner, scheduler.demand().keys())
+                metrics.partitions_owned.set(len(partitions))
+
+                if time.monotonic() - planned_on > PLAN_EVERY and leases.is_leader(
+                    owner
+                ):
+                    # re-plan each cache item refresh interval
+                    with metrics.stage_seconds.time("plan"):
+                        scheduler.plan()
+                        utils.prune_changes()
+                    planned_on = time.monotonic()
 
-                collection = utils.collect_tracked_courses()
-                changed_courses = []
+                t_start = time.perf_counter()
 
-                logger.info(
-                    "Retrieved tracked courses within %0.4f",
-                    time.perf_counter() - t_start,
-                )
+                if time.monotonic() - reconciled_on > RECONCILE_EVERY:
+                    # compare all tracked courses, not only the changed ones
+                    waiter.clear()
+                    try:
+                        with metrics.stage_seconds.time("reconcile"):
+                            changed_courses, timings, count = utils.reconcile(
+                                partitions=partitions, owner=owner
+                            )
+                    except leases.LeaseLost:
+                        # the new owners reconcile their partitions by themselves
+                        reconciled_on = time.monotonic()
+                        raise
+                    reconciled_on = time.monotonic()
+                    metrics.courses_checked.inc(count, "reconcile")
+
+                    logger.info(
+                        "All courses changes checked within %0.4f",
+                        time.perf_counter() - t_start,
+                    )
+                    logger.info(
+                        "Slowest groups: %s",
+                        ", ".join(
+                            f"{term}-{department} {duration:0.4f}"
+                            for (term, department), duration in sorted(
+                                timings.items(), key=lambda item: item[1], reverse=True
+                            )[:5]
+                        ),
+                    )
+                    for (term, department), duration in timings.items():
+                        logger.debug(
+                            "Group %s-%s checked within %0.4f",
+                            term,
+                            department,
+                            duration,
+                        )
 
-                t_start = time.perf_counter()
-                for _, value in collection.items():
-                    changed, status = utils.check_changes(value["course"])
+                else:
+                    with metrics.stage_seconds.time("refresh"):
+                        utils.refresh_tracked(partitions)
+                    # the changes signaled so far are consumed right below
+                    waiter.clear()
+                    with metrics.stage_seconds.time("consume"):
+                        changed_courses, count = utils.consume_changes(
+                            partitions=partitions, owner=owner
+                        )
+                    metrics.courses_checked.inc(count, "consume")
 
-                    if changed:
-                        value["status"] = status
-                        changed_courses.append(value)
+                    logger.info(
+                        "Consumed %d catalog changes within %0.4f",
+                        count,
+                        time.perf_counter() - t_start,
+                    )
 
-                logger.info(
-                    "Courses changes checked within %0.4f",
-                    time.perf_counter() - t_start,
-                )
+                metrics.changes_detected.inc(len(changed_courses))
+                # the seats may be taken any moment, register before notifying,
+                # but never lose the notifications of the consumed changes
+                try:
+                    with metrics.stage_seconds.time("register"):
+                        registrar.submit(changed_courses)
+                except Exception as exc:
+                    metrics.cycle_errors.inc()
+                    logger.error("Couldn't submit the registration plans: %s", exc)
 
                 t_start = time.perf_counter()
                 # group `changed_courses` by unique trackers
-                courses_by_tracker = {}
-                for c in changed_courses:
-                    for tracker in c["trackers"]:
-                        try:
-                            courses_by_tracker[tracker.pk].append(
-                                {
-                                    "course_pk": c["course"].pk,
-                                    "status": c["status"],
-                                }
-                            )
-                        except KeyError:
-                            courses_by_tracker[tracker.pk] = [
-                                {
-                                    "course_pk": c["course"].pk,
-                                    "status": c["status"],
-                                }
-                            ]
+                courses_by_tracker = utils.group_by_tracker(changed_courses)
 
+                metrics.stage_seconds.observe(time.perf_counter() - t_start, "group")
                 logger.info(
                     "grouped changes within %0.9f",
                     time.perf_counter() - t_start,
                 )
 
                 t_start = time.perf_counter()
-                for tracker_pk, info in courses_by_tracker.items():
+                for tracker_pk, entries in courses_by_tracker.items():
                     # NOTE: Disable delayed mechanisim
-                    async_task(
-                        "notifier.utils.send_notification",
-                        tracker_pk,
-                        str(info),
-                        task_name=f"sending-notification-{tracker_pk}",
-                        group="change_notification",
-                    )
+                    utils.enqueue_notification(tracker_pk, entries)
+                    metrics.notifications_enqueued.inc()
 
                     continue
 
+                    info = utils.dump_changes(entries)
                     if Profile.objects.get(user__pk=tracker_pk).premium:
                         async_task(
                             "notifier.utils.send_notification",
                             tracker_pk,
-                            str(info),
+                            info,
                             task_name=f"sending-notification-{tracker_pk}",
                             group="change_notification",
                         )
@@ -173,7 +232,7 @@ class Command(BaseCommand):
                             name="delayed_notification",
                             func="notifier.utils.send_notification",
                             next_run=now() + timedelta(minutes=1),
-                            args=(tracker_pk, str(info)),
+                            args=(tracker_pk, info),
                             minutes=None,
                             kwargs=None,
                             hook=None,
@@ -183,14 +242,40 @@ class Command(BaseCommand):
                         s.full_clean()
                         s.save()
 
+                metrics.stage_seconds.observe(time.perf_counter() - t_start, "enqueue")
+                stamp = now()
+                for _, info in changed_courses:
+                    # reconciled changes have no stored change to start from
+                    if info.get("stored_on"):
+                        metrics.dispatch_latency.observe(
+                            (stamp - info["stored_on"]).total_seconds()
+                        )
                 logger.info(
                     "Created `sending-notification-` within %0.9f",
                     time.perf_counter() - t_start,
                 )
 
+                metrics.cycle_seconds.observe(time.perf_counter() - cycle_start)
+                metrics.last_success.set(time.time())
+
+            except leases.LeaseLost as exc:
+                # another worker took over, it continues from the saved cursors
+                logger.warning(exc)
+
             except Exception as exc:
+                metrics.cycle_errors.inc()
                 logger.warning(exc)
 
-            time.sleep(10)
+            try:
+                metrics.write()
+            except OSError as exc:
+                logger.warning("Couldn't write the metrics: %s", exc)
+
+            # the timer is a fallback, a stored refresh wakes it up earlier
+            woken = waiter.wait(WAIT_AT_MOST)
+            metrics.wakeups.inc(label="signal" if woken else "timer")
 
+        waiter.close()
+        registrar.close()
+        leases.release_all(owner)
         logger.info("Stopping the Notifier Checking.")
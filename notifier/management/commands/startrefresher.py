@@ -0,0 +1,72 @@
+"""
+A django custom command to start refreshing the `Cache` rows
+concurrently, see `notifier.refresher`.
+"""
+
+import logging
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from notifier import refresher
+from notifier.management.commands.startnotifier import GracefulKiller
+from notifier.models import Status
+
+# setting up the logger
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """a command that get in infinite loop of refreshing"""
+
+    help = "Start refreshing the expired cached data from the API"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=int(os.environ.get("REFRESHER_CONCURRENCY", 8)),
+            help="Max number of in-flight requests to the API",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="Seconds to wait between two sweeps",
+        )
+
+    def handle(self, *args, **options):
+        if not refresher.is_enabled():
+            logger.warning(
+                "`CACHE_REFRESHER` is not `async`, "
+                "`request_data` tasks are still enqueued as well"
+            )
+
+        logger.info("Starting the Cache refresher")
+        killer = GracefulKiller()
+
+        while not killer.kill_now:
+            if not Status.is_up("API"):
+                # `startnotifier` probes the API until it's up again
+                time.sleep(30)
+                continue
+
+            try:
+                t_start = time.perf_counter()
+                timings = refresher.refresh_expired(options["concurrency"])
+
+                if timings:
+                    logger.info(
+                        "Refreshed %d departments within %0.4f, slowest %0.4f",
+                        len(timings),
+                        time.perf_counter() - t_start,
+                        max(timings.values()),
+                    )
+
+            except Exception as exc:
+                logger.warning(exc)
+
+            time.sleep(options["interval"])
+
+        logger.info("Stopping the Cache refresher.")
@@ -0,0 +1,266 @@
+"""
+Minimal Prometheus-format metrics of the notifier pipeline.
+
+Metrics live in this process only, `render` returns them in the
+Prometheus text format, and they're exposed by either or both of:
+    - `NOTIFIER_METRICS_FILE`: a file rewritten after each cycle,
+        e.g., for node_exporter's textfile collector.
+    - `NOTIFIER_METRICS_PORT`: an HTTP endpoint at `/metrics`.
+"""
+
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# seconds, suits stages from a few ms up to a slow reconcile
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+_lock = threading.Lock()
+_metrics: List["Metric"] = []
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels.items()) + "}"
+
+
+class Metric(ABC):
+    """A metric rendered by `render`, unless created with `register=False`"""
+
+    kind = ""
+
+    def __init__(
+        self,
+        name: str,
+        help_: str,
+        label: str | None = None,
+        register: bool = True,
+    ) -> None:
+        self.name = name
+        self.help = help_
+        self.label = label
+        if register:
+            with _lock:
+                _metrics.append(self)
+
+    def _key(self, value: str | None) -> Tuple[Tuple[str, str], ...]:
+        return ((self.label, value),) if self.label else ()
+
+    @abstractmethod
+    def samples(self) -> Iterator[str]:
+        """The lines of its values"""
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """A value that only goes up"""
+
+    kind = "counter"
+
+    def __init__(
+        self,
+        name: str,
+        help_: str,
+        label: str | None = None,
+        register: bool = True,
+    ) -> None:
+        super().__init__(name, help_, label, register)
+        # a counter without labels is reported from 0
+        self.values: Dict[Tuple, float] = {} if label else {(): 0}
+
+    def inc(self, amount: float = 1, label: str | None = None) -> None:
+        key = self._key(label)
+        with _lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self) -> Iterator[str]:
+        for key, value in self.values.items():
+            yield f"{self.name}{_labels(dict(key))} {value}"
+
+
+class Gauge(Metric):
+    """A value that is set, or computed by `fn` when rendered"""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help_: str,
+        fn: Callable[[], float] | None = None,
+        register: bool = True,
+    ) -> None:
+        super().__init__(name, help_, register=register)
+        self.value = 0.0
+        self.fn = fn
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def samples(self) -> Iterator[str]:
+        yield f"{self.name} {self.fn() if self.fn else self.value}"
+
+
+class Histogram(Metric):
+    """Counts of observed values by `BUCKETS`, with their sum"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_: str,
+        label: str | None = None,
+        buckets: Tuple[float, ...] = BUCKETS,
+        register: bool = True,
+    ) -> None:
+        super().__init__(name, help_, label, register)
+        self.buckets = buckets
+        # label's key -> (counts of each bucket & +Inf, sum)
+        self.values: Dict[Tuple, Tuple[List[int], float]] = {}
+
+    def observe(self, value: float, label: str | None = None) -> None:
+        key = self._key(label)
+        with _lock:
+            counts, total = self.values.get(key) or ([0] * (len(self.buckets) + 1), 0)
+            counts[bisect_left(self.buckets, value)] += 1
+            self.values[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, label: str | None = None):
+        """Observe the duration of the `with` block."""
+
+        t_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t_start, label)
+
+    def samples(self) -> Iterator[str]:
+        for key, (counts, total) in self.values.items():
+            labels = dict(key)
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                yield f"{self.name}_bucket{_labels({**labels, 'le': bound})} {cumulative}"
+
+            yield f"{self.name}_sum{_labels(labels)} {total}"
+            yield f"{self.name}_count{_labels(labels)} {cumulative}"
+
+
+def render() -> str:
+    """All metrics of this process in the Prometheus text format"""
+
+    with _lock:
+        metrics = list(_metrics)
+
+    return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+def write(path: str | None = None) -> None:
+    """Write `render` into `path` or `NOTIFIER_METRICS_FILE`, atomically,
+    so a scraper never reads half a file."""
+
+    path = path or os.environ.get("NOTIFIER_METRICS_FILE")
+    if not path:
+        return
+
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as file:
+        file.write(render())
+    os.replace(tmp, path)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+
+        body = render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(port: int | None = None) -> ThreadingHTTPServer | None:
+    """Serve `/metrics` on `port` or `NOTIFIER_METRICS_PORT`
+    from a daemon thread, if any is given."""
+
+    port = port if port is not None else int(os.environ.get("NOTIFIER_METRICS_PORT", 0))
+    if not port:
+        return None
+
+    server = ThreadingHTTPServer(("0.0.0.0", port), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logger.info("Serving metrics on :%d/metrics", server.server_port)
+
+    return server
+
+
+# the notifier pipeline
+stage_seconds = Histogram(
+    "notifier_stage_seconds", "Duration of each stage of a cycle", label="stage"
+)
+cycle_seconds = Histogram("notifier_cycle_seconds", "Duration of a whole cycle")
+cycle_lag = Gauge(
+    "notifier_cycle_lag_seconds",
+    "Seconds between the starts of the last two cycles",
+)
+courses_checked = Counter(
+    "notifier_courses_checked_total",
+    "Tracked courses compared, or changes consumed",
+    label="mode",
+)
+changes_detected = Counter(
+    "notifier_changes_detected_total", "Tracked courses with an increase"
+)
+notifications_enqueued = Counter(
+    "notifier_notifications_enqueued_total", "`send_notification` tasks created"
+)
+cycle_errors = Counter("notifier_cycle_errors_total", "Cycles that raised")
+dispatch_latency = Histogram(
+    "notifier_dispatch_latency_seconds",
+    "Seconds from storing a catalog change to enqueueing its notifications",
+)
+register_seconds = Histogram(
+    "notifier_register_seconds",
+    "Seconds from detecting an opened seat to submitting its registration",
+)
+wakeups = Counter(
+    "notifier_wakeups_total",
+    "Cycles started by a refresh signal or the timer",
+    label="by",
+)
+partitions_owned = Gauge(
+    "notifier_partitions_owned", "(term, department) partitions this worker holds"
+)
+
+last_success = Gauge(
+    "notifier_last_success_timestamp_seconds", "Unix time of the last successful cycle"
+)
+since_last_success = Gauge(
+    "notifier_seconds_since_last_success",
+    "Seconds since the last successful cycle, for alerting",
+    fn=lambda: time.time() - last_success.value if last_success.value else -1,
+)
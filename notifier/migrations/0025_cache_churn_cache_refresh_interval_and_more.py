@@ -0,0 +1,32 @@
+# Generated by Django 4.2.16 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifier", "0024_alter_registercourse_strategy"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cache",
+            name="churn",
+            field=models.FloatField(default=0, verbose_name="churn"),
+        ),
+        migrations.AddField(
+            model_name="cache",
+            name="refresh_interval",
+            field=models.PositiveIntegerField(
+                blank=True, default=None, null=True, verbose_name="refresh interval"
+            ),
+        ),
+        migrations.AddField(
+            model_name="cache",
+            name="refresh_reason",
+            field=models.CharField(
+                blank=True, default="", max_length=200, verbose_name="refresh reason"
+            ),
+        ),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 4.2.16 on 2026-10-18 10:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifier", "0025_cache_churn_cache_refresh_interval_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CatalogChange",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created_on",
+                    models.DateTimeField(auto_now_add=True, verbose_name="created on"),
+                ),
+                ("term", models.CharField(max_length=7, verbose_name="term")),
+                (
+                    "department",
+                    models.CharField(max_length=7, verbose_name="department"),
+                ),
+                ("crn", models.CharField(max_length=5, verbose_name="CRN")),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("changed", "changed"),
+                            ("added", "added"),
+                            ("removed", "removed"),
+                        ],
+                        max_length=7,
+                        verbose_name="kind",
+                    ),
+                ),
+                (
+                    "seats_available",
+                    models.IntegerField(default=0, verbose_name="seats available"),
+                ),
+                (
+                    "wait_available",
+                    models.IntegerField(default=0, verbose_name="wait available"),
+                ),
+            ],
+            options={
+                "verbose_name": "catalog change",
+                "verbose_name_plural": "catalog changes",
+            },
+        ),
+        migrations.CreateModel(
+            name="Cursor",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "key",
+                    models.CharField(max_length=50, unique=True, verbose_name="key"),
+                ),
+                (
+                    "position",
+                    models.PositiveBigIntegerField(default=0, verbose_name="position"),
+                ),
+                (
+                    "updated_on",
+                    models.DateTimeField(auto_now=True, verbose_name="updated on"),
+                ),
+            ],
+            options={
+                "verbose_name": "cursor",
+                "verbose_name_plural": "cursors",
+            },
+        ),
+    ]
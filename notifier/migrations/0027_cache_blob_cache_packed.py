@@ -0,0 +1,27 @@
+# Generated by Django 4.2.16 on 2026-10-18 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifier", "0026_catalogchange_cursor"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cache",
+            name="blob",
+            field=models.BinaryField(
+                blank=True, default=None, null=True, verbose_name="blob"
+            ),
+        ),
+        migrations.AddField(
+            model_name="cache",
+            name="packed",
+            field=models.BinaryField(
+                blank=True, default=None, null=True, verbose_name="packed"
+            ),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.16 on 2026-10-18 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifier", "0028_revision"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cache",
+            name="changed_on",
+            field=models.DateTimeField(
+                blank=True, default=None, null=True, verbose_name="changed on"
+            ),
+        ),
+        migrations.AddField(
+            model_name="cache",
+            name="digest",
+            field=models.CharField(
+                blank=True, default="", max_length=32, verbose_name="digest"
+            ),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.16 on 2026-10-18 13:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifier", "0029_cache_changed_on_cache_digest"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Lease",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "key",
+                    models.CharField(max_length=50, unique=True, verbose_name="key"),
+                ),
+                ("owner", models.CharField(max_length=100, verbose_name="owner")),
+                ("expires_on", models.DateTimeField(verbose_name="expires on")),
+                ("heartbeat_on", models.DateTimeField(verbose_name="heartbeat on")),
+            ],
+            options={
+                "verbose_name": "lease",
+                "verbose_name_plural": "leases",
+            },
+        ),
+    ]
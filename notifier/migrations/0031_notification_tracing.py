@@ -0,0 +1,53 @@
+# Generated by Django 4.2.16 on 2026-10-18 15:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifier", "0030_lease"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="catalogchange",
+            name="fetched_on",
+            field=models.DateTimeField(
+                blank=True, default=None, null=True, verbose_name="fetched on"
+            ),
+        ),
+        migrations.AddField(
+            model_name="notificationevent",
+            name="delivered_on",
+            field=models.DateTimeField(
+                blank=True, db_index=True, null=True, verbose_name="delivered on"
+            ),
+        ),
+        migrations.AddField(
+            model_name="notificationevent",
+            name="detected_on",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="detected on"
+            ),
+        ),
+        migrations.AddField(
+            model_name="notificationevent",
+            name="enqueued_on",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="enqueued on"
+            ),
+        ),
+        migrations.AddField(
+            model_name="notificationevent",
+            name="fetched_on",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="fetched on"
+            ),
+        ),
+        migrations.AddField(
+            model_name="notificationevent",
+            name="stored_on",
+            field=models.DateTimeField(blank=True, null=True, verbose_name="stored on"),
+        ),
+    ]
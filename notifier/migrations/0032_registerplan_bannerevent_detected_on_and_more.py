@@ -0,0 +1,132 @@
+# Generated by Django 4.2.16 on 2026-10-18 16:20
+
+import django.db.models.deletion
+import django_choices_field.fields
+from django.conf import settings
+from django.db import migrations, models
+
+import notifier.models
+
+
+def build_plans(apps, schema_editor):
+    """The plans of the `RegisterCourse` that already have a strategy"""
+
+    RegisterCourse = apps.get_model("notifier", "RegisterCourse")
+    RegisterPlan = apps.get_model("notifier", "RegisterPlan")
+
+    plans = []
+    for rc in (
+        RegisterCourse.objects.exclude(strategy=0)
+        .select_related("course", "with_add", "with_drop", "tracking_list")
+        .iterator()
+    ):
+        add_crns = [rc.course.crn]
+        drop_crns = []
+        if rc.strategy == 2 and rc.with_add:
+            add_crns.append(rc.with_add.crn)
+        elif rc.strategy == 3 and rc.with_drop:
+            drop_crns.append(rc.with_drop.crn)
+
+        plans.append(
+            RegisterPlan(
+                register_course_id=rc.pk,
+                user_id=rc.tracking_list.user_id,
+                course_id=rc.course_id,
+                term=rc.course.term,
+                add_crns=add_crns,
+                drop_crns=drop_crns,
+                strategy=rc.strategy,
+            )
+        )
+
+    RegisterPlan.objects.bulk_create(plans, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("notifier", "0031_notification_tracing"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="bannerevent",
+            name="detected_on",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="detected on"
+            ),
+        ),
+        migrations.AddField(
+            model_name="bannerevent",
+            name="submitted_on",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="submitted on"
+            ),
+        ),
+        migrations.CreateModel(
+            name="RegisterPlan",
+            fields=[
+                (
+                    "register_course",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="plan",
+                        serialize=False,
+                        to="notifier.registercourse",
+                        verbose_name="register course",
+                    ),
+                ),
+                ("term", models.CharField(max_length=7, verbose_name="term")),
+                (
+                    "add_crns",
+                    models.JSONField(default=list, verbose_name="add CRNs"),
+                ),
+                (
+                    "drop_crns",
+                    models.JSONField(default=list, verbose_name="drop CRNs"),
+                ),
+                (
+                    "strategy",
+                    django_choices_field.fields.IntegerChoicesField(
+                        choices=[
+                            (0, "off"),
+                            (1, "default"),
+                            (2, "linked lab"),
+                            (3, "replace with "),
+                        ],
+                        choices_enum=notifier.models.RegisterCourse.RegisterStrategyEnum,
+                        default=1,
+                        verbose_name="strategy",
+                    ),
+                ),
+                (
+                    "updated_on",
+                    models.DateTimeField(auto_now=True, verbose_name="updated on"),
+                ),
+                (
+                    "course",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="notifier.course",
+                        verbose_name="course",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="user",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "register plan",
+                "verbose_name_plural": "register plans",
+            },
+        ),
+        migrations.RunPython(build_plans, migrations.RunPython.noop),
+    ]
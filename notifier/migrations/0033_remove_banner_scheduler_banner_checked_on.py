@@ -0,0 +1,59 @@
+# Generated by Django 4.2.16 on 2026-10-18 17:05
+
+from django.db import migrations, models
+
+
+def replace_schedules(apps, schema_editor):
+    """One `check_sessions` sweep instead of a `check_session` schedule per user"""
+
+    Schedule = apps.get_model("django_q", "Schedule")
+
+    Schedule.objects.filter(func="notifier.utils.check_session").delete()
+    Schedule.objects.update_or_create(
+        name="check_sessions",
+        defaults={
+            "func": "notifier.utils.check_sessions",
+            "schedule_type": "I",
+            "minutes": 10,
+            "repeats": -1,
+        },
+    )
+
+
+def restore_schedules(apps, schema_editor):
+    Schedule = apps.get_model("django_q", "Schedule")
+    Banner = apps.get_model("notifier", "Banner")
+
+    Schedule.objects.filter(name="check_sessions").delete()
+    for banner in Banner.objects.exclude(cookies=None).filter(active=True):
+        banner.scheduler = Schedule.objects.create(
+            name="check_session",
+            func="notifier.utils.check_session",
+            schedule_type="I",
+            args=f"({banner.user_id},)",
+            minutes=10,
+        )
+        banner.save(update_fields=["scheduler"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_q", "0014_schedule_cluster"),
+        ("notifier", "0032_registerplan_bannerevent_detected_on_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="banner",
+            name="checked_on",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="checked on"
+            ),
+        ),
+        migrations.RunPython(replace_schedules, restore_schedules),
+        migrations.RemoveField(
+            model_name="banner",
+            name="scheduler",
+        ),
+    ]
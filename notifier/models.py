@@ -22,15 +22,19 @@ import os
 
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils.timezone import now, timedelta
 from django.utils.translation import gettext as _
 from django_choices_field import IntegerChoicesField, TextChoicesField
-from django_q.models import Schedule
 from django_q.tasks import async_task
 from multiselectfield import MultiSelectField
 
 from data import SubjectEnum
 
+from . import storage
+
 User = get_user_model()
 
 
@@ -56,11 +60,9 @@ class Status(models.Model):
         """Wether the staus with given `key` is
         `StatusEnum.UP`."""
 
-        try:
-            return cls.objects.get(key=key).status == StatusEnum.UP
+        from . import registry
 
-        except:
-            return False
+        return registry.status(key) == StatusEnum.UP
 
     def __str__(self):
         return str(self.key)
@@ -77,6 +79,13 @@ class Cache(models.Model):
     - `stale` True indicating new data is being fetch.
     - `swr` number of seconds until the next request
         pass the cache while new data is being fetched.
+    - `refresh_interval` is this row's own age, set by `notifier.scheduler`,
+        with `refresh_reason` explaining how it was chosen.
+    - `churn` how often the seats changed in the recent refreshes, from 0 to 1.
+    - `packed` & `blob` replace `data` when `CACHE_STORAGE=packed`,
+        see `notifier.storage`.
+    - `digest` a hash of the data, and `changed_on` when it last changed,
+        unlike `updated_on` which moves with every refresh.
     """
 
     def data_default():
@@ -89,36 +98,61 @@ class Cache(models.Model):
     department = models.CharField(_("department"), max_length=7)
     term = models.CharField(_("term"), max_length=7)
 
+    refresh_interval = models.PositiveIntegerField(
+        _("refresh interval"), null=True, blank=True, default=None
+    )
+    refresh_reason = models.CharField(
+        _("refresh reason"), max_length=200, blank=True, default=""
+    )
+    churn = models.FloatField(_("churn"), default=0)
+    packed = models.BinaryField(_("packed"), null=True, blank=True, default=None)
+    blob = models.BinaryField(_("blob"), null=True, blank=True, default=None)
+    digest = models.CharField(_("digest"), max_length=32, blank=True, default="")
+    changed_on = models.DateTimeField(
+        _("changed on"), null=True, blank=True, default=None
+    )
+
     class Meta:
         verbose_name = _("cache item")
         verbose_name_plural = _("cache items")
 
+    def age(self) -> int:
+        """Number of seconds until the data is invalid,
+        default to `CACHE_AGE` or 5 mins"""
+        if self.refresh_interval:
+            return self.refresh_interval
+
+        return int(os.environ.get("CACHE_AGE", 60 * 5))
+
     def is_valid(self) -> bool:
-        """Wether the data has exceeded its age
-        default to 5 mins"""
-        return now() <= self.updated_on + timedelta(
-            seconds=int(os.environ.get("CACHE_AGE", 60 * 5))
-        )
+        """Wether the data has exceeded its age"""
+        return now() <= self.updated_on + timedelta(seconds=self.age())
 
     def passed_swr(self) -> bool:
-        """Wether the data has exceeded `swr` seconds
-        default to 6 min"""
-        return now() > self.updated_on + timedelta(
-            seconds=int(os.environ.get("CACHE_SWR", 60 * 6))
+        """Wether the data has exceeded `swr` seconds,
+        it keeps the same margin between `CACHE_AGE` and `CACHE_SWR`
+        default to 1 min after the age"""
+        margin = int(os.environ.get("CACHE_SWR", 60 * 6)) - int(
+            os.environ.get("CACHE_AGE", 60 * 5)
         )
+        return now() > self.updated_on + timedelta(seconds=self.age() + margin)
 
-    def get_data(self) -> dict:
+    def refresh(self) -> None:
         """This check the age of date
         and triggers fetch for new data if `stale` is False"""
 
         if self.is_valid():
-            return self.data
+            return
+
+        # the `startrefresher` process picks the expired rows by itself
+        if os.environ.get("CACHE_REFRESHER", "") == "async":
+            return
 
         if not self.stale:
-            if Status.objects.get(key="API").status == StatusEnum.UP:
+            if Status.is_up("API"):
                 # call async to update from API
                 self.stale = True
-                self.save()
+                self.save(update_fields=["stale"])
                 async_task(
                     "notifier.utils.request_data",
                     self.term,
@@ -127,12 +161,154 @@ class Cache(models.Model):
                     group="request_data",
                 )
 
-        return self.data
+    def set_data(self, data: list, digest: str | None = None) -> None:
+        """Store the API data in the format set by `CACHE_STORAGE`,
+        with its `digest` if it's already computed."""
+
+        self.digest = digest or storage.digest(data)
+        self.changed_on = now()
+
+        if storage.is_packed():
+            self.packed = storage.pack(storage.project(data))
+            self.blob = storage.pack(data)
+            self.data = []
+        else:
+            self.data = data
+            self.packed = self.blob = None
+
+    def version(self):
+        """When the data last changed, for the consumers
+        to skip their work when it didn't."""
+
+        return self.changed_on or self.updated_on
+
+    def sections(self) -> list:
+        """The sections with only the fields Petroly reads,
+        it doesn't decode the full data when stored packed."""
+
+        if self.packed is None:
+            return self.data
+
+        return storage.unpack(self.packed)
+
+    def full_data(self) -> list:
+        """The stored data as it was returned from the API."""
+
+        if self.blob is None:
+            return self.data
+
+        return storage.unpack(self.blob)
+
+    def get_data(self) -> list:
+        """Returns the stored data, after triggering
+        a refresh if it's no longer valid."""
+
+        self.refresh()
+        return self.full_data()
 
     def __str__(self) -> str:
         return str(self.id)
 
 
+class CatalogChange(models.Model):
+    """
+    A change of one section, found by diffing the old and new data
+    of a `Cache` row when it's refreshed. It's an append-only log,
+    consumers keep their position in it with a `Cursor`.
+    """
+
+    class KindEnum(models.TextChoices):
+        CHANGED = "changed", _("changed")
+        ADDED = "added", _("added")
+        REMOVED = "removed", _("removed")
+
+    created_on = models.DateTimeField(_("created on"), auto_now_add=True)
+    # when its data was fetched from Banner
+    fetched_on = models.DateTimeField(
+        _("fetched on"), null=True, blank=True, default=None
+    )
+    term = models.CharField(_("term"), max_length=7)
+    department = models.CharField(_("department"), max_length=7)
+    crn = models.CharField(_("CRN"), max_length=5)
+    kind = models.CharField(_("kind"), max_length=7, choices=KindEnum.choices)
+    seats_available = models.IntegerField(_("seats available"), default=0)
+    wait_available = models.IntegerField(_("wait available"), default=0)
+
+    class Meta:
+        verbose_name = _("catalog change")
+        verbose_name_plural = _("catalog changes")
+
+    def __str__(self) -> str:
+        return f"{self.kind} {self.crn} - {self.term}"
+
+
+class Cursor(models.Model):
+    """The position of a consumer of the `CatalogChange` log."""
+
+    key = models.CharField(_("key"), max_length=50, unique=True)
+    position = models.PositiveBigIntegerField(_("position"), default=0)
+    updated_on = models.DateTimeField(_("updated on"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("cursor")
+        verbose_name_plural = _("cursors")
+
+    def __str__(self) -> str:
+        return f"{self.key} - {self.position}"
+
+
+class Lease(models.Model):
+    """
+    A time-limited ownership of `key` by one notifier worker,
+    it's kept by renewing `expires_on`, see `notifier.leases`.
+    """
+
+    key = models.CharField(_("key"), max_length=50, unique=True)
+    owner = models.CharField(_("owner"), max_length=100)
+    expires_on = models.DateTimeField(_("expires on"))
+    heartbeat_on = models.DateTimeField(_("heartbeat on"))
+
+    class Meta:
+        verbose_name = _("lease")
+        verbose_name_plural = _("leases")
+
+    def __str__(self) -> str:
+        return f"{self.key} - {self.owner}"
+
+
+class Revision(models.Model):
+    """A version stamp, bumped whenever what it stands for changes.
+    Processes compare it to know when their local copies are stale."""
+
+    key = models.CharField(_("key"), max_length=50, unique=True)
+    value = models.PositiveBigIntegerField(_("value"), default=0)
+    updated_on = models.DateTimeField(_("updated on"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("revision")
+        verbose_name_plural = _("revisions")
+
+    @classmethod
+    def current(cls, key: str) -> int:
+        """The value of `key`, 0 if it was never bumped."""
+
+        value = cls.objects.filter(key=key).values_list("value", flat=True).first()
+        return value or 0
+
+    @classmethod
+    def bump(cls, key: str) -> None:
+        """Increment the value of `key` in the DB, creating it if missing."""
+
+        updated = cls.objects.filter(key=key).update(
+            value=F("value") + 1, updated_on=now()
+        )
+        if not updated:
+            cls.objects.get_or_create(key=key, defaults={"value": 1})
+
+    def __str__(self) -> str:
+        return f"{self.key} - {self.value}"
+
+
 class Term(models.Model):
     """
     A small model to store the allowed terms
@@ -190,7 +366,7 @@ class ChannelEnum(models.TextChoices):
 
 class Banner(models.Model):
     """A model to stores user's Banner session cookies
-    and last check to the session health, with djangoQ scheduler."""
+    and last check to the session health, by `utils.check_sessions`."""
 
     class Meta:
         verbose_name = _("banner")
@@ -202,9 +378,7 @@ class Banner(models.Model):
     cookies = models.JSONField(("cookies"), null=True, default=None)
     user = models.OneToOneField(User, verbose_name=_("user"), on_delete=models.CASCADE)
     active = models.BooleanField(_("active"), default=False)
-    scheduler = models.OneToOneField(
-        Schedule, null=True, blank=True, on_delete=models.SET_NULL
-    )
+    checked_on = models.DateTimeField(_("checked on"), null=True, blank=True)
 
     def __str__(self) -> str:
         return str(self.user)
@@ -225,6 +399,16 @@ class BannerEvent(models.Model):
     banner = models.ForeignKey(
         Banner, verbose_name=_("banner"), on_delete=models.CASCADE
     )
+    # when the opened seat was detected, and when its registration was submitted
+    detected_on = models.DateTimeField(_("detected on"), null=True, blank=True)
+    submitted_on = models.DateTimeField(_("submitted on"), null=True, blank=True)
+
+    def time_to_submit(self) -> float | None:
+        """Seconds from detecting the opened seat to submitting it"""
+
+        if self.detected_on and self.submitted_on:
+            return (self.submitted_on - self.detected_on).total_seconds()
+        return None
 
     def __str__(self) -> str:
         return str(self.banner)
@@ -324,9 +508,79 @@ class RegisterCourse(models.Model):
         return f'{self.id} - {self.course}'
 
 
+class RegisterPlan(models.Model):
+    """
+    What to submit to Banner once the `course` of a `RegisterCourse` opens,
+    rebuilt whenever it's saved, see `notifier.registrar`.
+    """
+
+    class Meta:
+        verbose_name = _("register plan")
+        verbose_name_plural = _("register plans")
+
+    register_course = models.OneToOneField(
+        RegisterCourse,
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name="plan",
+        verbose_name=_("register course"),
+    )
+    user = models.ForeignKey(User, verbose_name=_("user"), on_delete=models.CASCADE)
+    course = models.ForeignKey(
+        Course,
+        related_name="+",
+        on_delete=models.CASCADE,
+        verbose_name=_("course"),
+    )
+    term = models.CharField(_("term"), max_length=7)
+    add_crns = models.JSONField(_("add CRNs"), default=list)
+    drop_crns = models.JSONField(_("drop CRNs"), default=list)
+    strategy = IntegerChoicesField(
+        verbose_name=_("strategy"),
+        choices_enum=RegisterCourse.RegisterStrategyEnum,
+        default=RegisterCourse.RegisterStrategyEnum.DEFAULT,
+    )
+    updated_on = models.DateTimeField(_("updated on"), auto_now=True)
+
+    @classmethod
+    def sync(cls, register_course: RegisterCourse) -> None:
+        """Rebuild the plan of `register_course`, or delete it if it's off."""
+
+        strategy = register_course.strategy
+        if strategy == RegisterCourse.RegisterStrategyEnum.OFF:
+            cls.objects.filter(register_course=register_course).delete()
+            return
+
+        add_crns = [register_course.course.crn]
+        drop_crns = []
+        match strategy:
+            case RegisterCourse.RegisterStrategyEnum.LINKED_LAB:
+                if register_course.with_add_id:
+                    add_crns.append(register_course.with_add.crn)
+            case RegisterCourse.RegisterStrategyEnum.REPLACE_WITH:
+                if register_course.with_drop_id:
+                    drop_crns.append(register_course.with_drop.crn)
+
+        cls.objects.update_or_create(
+            register_course=register_course,
+            defaults={
+                "user_id": register_course.tracking_list.user_id,
+                "course_id": register_course.course_id,
+                "term": register_course.course.term,
+                "add_crns": add_crns,
+                "drop_crns": drop_crns,
+                "strategy": strategy,
+            },
+        )
+
+    def __str__(self) -> str:
+        return f"{self.user} - {self.add_crns}"
+
+
 class NotificationEvent(models.Model):
     """
-    It tracks the number, channels, and date of the sent notifications.
+    It tracks the number, channels, and date of the sent notifications,
+    with the time of each stage the change went through, see `notifier.tracing`.
     """
 
     success = models.BooleanField(_("success"), default=True, blank=True)
@@ -336,3 +590,31 @@ class NotificationEvent(models.Model):
     )
     to = models.ForeignKey(User, verbose_name=_("user"), on_delete=models.CASCADE)
     channel = models.CharField(_("channel"), max_length=50, choices=ChannelEnum.choices)
+
+    fetched_on = models.DateTimeField(_("fetched on"), null=True, blank=True)
+    stored_on = models.DateTimeField(_("stored on"), null=True, blank=True)
+    detected_on = models.DateTimeField(_("detected on"), null=True, blank=True)
+    enqueued_on = models.DateTimeField(_("enqueued on"), null=True, blank=True)
+    delivered_on = models.DateTimeField(
+        _("delivered on"), null=True, blank=True, db_index=True
+    )
+
+
+@receiver(post_save, sender=Term)
+@receiver(post_delete, sender=Term)
+@receiver(post_save, sender=Status)
+@receiver(post_delete, sender=Status)
+def bump_registry(sender, **kwargs):
+    """Let all processes know that their `notifier.registry` is stale."""
+
+    from . import registry
+
+    Revision.bump(registry.KEY)
+    registry.invalidate()
+
+
+@receiver(post_save, sender=RegisterCourse)
+def sync_register_plan(sender, instance, **kwargs):
+    """Keep the `RegisterPlan` of each `RegisterCourse` up to date."""
+
+    RegisterPlan.sync(instance)
@@ -0,0 +1,101 @@
+"""
+An asyncio refresher of the `Cache` rows.
+
+Instead of enqueuing one `request_data` task per stale (term, department),
+which the few `Q_CLUSTER` workers run almost one by one,
+this refreshes all the expired rows concurrently, bounded by a cap.
+
+Set `CACHE_REFRESHER=async` to stop `Cache.refresh` from enqueuing tasks,
+then run `python manage.py startrefresher`.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Tuple
+
+from django.db import close_old_connections
+
+from . import registry, utils
+from .models import Cache
+
+logger = logging.getLogger(__name__)
+
+
+def is_enabled() -> bool:
+    """Wether the refresher replaces the `request_data` tasks."""
+
+    return os.environ.get("CACHE_REFRESHER", "") == "async"
+
+
+def expired() -> Dict[int, Tuple[str, str]]:
+    """All (term, department) of allowed terms whose data exceeded its age,
+    or got stuck as `stale` after passing its swr, by `Cache` pk."""
+
+    terms = [long for _, long in registry.allowed_terms()]
+    rows = Cache.objects.filter(term__in=list(terms)).only(
+        "id", "term", "department", "updated_on", "stale", "refresh_interval"
+    )
+
+    return {
+        obj.pk: (obj.term, obj.department)
+        for obj in rows
+        if not obj.is_valid() and (not obj.stale or obj.passed_swr())
+    }
+
+
+def _refresh_one(term: str, department: str) -> None:
+    """Runs in a worker thread, with its own DB connection."""
+
+    try:
+        utils.request_data(term, department)
+    finally:
+        close_old_connections()
+
+
+async def refresh(
+    pairs: Iterable[Tuple[str, str]], concurrency: int
+) -> Dict[Tuple[str, str], float]:
+    """Refresh all given (term, department) pairs,
+    running at most `concurrency` requests at a time.
+
+    `request_data` keeps its error handling and `Status` semantics,
+    once the API is marked down the remaining pairs return early.
+
+    Returns:
+        dict: the duration of each pair
+    """
+
+    loop = asyncio.get_running_loop()
+    timings: Dict[Tuple[str, str], float] = {}
+
+    # `banner_api` is blocking, so each in-flight request holds a thread
+    with ThreadPoolExecutor(
+        max_workers=concurrency, thread_name_prefix="refresher"
+    ) as executor:
+
+        async def run(term: str, department: str) -> None:
+            t_start = time.perf_counter()
+            try:
+                await loop.run_in_executor(executor, _refresh_one, term, department)
+            except Exception as exc:
+                logger.error("Refreshing %s-%s failed: %s", term, department, exc)
+            timings[(term, department)] = time.perf_counter() - t_start
+
+        await asyncio.gather(*(run(term, department) for term, department in pairs))
+
+    return timings
+
+
+def refresh_expired(concurrency: int) -> Dict[Tuple[str, str], float]:
+    """Refresh all expired `Cache` rows, blocking until they're done."""
+
+    rows = expired()
+    if not rows:
+        return {}
+
+    Cache.objects.filter(pk__in=rows.keys()).update(stale=True)
+
+    return asyncio.run(refresh(rows.values(), concurrency))
@@ -0,0 +1,185 @@
+"""
+Registering the users' courses as soon as their seats open.
+
+Each `RegisterCourse` with a strategy keeps a `RegisterPlan`, rebuilt
+whenever it's saved, so running it needs nothing but the plan and its
+user's Banner session. `startnotifier` hands the detected changes to a
+`Registrar`, which runs their plans right away on threads of its own,
+so a slow Banner never holds the notifications back, and vice versa:
+    - one user's plans run one after the other, to not flood Banner
+        with one student's requests.
+    - the Banner sessions of the users having plans are kept in memory,
+        and reloaded every `SESSIONS_EVERY` seconds.
+    - only the plans of users with an active Banner session run, the others
+        are skipped, without messaging them on every detection.
+    - the Telegram status is sent once Banner answered.
+    - each plan records a `BannerEvent`, with when the seat was detected
+        and when the registration was submitted.
+"""
+
+import html
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Iterable, List, Tuple
+
+from django.db import close_old_connections
+from django.utils.timezone import now
+from telegram.constants import ParseMode
+
+from telegram_bot import utils as bot_utils
+from telegram_bot.models import TelegramProfile
+
+from . import metrics, utils
+from .models import Banner, BannerEvent, RegisterPlan, Status
+
+logger = logging.getLogger(__name__)
+
+WORKERS = int(os.environ.get("REGISTRAR_WORKERS", 8))
+SESSIONS_EVERY = 60
+
+
+class Registrar:
+    """Runs the `RegisterPlan` of the opened courses, see `submit`."""
+
+    def __init__(self, workers: int = WORKERS) -> None:
+        self.pool = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="registrar"
+        )
+        # user's pk -> its Banner session
+        self.sessions: Dict[int, Banner] = {}
+        self.loaded_on = 0.0
+        # so one user's plans never run concurrently, across `submit` calls
+        self.locks: Dict[int, threading.Lock] = defaultdict(threading.Lock)
+
+    def load_sessions(self) -> None:
+        """Load the active Banner sessions of all users having plans."""
+
+        users = RegisterPlan.objects.values("user_id")
+        self.sessions = {
+            banner.user_id: banner
+            for banner in Banner.objects.filter(user_id__in=users, active=True)
+            .exclude(cookies=None)
+            .select_related("user__telegram_profile")
+        }
+        self.loaded_on = time.monotonic()
+
+    def submit(
+        self, changed_courses: Iterable[Tuple[utils.TrackedCourse, Dict]]
+    ) -> int:
+        """Run the plans of the courses `consume_changes` or `reconcile`
+        found increased, in the background.
+
+        Returns:
+            int: the number of plans to run
+        """
+
+        if not Status.is_up("register"):
+            return 0
+
+        detected = {
+            course.pk: info.get("detected_on") or now()
+            for course, info in changed_courses
+        }
+        if not detected:
+            return 0
+
+        if time.monotonic() - self.loaded_on > SESSIONS_EVERY:
+            self.load_sessions()
+
+        rows = (
+            RegisterPlan.objects.filter(
+                course_id__in=list(detected), user__banner__active=True
+            )
+            .exclude(user__banner__cookies=None)
+            .order_by("pk")
+        )
+        plans_by_user = defaultdict(list)
+        for plan in rows:
+            plans_by_user[plan.user_id].append(plan)
+
+        for user_pk, plans in plans_by_user.items():
+            self.pool.submit(self.run, user_pk, plans, detected)
+
+        return sum(len(plans) for plans in plans_by_user.values())
+
+    def run(
+        self, user_pk: int, plans: List[RegisterPlan], detected: Dict[int, datetime]
+    ) -> None:
+        """Runs in a worker thread, with its own DB connection."""
+
+        try:
+            with self.locks[user_pk]:
+                banner = self.sessions.get(user_pk) or self._session(user_pk)
+                if banner is None:
+                    return
+
+                for plan in plans:
+                    self.execute(banner, plan, detected[plan.course_id])
+
+        except Exception as exc:
+            logger.error("Couldn't run the plans of user %s: %s", user_pk, exc)
+
+        finally:
+            close_old_connections()
+
+    def _session(self, user_pk: int) -> Banner | None:
+        """The active session of a user who saved it since `load_sessions`."""
+
+        banner = (
+            Banner.objects.filter(user_id=user_pk, active=True)
+            .exclude(cookies=None)
+            .select_related("user__telegram_profile")
+            .first()
+        )
+        if banner is not None:
+            self.sessions[user_pk] = banner
+        return banner
+
+    def execute(
+        self, banner: Banner, plan: RegisterPlan, detected_on: datetime
+    ) -> None:
+        """Submit one plan, then record & report its result."""
+
+        res = utils.banner_api.register(
+            banner,
+            term=plan.term,
+            add_crns=tuple(plan.add_crns),
+            drop_crns=tuple(plan.drop_crns),
+            conditional=True,
+        )
+        submitted_on = now()
+        metrics.register_seconds.observe((submitted_on - detected_on).total_seconds())
+
+        message = utils.format_register_result(res)
+        BannerEvent.objects.create(
+            banner=banner,
+            crns=" ".join(plan.add_crns),
+            term=plan.term,
+            result=f"{res}\n\n\n{message}",
+            detected_on=detected_on,
+            submitted_on=submitted_on,
+        )
+
+        try:
+            chat_id = banner.user.telegram_profile.id
+        except TelegramProfile.DoesNotExist:
+            # recorded in its `BannerEvent`, the other plans still run
+            logger.info("User %s has no Telegram profile to notify", banner.user_id)
+            return
+
+        bot_utils.send_telegram_message(
+            chat_id,
+            "We tried to register your courses here is the result\n\n"
+            f"<pre>{html.escape(message)}</pre>",
+            ParseMode.HTML,
+        )
+
+    def close(self) -> None:
+        """Wait for the running plans."""
+
+        self.pool.shutdown(wait=True)
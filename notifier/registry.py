@@ -0,0 +1,92 @@
+"""
+A process-local registry of small reference data that hot paths read
+on every call: terms, status and the subjects/departments lists.
+
+Each process keeps its own copy, and at most once a second it reads
+the `Revision` stamp of `KEY`, which is bumped by `Term` and `Status`
+signals. A changed stamp drops the copy, so gunicorn workers, qcluster
+workers and the notifier all notice a change within a second.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, FrozenSet, List, Tuple
+
+from data import DepartmentEnum, SubjectEnum
+
+from .models import Revision, Status, Term
+
+KEY = "registry"
+# seconds between two reads of the stamp
+CHECK_EVERY = 1.0
+
+# these are fixed in code, but membership checks over `.values` build a new list
+SUBJECT_LIST: Tuple[str, ...] = tuple(SubjectEnum.values)
+SUBJECTS: FrozenSet[str] = frozenset(SUBJECT_LIST)
+DEPARTMENTS: FrozenSet[str] = frozenset(DepartmentEnum.values)
+
+_lock = threading.Lock()
+_values: Dict[str, object] = {}
+_version = None
+_checked_on = 0.0
+
+
+def _sync() -> None:
+    global _version, _checked_on
+
+    if time.monotonic() - _checked_on < CHECK_EVERY:
+        return
+
+    version = Revision.current(KEY)
+    with _lock:
+        _checked_on = time.monotonic()
+        if version != _version:
+            _values.clear()
+            _version = version
+
+
+def _get(name: str, loader: Callable):
+    _sync()
+    try:
+        return _values[name]
+    except KeyError:
+        value = loader()
+        with _lock:
+            _values[name] = value
+        return value
+
+
+def invalidate() -> None:
+    """Drop the local copy, and read the stamp on the next lookup."""
+
+    global _version, _checked_on
+    with _lock:
+        _values.clear()
+        _version = None
+        _checked_on = 0.0
+
+
+def term_values() -> FrozenSet[str]:
+    """`Term.long` of all terms"""
+
+    return _get(
+        "term_values",
+        lambda: frozenset(Term.objects.values_list("long", flat=True)),
+    )
+
+
+def allowed_terms() -> List[Tuple[str, str]]:
+    """(short, long) of the allowed terms"""
+
+    return _get(
+        "allowed_terms",
+        lambda: list(Term.objects.filter(allowed=True).values_list("short", "long")),
+    )
+
+
+def status(key: str) -> str | None:
+    """`Status.status` of the given `key`, None if it doesn't exist"""
+
+    return _get(
+        "status", lambda: dict(Status.objects.values_list("key", "status"))
+    ).get(key)
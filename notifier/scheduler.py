@@ -0,0 +1,129 @@
+"""
+Adaptive refresh scheduling of the `Cache` rows.
+
+Each (term, department) gets its own `refresh_interval` instead of
+the global `CACHE_AGE`, based on:
+    - demand: how many `RegisterCourse` point at sections in it,
+    - churn: how often its seats actually changed recently,
+    - wether its term is the current one, the latest allowed term.
+
+The total stays within `CACHE_REFRESH_BUDGET` requests per minute,
+by stretching all intervals by the same factor when needed.
+"""
+
+import logging
+import math
+import os
+from typing import Dict, Tuple
+
+from django.db.models import Count
+
+from .models import Cache, RegisterCourse, Term
+
+logger = logging.getLogger(__name__)
+
+# how much the last refresh weighs in `Cache.churn`
+CHURN_WEIGHT = 0.2
+
+
+def update_churn(obj: Cache, changed: bool) -> None:
+    """Move `obj.churn` toward 1 if the seats `changed` in
+    this refresh, otherwise toward 0."""
+
+    obj.churn = CHURN_WEIGHT * changed + (1 - CHURN_WEIGHT) * obj.churn
+
+
+def demand() -> Dict[Tuple[str, str], int]:
+    """Number of `RegisterCourse` by (term, department)"""
+
+    rows = RegisterCourse.objects.values_list(
+        "course__term", "course__department"
+    ).annotate(count=Count("id"))
+
+    return {(term, department): count for term, department, count in rows}
+
+
+def interval_for(
+    base: float, trackers: int, churn: float, current: bool
+) -> Tuple[float, list]:
+    """The refresh interval in seconds and the reasons of it,
+    before applying the limits and the budget."""
+
+    reasons = []
+    interval = base
+
+    if trackers:
+        # 1 tracker halves the interval, 1000 trackers about 11 times shorter
+        interval /= 1 + math.log10(1 + trackers) * 3.3
+        reasons.append(f"{trackers} trackers")
+    else:
+        interval *= 4
+        reasons.append("untracked")
+
+    # from double the interval at no churn, to half of it when always changing
+    interval /= 0.5 + 1.5 * churn
+    reasons.append(f"churn {churn:.2f}")
+
+    if not current:
+        interval *= 3
+        reasons.append("not current term")
+
+    return interval, reasons
+
+
+def plan() -> int:
+    """Set `refresh_interval` & `refresh_reason` of all `Cache`
+    rows of allowed terms.
+
+    Returns:
+        int: number of planned rows
+    """
+
+    base = int(os.environ.get("CACHE_AGE", 60 * 5))
+    lowest = int(os.environ.get("CACHE_MIN_AGE", 30))
+    highest = int(os.environ.get("CACHE_MAX_AGE", 60 * 60))
+    budget = int(os.environ.get("CACHE_REFRESH_BUDGET", 120))
+
+    terms = list(Term.objects.filter(allowed=True).values_list("long", flat=True))
+    if not terms:
+        return 0
+    current = max(terms)
+    trackers = demand()
+
+    rows = list(
+        Cache.objects.filter(term__in=terms).only(
+            "id", "term", "department", "churn", "refresh_interval", "refresh_reason"
+        )
+    )
+    planned = {}
+    for obj in rows:
+        interval, reasons = interval_for(
+            base,
+            trackers.get((obj.term, obj.department), 0),
+            obj.churn,
+            obj.term == current,
+        )
+        planned[obj.pk] = (min(max(interval, lowest), highest), reasons)
+
+    # requests per minute if every row is refreshed once its interval passes
+    rate = sum(60 / interval for interval, _ in planned.values())
+    stretch = max(rate / budget, 1) if budget else 1
+
+    for obj in rows:
+        interval, reasons = planned[obj.pk]
+        if stretch > 1:
+            interval *= stretch
+            reasons.append(f"budget x{stretch:.1f}")
+
+        obj.refresh_interval = round(interval)
+        obj.refresh_reason = ", ".join(reasons)[:200]
+
+    Cache.objects.bulk_update(rows, ["refresh_interval", "refresh_reason"])
+    logger.info(
+        "Planned %d cache items, %0.1f requests/min, stretched x%0.2f",
+        len(rows),
+        min(rate, budget) if budget else rate,
+        stretch,
+    )
+
+    return len(rows)
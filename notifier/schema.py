@@ -14,7 +14,6 @@ import strawberry.django
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ObjectDoesNotExist
-from django_q.models import Schedule
 from django_q.tasks import async_task, logger
 from graphql.error import GraphQLError
 from strawberry.scalars import JSON
@@ -26,6 +25,7 @@ from data import SubjectEnum
 from telegram_bot.models import TelegramProfile
 from telegram_bot.utils import escape_md
 
+from . import instructors
 from .models import Banner, ChannelEnum, Course, RegisterCourse, TrackingList
 from .types import (
     ChannelsType,
@@ -35,7 +35,7 @@ from .types import (
     RegisterCourseType,
     TermType,
 )
-from .utils import fetch_data, get_course_info, instructor_info_from_name
+from .utils import fetch_data, get_course_info, get_courses_info, search_sections
 
 User = get_user_model()
 
@@ -110,46 +110,35 @@ class Query:
         except TrackingList.DoesNotExist:
             return False
 
-        result = []
-
-        for course in tracking_list.registercourse_set.all():
-            # frontend needs courses to be in Banner format, not just `Course` obj
-            for raw_course in fetch_data(course.course.term, course.course.department):
-                if course.course.crn == raw_course["courseReferenceNumber"]:
-                    result.append(raw_course)
+        courses = [
+            register_course.course
+            for register_course in tracking_list.registercourse_set.select_related(
+                "course"
+            )
+        ]
 
-        return result
+        # frontend needs courses to be in Banner format, not just `Course` obj
+        return [raw_course for raw_course in get_courses_info(courses) if raw_course]
 
     @strawberry.field
-    def search(self, term: str, department: str, title: str) -> JSON:
-        """to call `fetch_data`
-        and perform case-insensitive searching
-        in the `course_number` and `course_title` fields from API data.
+    def search(self, term: str, title: str, department: Optional[str] = None) -> JSON:
+        """to perform case-insensitive searching by words prefixes
+        in the course code & title, CRN, and instructors' names,
+        of one department or all of them, see `catalog.search`.
 
         Args:
             term (int): term number
-            department (str): in which department
-            title (str): case-insensitive title of the course or code
+            title (str): e.g., `ics 10`, `data struct`, or an instructor's name
+            department (str): in which department, all departments if not given
 
         Returns:
             JSON: the same structure of the API data.
         """
 
-        # TODO: We shouldn't keep calling db for this better cache it.
-        raw = fetch_data(term, department)
-
-        result = []
-        for course in raw:
-            if title.lower() in course["subjectCourse"].lower():
-                result.append(course)
-
-                # try to find some info about this instructor
-                # and append it to the course dict
-                for faculty in course["faculty"]:
-                    if len(faculty["displayName"]) > 1:
-                        faculty |= instructor_info_from_name(
-                            faculty["displayName"], department
-                        )
+        result = search_sections(term, title, department)
+        # try to find some info about the instructors
+        # and append it to their faculty dicts
+        instructors.enrich(result, department)
 
         return result
 
@@ -163,28 +152,16 @@ class Mutation:
         user = info.context.request.user
         try:
             obj, _ = Banner.objects.get_or_create(user=user)
-            if obj.scheduler:
-                obj.scheduler.delete()
-
-            # create a schedule for 10 min forever, starting now
-            s = Schedule(
-                name="check_session",
-                func="notifier.utils.check_session",
-                schedule_type=Schedule.MINUTES,
-                args=(user.pk,),
-                minutes=10,
-                kwargs=None,
-                hook=None,
-                cron=None,
-            )
-            # make sure we trigger validation
-            s.full_clean()
-            s.save()
-
             obj.cookies = json.loads(cookies)
-            obj.scheduler = s
             obj.save()
 
+            # check it now, then `check_sessions` keeps checking it
+            async_task(
+                "notifier.utils.check_session",
+                user.pk,
+                task_name=f"check-session-{user.pk}",
+            )
+
         except Exception as e:
             logger.error("Error in saving Banner for user %s: %s", user.pk, e)
             return False
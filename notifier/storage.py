@@ -0,0 +1,106 @@
+"""
+A compact storage format of the API data in `Cache` rows.
+
+Each section is projected onto the fields Petroly reads, keeping
+the same Banner shape, and both the projected and the full payloads
+are stored as zlib-compressed compact JSON in binary columns.
+Readers decode the small projected one, and only `raw_data`
+decodes the full one.
+
+Enable it with `CACHE_STORAGE=packed`, rows are converted as they refresh.
+"""
+
+import hashlib
+import json
+import os
+import zlib
+from typing import Dict, List
+
+# the kept fields of each section, nested lists are projected item by item
+PROJECTION = {
+    "term": None,
+    "courseReferenceNumber": None,
+    "subject": None,
+    "courseNumber": None,
+    "subjectCourse": None,
+    "sequenceNumber": None,
+    "courseTitle": None,
+    "scheduleTypeDescription": None,
+    "creditHours": None,
+    "maximumEnrollment": None,
+    "enrollment": None,
+    "seatsAvailable": None,
+    "waitCapacity": None,
+    "waitCount": None,
+    "waitAvailable": None,
+    "openSection": None,
+    "faculty": {
+        "displayName": None,
+        "emailAddress": None,
+        "primaryIndicator": None,
+    },
+    "meetingsFaculty": {
+        "meetingTime": {
+            "beginTime": None,
+            "endTime": None,
+            "building": None,
+            "room": None,
+            "meetingScheduleType": None,
+            "monday": None,
+            "tuesday": None,
+            "wednesday": None,
+            "thursday": None,
+            "friday": None,
+            "saturday": None,
+            "sunday": None,
+        },
+    },
+}
+
+
+def is_packed() -> bool:
+    """Wether new data is stored in the compact format."""
+
+    return os.environ.get("CACHE_STORAGE", "json") == "packed"
+
+
+def _project(value, fields: Dict | None):
+    if fields is None or value is None:
+        return value
+
+    if isinstance(value, list):
+        return [_project(item, fields) for item in value]
+
+    return {
+        key: _project(value[key], sub) for key, sub in fields.items() if key in value
+    }
+
+
+def project(data: List[Dict]) -> List[Dict]:
+    """Keep only the `PROJECTION` fields of each section."""
+
+    return [_project(section, PROJECTION) for section in data]
+
+
+def pack(data: List[Dict]) -> bytes:
+    """Encode the sections into compressed compact JSON."""
+
+    return zlib.compress(
+        json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode(), 6
+    )
+
+
+def digest(data: List[Dict]) -> str:
+    """A stable hash of the API data, the same for equal data
+    regardless of the keys order."""
+
+    return hashlib.blake2b(
+        json.dumps(data, sort_keys=True, separators=(",", ":")).encode(),
+        digest_size=16,
+    ).hexdigest()
+
+
+def unpack(blob: bytes) -> List[Dict]:
+    """Decode what `pack` returns."""
+
+    return json.loads(zlib.decompress(blob))
@@ -1,3 +1,1040 @@
-from django.test import TestCase
+"""
+This module is to test the `notifier` app.
 
-# Create your tests here.
+## Run tests
+    to run these tests only excute:
+    `python manage.py test notifier.tests`
+"""
+
+import json
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import now, timedelta
+
+from evaluation.models import Evaluation, Instructor
+from telegram_bot.models import TelegramProfile
+
+from . import (
+    catalog,
+    instructors,
+    leases,
+    metrics,
+    registrar,
+    registry,
+    scheduler,
+    tracing,
+    utils,
+    wakeup,
+)
+from .models import (
+    Banner,
+    BannerEvent,
+    Cache,
+    CatalogChange,
+    ChannelEnum,
+    Course,
+    Cursor,
+    Lease,
+    RegisterCourse,
+    RegisterPlan,
+    Revision,
+    Status,
+    StatusEnum,
+    Term,
+    TrackingList,
+)
+
+User = get_user_model()
+
+
+def make_section(crn: str, subject_course: str, seats: int = 0, wait: int = 0):
+    """A minimal section in the same shape of the API data"""
+
+    return {
+        "courseReferenceNumber": crn,
+        "subjectCourse": subject_course,
+        "sequenceNumber": "01",
+        "seatsAvailable": seats,
+        "waitAvailable": wait,
+        "faculty": [],
+    }
+
+
+class CatalogTestCase(TestCase):
+    """
+    To test the in-process sections catalog.
+    """
+
+    def setUp(self) -> None:
+        catalog.clear()
+        self.cache = Cache.objects.create(
+            term="202410",
+            department="ICS",
+            data=[
+                make_section("10001", "ICS104", seats=3),
+                make_section("10002", "ICS104"),
+                make_section("10003", "ICS108", wait=2),
+            ],
+        )
+
+    def test_lookups(self) -> None:
+        index = catalog.index_for(self.cache)
+
+        self.assertEqual(len(index), 3)
+        self.assertEqual(index.get("10001")["seatsAvailable"], 3)
+        self.assertEqual(index.get("99999"), {})
+        self.assertEqual(
+            [s["courseReferenceNumber"] for s in index.of_course("ICS104")],
+            ["10001", "10002"],
+        )
+        self.assertEqual(index.of_course("ICS999"), [])
+
+    def test_reuse_until_updated(self) -> None:
+        index = catalog.index_for(self.cache)
+
+        obj = Cache.objects.defer("data").get(pk=self.cache.pk)
+        with self.assertNumQueries(0):
+            self.assertIs(catalog.index_for(obj), index)
+
+        self.cache.set_data([make_section("10001", "ICS104", seats=0)])
+        self.cache.updated_on = now() + timedelta(seconds=1)
+        self.cache.save()
+
+        index = catalog.index_for(self.cache)
+        self.assertEqual(len(index), 1)
+        self.assertEqual(index.get("10001")["seatsAvailable"], 0)
+
+    def test_unchanged_refresh(self) -> None:
+        data = [make_section("10001", "ICS104", seats=3)]
+
+        with mock.patch.object(utils, "banner_api") as api:
+            api.fetch.return_value = data
+            utils.request_data("202410", "ICS")
+            self.cache.refresh_from_db()
+            changed_on, updated_on = self.cache.changed_on, self.cache.updated_on
+            index = catalog.index_for(self.cache)
+
+            # the same data in another keys order
+            api.fetch.return_value = [dict(reversed(data[0].items()))]
+            utils.request_data("202410", "ICS")
+
+        self.cache.refresh_from_db()
+        self.assertEqual(self.cache.changed_on, changed_on)
+        self.assertGreater(self.cache.updated_on, updated_on)
+        self.assertIs(catalog.index_for(self.cache), index)
+
+    def test_unchanged_packs(self) -> None:
+        data = [make_section("10001", "ICS104", seats=3)]
+        self.cache.set_data(data)
+        self.cache.save()
+        changed_on = self.cache.changed_on
+
+        # stored as JSON, then refreshed with the same data once packing is on
+        with mock.patch.dict("os.environ", {"CACHE_STORAGE": "packed"}):
+            with mock.patch.object(utils, "banner_api") as api:
+                api.fetch.return_value = data
+                utils.request_data("202410", "ICS")
+
+            self.cache.refresh_from_db()
+            self.assertIsNotNone(self.cache.packed)
+            self.assertEqual(self.cache.data, [])
+            self.assertEqual(self.cache.full_data(), data)
+            self.assertEqual(self.cache.changed_on, changed_on)
+
+    def test_search(self) -> None:
+        sections = [
+            {
+                **make_section("10001", "ICS104"),
+                "courseTitle": "Intro. to Programming in Python",
+                "faculty": [{"displayName": "Ahmad Alharbi"}],
+            },
+            {
+                **make_section("10002", "ICS108"),
+                "courseTitle": "Object-Oriented Programming",
+            },
+        ]
+        index = catalog.DepartmentIndex(sections, now())
+
+        def crns(query):
+            return [s["courseReferenceNumber"] for s in index.search(query)]
+
+        self.assertEqual(crns("ics10"), ["10001", "10002"])
+        self.assertEqual(crns("ICS 104"), ["10001"])
+        self.assertEqual(crns("108"), ["10002"])
+        self.assertEqual(crns("prog obj"), ["10002"])
+        self.assertEqual(crns("alharbi"), ["10001"])
+        self.assertEqual(crns("10002"), ["10002"])
+        self.assertEqual(crns("math"), [])
+        self.assertEqual(len(crns("")), 2)
+
+    def test_search_copies(self) -> None:
+        (section,) = catalog.search([self.cache], "ICS108")
+        section["faculty"].append({"displayName": "x"})
+
+        self.assertEqual(catalog.index_for(self.cache).get("10003")["faculty"], [])
+
+    @mock.patch.dict("os.environ", {"CACHE_STORAGE": "packed"})
+    def test_packed_full(self) -> None:
+        section = make_section("10001", "ICS104") | {"campusDescription": "Main"}
+        self.cache.set_data([section])
+        self.cache.save()
+
+        # the notifier reads the projected fields, the frontend all of them
+        projected = catalog.index_for(self.cache).get("10001")
+        self.assertNotIn("campusDescription", projected)
+        full = catalog.index_for(self.cache, full=True).get("10001")
+        self.assertEqual(full, section)
+
+    def test_diff(self) -> None:
+        old = [make_section("10001", "ICS104"), make_section("10002", "ICS104")]
+        new = [
+            make_section("10001", "ICS104", seats=2),
+            make_section("10003", "ICS108"),
+        ]
+
+        self.assertEqual(catalog.diff(old, old), [])
+        self.assertEqual(
+            catalog.diff(old, new),
+            [
+                ("10001", CatalogChange.KindEnum.CHANGED, 2, 0),
+                ("10003", CatalogChange.KindEnum.ADDED, 0, 0),
+                ("10002", CatalogChange.KindEnum.REMOVED, 0, 0),
+            ],
+        )
+
+
+class CoursesInfoTestCase(TestCase):
+    """
+    To test looking up many tracked courses at once.
+    """
+
+    def setUp(self) -> None:
+        catalog.clear()
+        sections = {"ICS": ("10001", "10002", "10003"), "MATH": ("20001",)}
+        for department, crns in sections.items():
+            Cache.objects.create(
+                term="202410",
+                department=department,
+                data=[make_section(crn, f"{department}101") for crn in crns],
+            )
+        self.courses = [
+            Course.objects.create(crn=crn, term="202410", department=department)
+            for crn, department in (
+                ("20001", "MATH"),
+                ("10001", "ICS"),
+                ("99999", "ICS"),
+                ("10003", "ICS"),
+            )
+        ]
+
+    def test_one_query_per_call(self) -> None:
+        # once the indexes are built, one query for any number of courses
+        utils.get_courses_info(self.courses)
+
+        with self.assertNumQueries(1):
+            info = utils.get_courses_info(self.courses)
+
+        self.assertEqual(
+            [section.get("courseReferenceNumber") for section in info],
+            ["20001", "10001", None, "10003"],
+        )
+        with self.assertNumQueries(0):
+            self.assertEqual(utils.get_courses_info([]), [])
+
+
+class CheckChangesBatchTestCase(TestCase):
+    """
+    To test checking many courses against the cached data.
+    """
+
+    def setUp(self) -> None:
+        catalog.clear()
+        Term.objects.create(long="202410", short="241", allowed=True)
+        self.cache = Cache.objects.create(
+            term="202410", department="ICS", data=[make_section("10001", "ICS104")]
+        )
+        self.courses = [
+            Course.objects.create(crn=f"1000{i}", term="202410", department="ICS")
+            for i in range(1, 4)
+        ]
+
+    def test_delete_missing(self) -> None:
+        utils.check_changes_batch(Course.objects.all())
+
+        self.assertEqual(list(Course.objects.values_list("crn", flat=True)), ["10001"])
+
+    def test_keep_when_truncated(self) -> None:
+        for i in range(utils.DELETE_AT_MOST):
+            Course.objects.create(crn=f"2000{i}", term="202410", department="ICS")
+
+        utils.check_changes_batch(Course.objects.all())
+        self.assertEqual(Course.objects.count(), utils.DELETE_AT_MOST + 3)
+
+    def test_keep_when_empty(self) -> None:
+        self.cache.set_data([])
+        self.cache.save()
+
+        utils.check_changes_batch(Course.objects.all())
+        self.assertEqual(Course.objects.count(), 3)
+
+
+class TrackedCoursesQueryTestCase(TestCase):
+    """
+    To test the queries of the `trackedCourses` GraphQL query.
+    """
+
+    endpoint = "/endpoint/"
+    query = "query { trackedCourses }"
+
+    def setUp(self) -> None:
+        catalog.clear()
+        user = User.objects.create_user(
+            username="test", email="test@petroly.co", password="nothing-is-secret"
+        )
+        user.status.verified = True
+        user.status.save()
+        self.tracking_list = TrackingList.objects.create(user=user)
+
+        for department, crns in {"ICS": ("10001", "10003"), "MATH": ("20001",)}.items():
+            Cache.objects.create(
+                term="202410",
+                department=department,
+                data=[make_section(crn, f"{department}101") for crn in crns],
+            )
+        self.courses = [
+            Course.objects.create(crn=crn, term="202410", department=department)
+            for crn, department in (
+                ("10001", "ICS"),
+                ("20001", "MATH"),
+                ("10003", "ICS"),
+            )
+        ]
+        # the catalog indexes are kept between requests
+        utils.get_courses_info(self.courses)
+
+        res = self.client.post(
+            self.endpoint,
+            data={
+                "query": """mutation {
+                    tokenAuth(username: "test", password: "nothing-is-secret") {
+                        token { token }
+                    }
+                }"""
+            },
+            content_type="application/json",
+        )
+        token = json.loads(res.content)["data"]["tokenAuth"]["token"]["token"]
+        self.headers = {"HTTP_AUTHORIZATION": f"JWT {token}"}
+
+    def tracked_courses(self):
+        res = self.client.post(
+            self.endpoint,
+            data={"query": self.query},
+            content_type="application/json",
+            **self.headers,
+        )
+        self.assertEqual(res.status_code, 200)
+        return json.loads(res.content)["data"]["trackedCourses"]
+
+    def track(self, course: Course) -> None:
+        RegisterCourse.objects.create(tracking_list=self.tracking_list, course=course)
+
+    def test_queries_per_request(self) -> None:
+        self.track(self.courses[0])
+        with CaptureQueriesContext(connection) as one:
+            self.assertEqual(len(self.tracked_courses()), 1)
+
+        # as many queries for any number of courses, of any departments
+        for course in self.courses[1:]:
+            self.track(course)
+        with self.assertNumQueries(len(one)):
+            tracked = self.tracked_courses()
+
+        self.assertCountEqual(
+            [section["courseReferenceNumber"] for section in tracked],
+            ["10001", "20001", "10003"],
+        )
+
+
+class CollectTrackedCoursesTestCase(TestCase):
+    """
+    To test collecting the tracked courses with their trackers.
+    """
+
+    def setUp(self) -> None:
+        self.users = [
+            User.objects.create_user(username=f"user-{i}", password="its-secret")
+            for i in range(3)
+        ]
+        # the same CRN in two terms must not be merged
+        self.courses = [
+            Course.objects.create(crn="10001", term="202410", department="ICS"),
+            Course.objects.create(crn="10001", term="202420", department="ICS"),
+        ]
+        for user in self.users:
+            tracking_list = TrackingList.objects.create(user=user)
+            for course in self.courses:
+                RegisterCourse.objects.create(
+                    tracking_list=tracking_list, course=course
+                )
+
+    def test_single_query(self) -> None:
+        with self.assertNumQueries(1):
+            collection = utils.collect_tracked_courses()
+
+        self.assertEqual(set(collection), {("10001", "202410"), ("10001", "202420")})
+        tracked = collection[("10001", "202410")]
+        self.assertEqual(tracked.pk, self.courses[0].pk)
+        self.assertEqual(tracked.trackers, {user.pk for user in self.users})
+
+
+class SchedulerTestCase(TestCase):
+    """
+    To test planning each cache item refresh interval.
+    """
+
+    def setUp(self) -> None:
+        Term.objects.create(long="202410", short="241", allowed=True)
+        self.tracked = Cache.objects.create(term="202410", department="ICS")
+        self.untracked = Cache.objects.create(term="202410", department="ARC")
+
+        user = User.objects.create_user(username="user-0", password="its-secret")
+        course = Course.objects.create(crn="10001", term="202410", department="ICS")
+        RegisterCourse.objects.create(
+            tracking_list=TrackingList.objects.create(user=user), course=course
+        )
+
+    def test_plan(self) -> None:
+        self.assertEqual(scheduler.plan(), 2)
+
+        self.tracked.refresh_from_db()
+        self.untracked.refresh_from_db()
+        self.assertLess(self.tracked.refresh_interval, self.untracked.refresh_interval)
+        self.assertIn("1 trackers", self.tracked.refresh_reason)
+        self.assertIn("untracked", self.untracked.refresh_reason)
+        self.assertEqual(self.tracked.age(), self.tracked.refresh_interval)
+
+    def test_churn(self) -> None:
+        scheduler.update_churn(self.tracked, True)
+        self.assertAlmostEqual(self.tracked.churn, scheduler.CHURN_WEIGHT)
+
+
+class ConsumeChangesTestCase(TestCase):
+    """
+    To test consuming the `CatalogChange` log by cursor.
+    """
+
+    def setUp(self) -> None:
+        user = User.objects.create_user(username="user-0", password="its-secret")
+        self.course = Course.objects.create(
+            crn="10001", term="202410", department="ICS"
+        )
+        RegisterCourse.objects.create(
+            tracking_list=TrackingList.objects.create(user=user), course=self.course
+        )
+        utils._read_up_to.clear()
+        # a partition's cursor starts at the end of the log
+        utils.consume_changes()
+
+    def add_change(self, crn: str, seats: int, kind=CatalogChange.KindEnum.CHANGED):
+        CatalogChange.objects.create(
+            term="202410", department="ICS", crn=crn, kind=kind, seats_available=seats
+        )
+
+    def test_consume(self) -> None:
+        self.add_change("10001", 1)
+        self.add_change("10001", 3)
+        # not tracked by anyone
+        self.add_change("10002", 5)
+
+        increased, count = utils.consume_changes()
+        self.assertEqual(count, 3)
+        self.assertEqual(len(increased), 1)
+        self.assertEqual(increased[0][1]["available_seats"], 3)
+        self.assertEqual(increased[0][1]["available_seats_old"], 0)
+
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.available_seats, 3)
+
+        # nothing new, the not settled changes are read again without notifying
+        self.assertEqual(utils.consume_changes(), ([], 0))
+
+    def test_committed_out_of_order(self) -> None:
+        self.add_change("10002", 1)
+        late = CatalogChange.objects.latest("pk")
+        late.delete()
+        self.add_change("10003", 1)
+        utils.consume_changes()
+
+        # a refresh with a lower pk commits after a higher one was consumed
+        late.crn = "10001"
+        late.save(force_insert=True)
+        increased, _ = utils.consume_changes()
+        self.assertEqual([course.pk for course, _ in increased], [self.course.pk])
+
+    def test_settled_cursor(self) -> None:
+        self.add_change("10001", 1)
+        CatalogChange.objects.update(
+            created_on=now() - timedelta(seconds=utils.SETTLE_SECONDS + 1)
+        )
+        self.add_change("10001", 2)
+        settled, fresh = CatalogChange.objects.order_by("pk")
+        utils.consume_changes()
+
+        cursor = Cursor.objects.get(key="notifier:202410-ICS")
+        self.assertEqual(cursor.position, settled.pk)
+        self.assertLess(cursor.position, fresh.pk)
+
+    def test_removed(self) -> None:
+        self.add_change("10001", 0, kind=CatalogChange.KindEnum.REMOVED)
+        utils.consume_changes()
+
+        self.assertFalse(Course.objects.filter(pk=self.course.pk).exists())
+
+    def test_removed_truncated(self) -> None:
+        tracking_list = TrackingList.objects.get()
+        for i in range(2, utils.DELETE_AT_MOST + 2):
+            course = Course.objects.create(
+                crn=f"1000{i}", term="202410", department="ICS"
+            )
+            RegisterCourse.objects.create(tracking_list=tracking_list, course=course)
+
+        # a truncated response marks every section removed
+        for crn in Course.objects.values_list("crn", flat=True):
+            self.add_change(crn, 0, kind=CatalogChange.KindEnum.REMOVED)
+        utils.consume_changes()
+
+        self.assertEqual(Course.objects.count(), utils.DELETE_AT_MOST + 1)
+        self.assertEqual(RegisterCourse.objects.count(), utils.DELETE_AT_MOST + 1)
+
+
+class RegistryTestCase(TestCase):
+    """
+    To test the process-local registry of terms & status.
+    """
+
+    def setUp(self) -> None:
+        registry.invalidate()
+        Term.objects.create(long="202410", short="241", allowed=True)
+        Status.objects.create(key="API", status=StatusEnum.UP)
+
+    def test_no_queries_when_unchanged(self) -> None:
+        self.assertEqual(registry.term_values(), {"202410"})
+        self.assertEqual(registry.allowed_terms(), [("241", "202410")])
+        self.assertTrue(Status.is_up("API"))
+
+        with self.assertNumQueries(0):
+            registry.term_values()
+            registry.allowed_terms()
+            Status.is_up("API")
+
+    def test_signals(self) -> None:
+        self.assertEqual(registry.allowed_terms(), [("241", "202410")])
+        version = Revision.current(registry.KEY)
+
+        Term.objects.create(long="202420", short="242", allowed=True)
+        Status.objects.filter(key="API").get().delete()
+
+        self.assertEqual(Revision.current(registry.KEY), version + 2)
+        self.assertEqual(len(registry.allowed_terms()), 2)
+        self.assertFalse(Status.is_up("API"))
+
+    def test_other_process(self) -> None:
+        registry.term_values()
+        # as if another process changed the terms, no signals here
+        Term.objects.bulk_create([Term(long="202420", short="242", allowed=False)])
+        self.assertNotIn("202420", registry.term_values())
+
+        Revision.bump(registry.KEY)
+        with mock.patch.object(registry, "CHECK_EVERY", 0):
+            self.assertIn("202420", registry.term_values())
+
+
+class PayloadTestCase(TestCase):
+    """
+    To test the `send_notification` payload.
+    """
+
+    def setUp(self) -> None:
+        self.course = Course.objects.create(
+            crn="10001",
+            term="202410",
+            department="ICS",
+            raw=make_section("10001", "ICS104"),
+        )
+
+    def test_round_trip(self) -> None:
+        course, info = self.course, {
+            "available_seats": 2,
+            "available_seats_old": 0,
+            "waiting_list_count": 0,
+            "waiting_list_count_old": 0,
+            "subjectCourse": "ICS104",
+            "sequenceNumber": "01",
+        }
+        payload = utils.dump_changes([utils.change_entry(course, info)])
+
+        with self.assertNumQueries(0):
+            (entry,) = utils.load_changes(payload)
+
+        self.assertEqual(entry["pk"], course.pk)
+        self.assertEqual(entry["subjectCourse"], "ICS104")
+        self.assertEqual(entry["available_seats"], 2)
+
+    def test_legacy(self) -> None:
+        status = {
+            "available_seats": 2,
+            "available_seats_old": 0,
+            "waiting_list_count": 0,
+            "waiting_list_count_old": 0,
+        }
+        payload = str([{"course_pk": self.course.pk, "status": status}])
+
+        with self.assertNumQueries(1):
+            (entry,) = utils.load_changes(payload)
+
+        self.assertEqual(entry["crn"], "10001")
+        self.assertEqual(entry["sequenceNumber"], "01")
+
+    def test_email_text(self) -> None:
+        user = User.objects.create_user(
+            username="user-0", email="user@petroly.co", password="its-secret"
+        )
+        TrackingList.objects.create(user=user, channels=[ChannelEnum.EMAIL])
+        info = {
+            "available_seats": 2,
+            "available_seats_old": 0,
+            "waiting_list_count": 0,
+            "waiting_list_count_old": 0,
+            "subjectCourse": "ICS104",
+            "sequenceNumber": "01",
+        }
+        payload = utils.dump_changes([utils.change_entry(self.course, info)])
+
+        utils.send_notification(user.pk, payload)
+
+        (email,) = mail.outbox
+        self.assertIn("ICS104-01 - CRN 10001", email.body)
+        self.assertIn("Available Seats: 0 -> 2", email.body)
+        self.assertNotIn("{", email.body)
+        self.assertEqual(tracing.flush(), 1)
+
+
+class MetricsTestCase(SimpleTestCase):
+    """
+    To test rendering the metrics in the Prometheus text format.
+    """
+
+    def test_histogram(self) -> None:
+        histogram = metrics.Histogram(
+            "test_seconds", "test", label="stage", register=False
+        )
+        histogram.observe(0.02, "a")
+        histogram.observe(3, "a")
+        rendered = histogram.render()
+
+        self.assertIn('test_seconds_bucket{stage="a",le="0.025"} 1', rendered)
+        self.assertIn('test_seconds_bucket{stage="a",le="5"} 2', rendered)
+        self.assertIn('test_seconds_bucket{stage="a",le="+Inf"} 2', rendered)
+        self.assertIn('test_seconds_count{stage="a"} 2', rendered)
+
+    def test_counter(self) -> None:
+        counter = metrics.Counter("test_total", "test", register=False)
+        self.assertIn("test_total 0", counter.render())
+
+        counter.inc(3)
+        with mock.patch.object(metrics, "_metrics", [counter]):
+            self.assertIn("test_total 3", metrics.render())
+        self.assertNotIn("test_total", metrics.render())
+
+
+class LeasesTestCase(TestCase):
+    """
+    To test sharing the partitions between notifier workers.
+    """
+
+    partitions = [("202410", department) for department in ("ICS", "MATH", "PHYS")]
+
+    def test_share(self) -> None:
+        first = leases.sync("first", self.partitions)
+        self.assertEqual(first, set(self.partitions))
+
+        # `second` takes whatever `first` gives back on its next sync
+        self.assertEqual(leases.sync("second", self.partitions), set())
+        first = leases.sync("first", self.partitions)
+        second = leases.sync("second", self.partitions)
+
+        self.assertEqual(len(first), 2)
+        self.assertEqual(len(second), 1)
+        self.assertFalse(first & second)
+
+    def test_takeover(self) -> None:
+        leases.sync("first", self.partitions)
+        Lease.objects.filter(owner="first").update(expires_on=now())
+
+        self.assertEqual(leases.sync("second", self.partitions), set(self.partitions))
+        with self.assertRaises(leases.LeaseLost):
+            leases.ensure_owned("first", self.partitions[:1])
+
+    def test_renew(self) -> None:
+        leases.sync("first", self.partitions)
+        Lease.objects.filter(owner="first").update(expires_on=now())
+
+        # e.g., while the API is down
+        leases.renew("first")
+        self.assertEqual(leases.sync("second", self.partitions), set())
+        leases.ensure_owned("first", self.partitions)
+
+    def test_new_partition_cursor(self) -> None:
+        utils.partition_cursors("notifier", self.partitions[:1])
+        Cursor.objects.filter(key__startswith="notifier:").update(position=5)
+
+        # a partition tracked later starts where the others are, not at the head
+        CatalogChange.objects.create(
+            term="202410", department="MATH", crn="10001", kind="changed"
+        )
+        cursors = utils.partition_cursors("notifier", self.partitions[:2])
+        self.assertEqual(cursors[self.partitions[1]].position, 5)
+
+
+class WakeupTestCase(TransactionTestCase):
+    """
+    To test waking the notifier up once a refresh is stored,
+    not within a test transaction, as the signals are sent on commit.
+    """
+
+    def setUp(self) -> None:
+        # any free port, the signals are sent to it
+        self.waiter = wakeup.Waiter(port=0)
+        self.addCleanup(self.waiter.close)
+        patcher = mock.patch.dict(
+            "os.environ", {"NOTIFIER_WAKEUP_PORT": str(self.waiter.port)}
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_signal(self) -> None:
+        wakeup.signal("202410", "ICS")
+
+        self.assertTrue(self.waiter.wait(1))
+        # the signal is consumed
+        self.assertFalse(self.waiter.wait(0.05))
+
+    def test_clear(self) -> None:
+        wakeup.signal("202410", "ICS")
+
+        time.sleep(0.05)
+        self.waiter.clear()
+        self.assertFalse(self.waiter.wait(0.05))
+
+    def test_many_waiters(self) -> None:
+        other = wakeup.Waiter(port=self.waiter.port)
+        self.addCleanup(other.close)
+
+        wakeup.signal("202410", "ICS")
+        self.assertTrue(self.waiter.wait(1))
+        self.assertTrue(other.wait(1))
+
+
+class TracingTestCase(TestCase):
+    """
+    To test recording & reporting the notifications latency.
+    """
+
+    def setUp(self) -> None:
+        self.user = User.objects.create(username="test", email="test@petroly.co")
+        self.course = Course.objects.create(
+            crn="10001",
+            term="202410",
+            department="ICS",
+            raw=make_section("10001", "ICS104"),
+        )
+        # the events left by other tests
+        tracing.flush()
+
+    def test_record(self) -> None:
+        stamp = now()
+        info = {
+            "available_seats": 2,
+            "available_seats_old": 0,
+            "waiting_list_count": 0,
+            "waiting_list_count_old": 0,
+            "subjectCourse": "ICS104",
+            "sequenceNumber": "01",
+            "fetched_on": stamp - timedelta(seconds=30),
+            "stored_on": stamp - timedelta(seconds=29),
+            "detected_on": stamp - timedelta(seconds=20),
+        }
+        payload = utils.dump_changes(
+            [utils.change_entry(self.course, info)], stamp.timestamp() - 10
+        )
+
+        tracing.record(
+            self.user.pk,
+            utils.load_changes(payload),
+            ChannelEnum.TELEGRAM,
+            True,
+            utils.load_enqueued_on(payload),
+        )
+        self.assertEqual(tracing.flush(), 1)
+
+        rows = {row["span"]: row for row in tracing.report()}
+        self.assertEqual(rows["fetch → store"]["p50"], 1)
+        self.assertEqual(rows["detect → enqueue"]["p99"], 10)
+        self.assertAlmostEqual(rows["total"]["p50"], 30, delta=5)
+
+    def test_deleted_course(self) -> None:
+        other = Course.objects.create(crn="10002", term="202410", department="ICS")
+        changes = [{"pk": self.course.pk}, {"pk": other.pk}]
+        tracing.record(self.user.pk, changes, ChannelEnum.TELEGRAM, True)
+        other.delete()
+
+        # the events of the other courses are still written
+        self.assertEqual(tracing.flush(), 1)
+
+
+class RegisterPlanTestCase(TestCase):
+    """
+    To test keeping the registration plans up to date.
+    """
+
+    def setUp(self) -> None:
+        user = User.objects.create(username="test", email="test@petroly.co")
+        self.course, self.lab = (
+            Course.objects.create(crn=crn, term="202410", department="ICS")
+            for crn in ("10001", "10002")
+        )
+        self.rc = RegisterCourse.objects.create(
+            tracking_list=TrackingList.objects.create(user=user), course=self.course
+        )
+
+    def test_sync(self) -> None:
+        self.assertFalse(RegisterPlan.objects.exists())
+
+        self.rc.strategy = RegisterCourse.RegisterStrategyEnum.LINKED_LAB
+        self.rc.with_add = self.lab
+        self.rc.save()
+        plan = RegisterPlan.objects.get(course=self.course)
+        self.assertEqual(plan.add_crns, ["10001", "10002"])
+        self.assertEqual(plan.drop_crns, [])
+
+        self.rc.strategy = RegisterCourse.RegisterStrategyEnum.REPLACE_WITH
+        self.rc.with_drop = self.lab
+        self.rc.save()
+        plan.refresh_from_db()
+        self.assertEqual(plan.add_crns, ["10001"])
+        self.assertEqual(plan.drop_crns, ["10002"])
+
+        self.rc.make_strategy_off()
+        self.assertFalse(RegisterPlan.objects.exists())
+
+
+class RegistrarTestCase(TestCase):
+    """
+    To test running the registration plans of the opened courses.
+    """
+
+    def setUp(self) -> None:
+        user = User.objects.create(username="test", email="test@petroly.co")
+        TelegramProfile.objects.create(id=1, user=user)
+        self.banner = Banner.objects.create(
+            user=user, cookies={"JSESSIONID": "test"}, active=True
+        )
+        tracking_list = TrackingList.objects.create(user=user)
+        self.courses = [
+            Course.objects.create(crn=crn, term="202410", department="ICS")
+            for crn in ("10001", "10002")
+        ]
+        for course in self.courses:
+            RegisterCourse.objects.create(
+                tracking_list=tracking_list,
+                course=course,
+                strategy=RegisterCourse.RegisterStrategyEnum.DEFAULT,
+            )
+        self.registrar = registrar.Registrar(workers=4)
+        self.addCleanup(self.registrar.close)
+
+    def test_submit_in_order(self) -> None:
+        running, executed = [], []
+
+        def execute(banner, plan, detected_on):
+            # one user's plans never overlap
+            self.assertFalse(running)
+            running.append(plan)
+            time.sleep(0.05)
+            executed.append((plan.course_id, detected_on))
+            running.pop()
+
+        detected_on = now()
+        changed = [(course, {"detected_on": detected_on}) for course in self.courses]
+        with mock.patch.object(Status, "is_up", return_value=True), mock.patch.object(
+            self.registrar, "execute", side_effect=execute
+        ):
+            # the second call runs on another thread, after the first one
+            self.assertEqual(self.registrar.submit(changed), 2)
+            self.assertEqual(self.registrar.submit(changed), 2)
+            self.registrar.close()
+
+        self.assertEqual(
+            executed, [(course.pk, detected_on) for course in self.courses] * 2
+        )
+
+    def test_submit_down(self) -> None:
+        with mock.patch.object(Status, "is_up", return_value=False):
+            self.assertEqual(self.registrar.submit([(self.courses[0], {})]), 0)
+
+    def test_submit_no_session(self) -> None:
+        Banner.objects.filter(pk=self.banner.pk).update(active=False)
+
+        with mock.patch.object(Status, "is_up", return_value=True), mock.patch.object(
+            registrar.bot_utils, "send_telegram_message"
+        ) as send:
+            self.assertEqual(self.registrar.submit([(self.courses[0], {})]), 0)
+            self.registrar.close()
+
+        send.assert_not_called()
+
+    def test_execute(self) -> None:
+        plan = RegisterPlan.objects.get(course=self.courses[0])
+        detected_on = now() - timedelta(seconds=2)
+        calls = mock.Mock()
+
+        with mock.patch.object(utils, "banner_api") as api, mock.patch.object(
+            registrar.bot_utils, "send_telegram_message"
+        ) as send:
+            calls.attach_mock(api.register, "register")
+            calls.attach_mock(send, "send")
+            api.register.return_value = "registered"
+            self.registrar.execute(self.banner, plan, detected_on)
+
+        # the user hears about it once Banner answered
+        self.assertEqual([call[0] for call in calls.mock_calls], ["register", "send"])
+        self.assertEqual(api.register.call_args.kwargs["add_crns"], ("10001",))
+        self.assertEqual(send.call_args.args[0], 1)
+
+        event = BannerEvent.objects.get(banner=self.banner)
+        self.assertEqual(event.crns, "10001")
+        self.assertEqual(event.detected_on, detected_on)
+        self.assertGreaterEqual(event.time_to_submit(), 2)
+
+    def test_execute_no_profile(self) -> None:
+        TelegramProfile.objects.all().delete()
+        banner = Banner.objects.select_related("user__telegram_profile").get()
+        plan = RegisterPlan.objects.get(course=self.courses[0])
+
+        with mock.patch.object(utils, "banner_api"), mock.patch.object(
+            registrar.bot_utils, "send_telegram_message"
+        ) as send:
+            self.registrar.execute(banner, plan, now())
+
+        send.assert_not_called()
+        self.assertTrue(BannerEvent.objects.filter(banner=banner).exists())
+
+
+class CheckSessionsTestCase(TestCase):
+    """
+    To test sweeping the Banner sessions.
+    """
+
+    def setUp(self) -> None:
+        self.alive, self.dead, self.expired = (
+            Banner.objects.create(
+                user=User.objects.create(username=name, email=f"{name}@petroly.co"),
+                cookies={"JSESSIONID": name},
+                active=True,
+            )
+            for name in ("alive", "dead", "expired")
+        )
+        # died in an earlier sweep, and wasn't saved since
+        Banner.objects.filter(pk=self.expired.pk).update(
+            active=False, checked_on=now() + timedelta(minutes=1)
+        )
+
+    def test_sweep(self) -> None:
+        with mock.patch.object(utils, "async_task") as enqueue:
+            self.assertEqual(utils.check_sessions(batch_size=1), 2)
+
+        # the expired session isn't checked again
+        batches = [call.args[1] for call in enqueue.call_args_list]
+        self.assertCountEqual(sum(batches, []), [self.alive.pk, self.dead.pk])
+
+        with mock.patch.object(utils, "banner_api") as api, mock.patch.object(
+            utils, "SESSIONS_JITTER", 0
+        ), mock.patch.object(utils.bot_utils, "mass_send_telegram_message") as send:
+            api.check_banner.side_effect = lambda banner: banner.pk == self.alive.pk
+            result = utils.check_sessions_batch(sum(batches, []))
+
+        self.assertEqual(result, {"alive": 1, "dead": 1})
+        self.assertEqual(api.check_banner.call_count, 2)
+        self.assertFalse(Banner.objects.get(pk=self.dead.pk).active)
+        self.assertTrue(Banner.objects.get(pk=self.alive.pk).active)
+        # no telegram profiles here
+        send.assert_not_called()
+
+    def test_check_session(self) -> None:
+        TelegramProfile.objects.create(id=1, user=self.dead.user)
+        with mock.patch.object(utils, "banner_api") as api, mock.patch.object(
+            utils.bot_utils, "send_telegram_message"
+        ) as send:
+            api.check_banner.return_value = False
+            utils.check_session(self.dead.user.pk)
+
+        send.assert_called_once()
+        # so the sweep doesn't check it, nor tell the user, again
+        banner = Banner.objects.get(pk=self.dead.pk)
+        self.assertFalse(banner.active)
+        self.assertGreaterEqual(banner.checked_on, banner.updated_on)
+        with mock.patch.object(utils, "async_task") as enqueue:
+            utils.check_sessions()
+        self.assertNotIn(self.dead.pk, enqueue.call_args.args[1])
+
+
+class InstructorsTestCase(TestCase):
+    """
+    To test matching the instructors' names from the API data.
+    """
+
+    def setUp(self) -> None:
+        instructors.invalidate()
+        self.ahmad = Instructor.objects.create(name="Ahmad Alharbi", department="ICS")
+        Instructor.objects.create(name="Ahmad Alghamdi", department="ICS")
+        Instructor.objects.create(name="Sara Alqahtani", department="MATH")
+        Evaluation.objects.create(
+            user=User.objects.create(username="test", email="test@petroly.co"),
+            instructor=self.ahmad,
+            grading=100,
+            teaching=80,
+            personality=60,
+        )
+
+    def test_match(self) -> None:
+        info = instructors.match("Dr. Ahmad Alharbi", "SWE")
+        self.assertEqual(info["rating"], self.ahmad.avg()["overall_float"])
+
+        # more than one instructor, or none
+        self.assertEqual(instructors.match("Ahmad", "ICS"), {})
+        self.assertEqual(instructors.match("Ahmad Alharbi", "MATH"), {})
+        # `STAT` is taught by `MATH`
+        self.assertNotEqual(instructors.match("sara alqahtani", "STAT"), {})
+
+    def test_enrich(self) -> None:
+        sections = [
+            {**make_section(crn, "ICS104"), "subject": "ICS"}
+            for crn in ("10001", "10002")
+        ]
+        for section in sections:
+            section["faculty"] = [{"displayName": "Ahmad Alharbi"}]
+
+        instructors.get_index()
+        with self.assertNumQueries(0):
+            instructors.enrich(sections)
+
+        self.assertEqual(
+            [section["faculty"][0].get("rating") for section in sections], [4.0, 4.0]
+        )
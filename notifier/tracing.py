@@ -0,0 +1,214 @@
+"""
+Tracing how long a seat change takes from Banner to the user.
+
+Each stage stamps the change on its way:
+    - `fetched_on`: `request_data` got the section from Banner.
+    - `stored_on`: its `CatalogChange` was stored.
+    - `detected_on`: `consume_changes` found a tracked course increased.
+    - `enqueued_on`: its `send_notification` task was created.
+    - `delivered_on`: the channel, Telegram or email, accepted it.
+
+`send_notification` records a `NotificationEvent` with all of them
+per change & channel. The events are buffered in the process and bulk
+written once `FLUSH_SIZE` are buffered, and by a background thread
+every `FLUSH_EVERY` seconds, so a quiet worker, which may be killed
+without running `atexit`, loses at most that many seconds of them.
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List
+
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, close_old_connections
+from django.utils.timezone import localtime, now, timedelta
+
+from .models import Course, NotificationEvent
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("fetched_on", "stored_on", "detected_on", "enqueued_on", "delivered_on")
+# the reported durations, (name, from stage, to stage)
+SPANS = (
+    ("fetch → store", "fetched_on", "stored_on"),
+    ("store → detect", "stored_on", "detected_on"),
+    ("detect → enqueue", "detected_on", "enqueued_on"),
+    ("enqueue → deliver", "enqueued_on", "delivered_on"),
+    ("total", "fetched_on", "delivered_on"),
+)
+
+FLUSH_SIZE = 500
+FLUSH_EVERY = 5.0
+
+_lock = threading.Lock()
+_buffer: List[NotificationEvent] = []
+# the pid of the process which started the flushing thread
+_flusher_pid: int | None = None
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile, `q` from 0 to 100"""
+
+    ordered = sorted(values)
+    rank = max(round(q / 100 * len(ordered) + 0.5) - 1, 0)
+
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def stamps(info: Dict) -> Dict[str, float]:
+    """The unix times of the stages set in `info`, e.g., by `consume_changes`"""
+
+    return {stage: info[stage].timestamp() for stage in STAGES if info.get(stage)}
+
+
+def _datetime(value: float | None) -> datetime | None:
+    return datetime.fromtimestamp(value, tz=timezone.utc) if value else None
+
+
+def record(
+    user_pk: int,
+    changes: Iterable[Dict],
+    channel: str,
+    success: bool,
+    enqueued_on: float | None = None,
+) -> None:
+    """Buffer a `NotificationEvent` of each change sent to `user_pk`
+    over `channel`, `changes` are `ChangeEntry`."""
+
+    delivered_on = now()
+    events = [
+        NotificationEvent(
+            to_id=user_pk,
+            course_id=change["pk"],
+            channel=channel,
+            success=success,
+            enqueued_on=_datetime(enqueued_on),
+            delivered_on=delivered_on,
+            **{
+                stage: _datetime(change.get("trace", {}).get(stage))
+                for stage in ("fetched_on", "stored_on", "detected_on")
+            },
+        )
+        for change in changes
+    ]
+
+    with _lock:
+        _buffer.extend(events)
+        due = len(_buffer) >= FLUSH_SIZE
+
+    _start_flusher()
+    if due:
+        flush()
+
+
+def _flush_forever() -> None:
+    while True:
+        time.sleep(FLUSH_EVERY)
+        try:
+            flush()
+        except Exception as exc:
+            logger.warning("Couldn't flush the notification events: %s", exc)
+        finally:
+            # the thread's own DB connection
+            close_old_connections()
+
+
+def _start_flusher() -> None:
+    """Start the flushing thread of this process, once,
+    a forked process (e.g., a qcluster worker) starts its own."""
+
+    global _flusher_pid
+
+    with _lock:
+        if _flusher_pid == os.getpid():
+            return
+        _flusher_pid = os.getpid()
+
+    threading.Thread(target=_flush_forever, name="tracing-flusher", daemon=True).start()
+
+
+def flush() -> int:
+    """Write the buffered events.
+
+    Returns:
+        int: the number of written events
+    """
+
+    with _lock:
+        events = list(_buffer)
+        _buffer.clear()
+
+    if not events:
+        return 0
+
+    try:
+        # a course or user deleted meanwhile would fail the whole batch
+        courses = set(
+            Course.objects.filter(
+                pk__in={event.course_id for event in events}
+            ).values_list("pk", flat=True)
+        )
+        users = set(
+            get_user_model()
+            .objects.filter(pk__in={event.to_id for event in events})
+            .values_list("pk", flat=True)
+        )
+        events = [
+            event
+            for event in events
+            if event.course_id in courses and event.to_id in users
+        ]
+        NotificationEvent.objects.bulk_create(events, batch_size=FLUSH_SIZE)
+    except DatabaseError as exc:
+        # tracing is best effort, even when flushing at exit
+        logger.warning("Couldn't write %d notification events: %s", len(events), exc)
+        return 0
+
+    return len(events)
+
+
+atexit.register(flush)
+
+
+def report(days: int = 7) -> List[Dict]:
+    """p50/p95/p99 seconds of each of `SPANS` per day & channel,
+    of the successful notifications of the last `days`."""
+
+    rows = NotificationEvent.objects.filter(
+        delivered_on__gte=now() - timedelta(days=days), success=True
+    ).values_list("channel", *STAGES)
+
+    durations = defaultdict(list)
+    for channel, *values in rows.iterator():
+        event = dict(zip(STAGES, values))
+        day = localtime(event["delivered_on"]).date()
+        for name, start, end in SPANS:
+            if event[start] and event[end]:
+                durations[(day, channel, name)].append(
+                    (event[end] - event[start]).total_seconds()
+                )
+
+    order = {name: i for i, (name, _, _) in enumerate(SPANS)}
+    result = [
+        {
+            "day": day,
+            "channel": channel,
+            "span": name,
+            "count": len(values),
+            "p50": round(percentile(values, 50), 3),
+            "p95": round(percentile(values, 95), 3),
+            "p99": round(percentile(values, 99), 3),
+        }
+        for (day, channel, name), values in durations.items()
+    ]
+    # the latest day first
+    result.sort(
+        key=lambda row: (-row["day"].toordinal(), row["channel"], order[row["span"]])
+    )
+
+    return result
@@ -3,13 +3,19 @@ This module is to define the fetching, filtering, and processing the data
 from the KFUPM API
 """
 
+import ast
 import html
 import json
 import logging
 import os
+import random
 import sys
+import time
 from collections import defaultdict
-from typing import Dict, List, Set, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple, TypedDict
 
 import requests as rq
 from cryptography.fernet import Fernet
@@ -17,16 +23,13 @@ from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ObjectDoesNotExist
 from django.core.mail import send_mail
-from django.db.models import Q
+from django.db import close_old_connections, transaction
+from django.db.models import F, Min, Q
 from django.template import loader
-from django.utils.timezone import now
+from django.utils.timezone import now, timedelta
 from django_q.tasks import async_task
 from telegram.constants import ParseMode
 
-from data import DepartmentEnum, SubjectEnum
-from evaluation.models import Instructor
-from evaluation.schema import crete_global_id
-from evaluation.types import InstructorNode
 from notifier.models import Cache
 from telegram_bot import messages
 from telegram_bot import utils as bot_utils
@@ -36,12 +39,13 @@ from .models import (
     Banner,
     BannerEvent,
     Cache,
+    CatalogChange,
     ChannelEnum,
     Course,
+    Cursor,
     RegisterCourse,
     Status,
     StatusEnum,
-    Term,
     TrackingList,
 )
 
@@ -65,10 +69,52 @@ assert (ENC_KEY := os.environ.get("ENC_KEY")), "You must provide `ENC_KEY` env v
 #
 #     banner_api = types.ModuleType("banner_api")
 #     exec(code, banner_api.__dict__)
-from . import banner_api
+from . import (
+    banner_api,
+    catalog,
+    instructors,
+    leases,
+    registry,
+    scheduler,
+    storage,
+    tracing,
+    wakeup,
+)
+
+
+def format_register_result(res) -> str:
+    """The message of what `banner_api.register` returned."""
+
+    if isinstance(res, list):
+        message = ""
+        for model in res:
+            if "submitResultIndicator" in model:
+                message += f"{model['subject']}{model['courseNumber']} - {model['courseReferenceNumber']}:"
+                for msg in model["messages"]:
+                    message += f"\n{msg['message']}"
+                message += "\n\n"
+
+            elif "message" in model:
+                message += (
+                    f"TERM: {model['term']} - CRN: {model['courseReferenceNumber']}:"
+                    f"{model['message']}"
+                )
+                message += "\n\n"
+
+        return message
+
+    if isinstance(res, str):
+        return res
+
+    return str(res)
 
 
 def register_for_user(user_pk, rc_pks: Set[int]):
+    """Run the plans of `rc_pks` one by one, through chained tasks.
+
+    `notifier.registrar` runs the plans now, this is kept
+    for the tasks that were queued before it.
+    """
 
     rc = RegisterCourse.objects.get(pk=rc_pks.pop())
 
@@ -88,13 +134,6 @@ def register_for_user(user_pk, rc_pks: Set[int]):
         )
         return
 
-    bot_utils.send_telegram_message(
-        banner.user.telegram_profile.id,
-        f"Executing Registration plan for `{rc.course.crn}`"
-        f" with strategy {rc.strategy.name}",
-        parse_mode=ParseMode.HTML,
-    )
-
     match rc.strategy:
         case RegisterCourse.RegisterStrategyEnum.LINKED_LAB:
             res = banner_api.register(
@@ -109,7 +148,7 @@ def register_for_user(user_pk, rc_pks: Set[int]):
                 banner,
                 term=rc.course.term,
                 add_crns=(rc.course.crn,),
-                drop_crns=(rc.with_drop.crn),
+                drop_crns=(rc.with_drop.crn,),
                 conditional=True,
             )
         case _:
@@ -122,28 +161,7 @@ def register_for_user(user_pk, rc_pks: Set[int]):
                 conditional=True,
             )
 
-    if isinstance(res, list):
-        message = ""
-        for model in res:
-            if "submitResultIndicator" in model:
-                message += f"{model['subject']}{model['courseNumber']} - {model['courseReferenceNumber']}:"
-                for msg in model["messages"]:
-                    message += f"\n{msg['message']}"
-                message += "\n\n"
-
-            elif "message" in model:
-                message += (
-                    f"TERM: {model['term']} - CRN: {model['courseReferenceNumber']}:"
-                    f"{model['message']}"
-                )
-                message += "\n\n"
-
-    elif isinstance(res, str):
-        message = res
-
-    else:
-        message = str(res)
-
+    message = format_register_result(res)
     if message is not None:
         bot_utils.send_telegram_message(
             banner.user.telegram_profile.id,
@@ -182,18 +200,14 @@ def check_session(user_pk):
     banner = Banner.objects.get(user__pk=user_pk)
 
     if banner.cookies:
-        if banner_api.check_banner(banner):
-            banner.active = True
-            banner.save()
+        alive = banner_api.check_banner(banner)
+        # `update` keeps `updated_on` before `checked_on`, otherwise
+        # `check_sessions` would check a dead session again
+        Banner.objects.filter(pk=banner.pk).update(active=alive, checked_on=now())
 
+        if alive:
             return True
 
-        banner.active = False
-        banner.save()
-
-        if banner.scheduler:
-            banner.scheduler.delete()
-
         bot_utils.send_telegram_message(
             banner.user.telegram_profile.id,
             "We lost your cookies, re-clone your Banner session",
@@ -201,24 +215,176 @@ def check_session(user_pk):
         )
 
 
-def fetch_data(term: str, department: str) -> List[Dict]:
-    """This load data from our DB."""
+# sessions checked at the same time, seconds to spread their start over,
+# and sessions per task, checked well within the cluster's timeout
+SESSIONS_CONCURRENCY = int(os.environ.get("SESSIONS_CONCURRENCY", 8))
+SESSIONS_JITTER = 2.0
+SESSIONS_BATCH = int(os.environ.get("SESSIONS_BATCH", 200))
+
+
+def check_sessions(batch_size: int = SESSIONS_BATCH) -> int:
+    """Enqueue a `check_sessions_batch` task for every `batch_size` of the
+    Banner sessions worth checking, the active ones and the ones saved
+    since their last check.
+
+    It's the only `check_sessions` schedule, every 10 minutes,
+    instead of one schedule per user.
+
+    Returns:
+        int: the number of enqueued tasks
+    """
+
+    pks = list(
+        Banner.objects.exclude(cookies=None)
+        .filter(
+            Q(active=True)
+            | Q(checked_on__isnull=True)
+            | Q(updated_on__gt=F("checked_on"))
+        )
+        .values_list("pk", flat=True)
+    )
+    # so the sessions checked together are different each time
+    random.shuffle(pks)
+
+    batches = [pks[i : i + batch_size] for i in range(0, len(pks), batch_size)]
+    for index, batch in enumerate(batches):
+        async_task(
+            "notifier.utils.check_sessions_batch",
+            batch,
+            task_name=f"check-sessions-{index}",
+            group="check_sessions",
+        )
+
+    logger.info("Enqueued %d Banner sessions in %d tasks", len(pks), len(batches))
+    return len(batches)
+
+
+def check_sessions_batch(
+    pks: List[int], concurrency: int = SESSIONS_CONCURRENCY
+) -> Dict[str, int]:
+    """Check the health of the Banner sessions of `pks`, `concurrency`
+    at a time, and save them all at once.
+
+    Returns:
+        dict: the number of sessions found alive and dead
+    """
+
+    # before checking, so a session saved meanwhile is checked next time
+    stamp = now()
+    banners = list(
+        Banner.objects.filter(pk__in=pks)
+        .exclude(cookies=None)
+        .select_related("user__telegram_profile")
+    )
+
+    def check(banner: Banner) -> bool:
+        time.sleep(random.uniform(0, SESSIONS_JITTER))
+        try:
+            return bool(banner_api.check_banner(banner))
+        except Exception as exc:
+            # can't tell, keep it as it is until the next sweep
+            logger.warning("Couldn't check the session of %s: %s", banner, exc)
+            return banner.active
+        finally:
+            close_old_connections()
+
+    with ThreadPoolExecutor(
+        max_workers=max(concurrency, 1), thread_name_prefix="sessions"
+    ) as executor:
+        results = list(executor.map(check, banners))
+
+    died = []
+    for banner, alive in zip(banners, results):
+        banner.active = alive
+        banner.checked_on = stamp
+        if not alive:
+            died.append(banner)
+
+    Banner.objects.bulk_update(banners, ["active", "checked_on"], batch_size=1000)
+
+    # the dead sessions are only checked again once they're saved again,
+    # so each user is told once
+    chat_ids = [
+        banner.user.telegram_profile.id
+        for banner in died
+        if hasattr(banner.user, "telegram_profile")
+    ]
+    if chat_ids:
+        bot_utils.mass_send_telegram_message(
+            chat_ids, "We lost your cookies, re\\-clone your Banner session"
+        )
+    logger.info("Checked %d Banner sessions, %d died", len(banners), len(died))
+
+    return {"alive": len(banners) - len(died), "dead": len(died)}
+
+
+def get_cache(term: str, department: str, with_data: bool = True) -> Cache:
+    """This load the `Cache` obj from our DB,
+    requesting it from the API if it doesn't exist yet."""
 
     # Sanitize the args
-    if not term or term not in Term.objects.values_list("long", flat=True):
+    if not term or term not in registry.term_values():
         raise ValueError(f"`{term}` is not a valid term.")
 
-    if not department or department not in SubjectEnum.values:
+    if not department or department not in registry.SUBJECTS:
         raise ValueError(f"`{department}` is not a valid department.")
 
+    queryset = Cache.objects.all()
+    if not with_data:
+        queryset = queryset.defer("data", "packed", "blob")
+
     try:
-        obj = Cache.objects.get(term=term, department=department)
+        obj = queryset.get(term=term, department=department)
 
     except Cache.DoesNotExist:
         request_data(term, department)
-        obj = Cache.objects.get(term=term, department=department)
+        obj = queryset.get(term=term, department=department)
+
+    return obj
+
+
+def fetch_data(term: str, department: str) -> List[Dict]:
+    """This load data from our DB."""
 
-    return obj.get_data()  # type: ignore
+    return get_cache(term, department).get_data()  # type: ignore
+
+
+def fetch_index(
+    term: str, department: str, full: bool = False
+) -> catalog.DepartmentIndex:
+    """Like `fetch_data` but returns the indexed sections
+    from the in-process catalog, decoding the data only
+    when it has been updated, see `catalog.index_for` for `full`."""
+
+    obj = get_cache(term, department, with_data=False)
+    obj.refresh()
+
+    return catalog.index_for(obj, full)
+
+
+def search_sections(term: str, query: str, department: str | None = None) -> List[Dict]:
+    """Copies of the sections matching `query` in the `department`,
+    or in all departments of `term`, see `catalog.search`."""
+
+    if department:
+        objs = [get_cache(term, department, with_data=False)]
+    else:
+        if not term or term not in registry.term_values():
+            raise ValueError(f"`{term}` is not a valid term.")
+        if not catalog.tokenize(query):
+            # not the whole term at once
+            return []
+
+        objs = list(
+            Cache.objects.defer("data", "packed", "blob")
+            .filter(term=term)
+            .order_by("department")
+        )
+
+    for obj in objs:
+        obj.refresh()
+
+    return catalog.search(objs, query)
 
 
 def request_data(term, department) -> None:
@@ -233,7 +399,10 @@ def request_data(term, department) -> None:
         dict: the response JSON after converting into dict object,
     """
     api_obj, _ = Status.objects.get_or_create(key="API")
-    obj, _ = Cache.objects.get_or_create(term=term, department=department)
+    # the data is only loaded when it has to be compared
+    obj, _ = Cache.objects.defer("data", "packed", "blob").get_or_create(
+        term=term, department=department
+    )
     if api_obj.status == StatusEnum.DOWN:
         obj.stale = False
         obj.save()
@@ -241,6 +410,7 @@ def request_data(term, department) -> None:
 
     try:
         data = banner_api.fetch(term, department)
+        fetched_on = now()
 
     except rq.Timeout:
         logger.warning(
@@ -299,10 +469,50 @@ def request_data(term, department) -> None:
         return
 
     if data:
-        obj.data = data
-        obj.stale = False
-        obj.updated_on = now()
-        obj.save()
+        digest = storage.digest(data)
+        if digest == obj.digest:
+            # the same data, only its freshness moves
+            scheduler.update_churn(obj, False)
+            obj.stale = False
+            obj.updated_on = now()
+            fields = ["stale", "updated_on", "churn"]
+            if (
+                storage.is_packed()
+                and Cache.objects.filter(pk=obj.pk, packed=None).exists()
+            ):
+                # stored before `CACHE_STORAGE=packed`, converted once
+                changed_on = obj.changed_on
+                obj.set_data(data, digest)
+                obj.changed_on = changed_on
+                fields += ["data", "packed", "blob"]
+            obj.save(update_fields=fields)
+            return
+
+        # on the first fill there is nothing to compare against
+        old = obj.sections()
+        changes = catalog.diff(old, data) if old else []
+        scheduler.update_churn(obj, bool(changes))
+
+        with transaction.atomic():
+            obj.set_data(data, digest)
+            obj.stale = False
+            obj.updated_on = now()
+            obj.save()
+
+            CatalogChange.objects.bulk_create(
+                CatalogChange(
+                    term=term,
+                    department=department,
+                    crn=crn,
+                    kind=kind,
+                    seats_available=seats,
+                    wait_available=waitlist,
+                    fetched_on=fetched_on,
+                )
+                for crn, kind, seats, waitlist in changes
+            )
+            if changes:
+                wakeup.signal(term, department)
 
     else:
         logger.info("No data returned")
@@ -319,12 +529,45 @@ def get_course_info(course: Course) -> dict:
         dict: that course's info
     """
 
-    data = fetch_data(course.term, course.department)
-    for api_course in data:
-        if api_course["courseReferenceNumber"] == course.crn:
-            return api_course
+    return fetch_index(course.term, course.department, full=True).get(course.crn)
+
+
+def get_courses_info(courses: Iterable[Course]) -> List[Dict]:
+    """Like `get_course_info` for many courses, the `Cache` rows of
+    all their (term, department) are loaded with one query,
+    and each one's sections are indexed once.
+
+    Args:
+        courses (Iterable[Course]): objs of `Course` model
+
+    Returns:
+        list: each course's info, in the same order,
+        an empty dict for a course that's not found.
+    """
+
+    courses = list(courses)
+    keys = {(course.term, course.department) for course in courses}
+    if not keys:
+        return []
 
-    return {}
+    objs = {
+        (obj.term, obj.department): obj
+        for obj in Cache.objects.defer("data", "packed", "blob").filter(
+            term__in={term for term, _ in keys},
+            department__in={department for _, department in keys},
+        )
+    }
+
+    indexes = {}
+    for key in keys:
+        # requested from the API if it doesn't exist yet
+        obj = objs.get(key) or get_cache(*key, with_data=False)
+        obj.refresh()
+        indexes[key] = catalog.index_for(obj, full=True)
+
+    return [
+        indexes[(course.term, course.department)].get(course.crn) for course in courses
+    ]
 
 
 def check_changes(course: Course) -> Tuple:
@@ -351,6 +594,42 @@ def check_changes(course: Course) -> Tuple:
             "It's deleted."
         )
 
+    increased, info = compare_course(course, course_info)
+
+    # update the course obj with new numbers
+    course.available_seats = info["available_seats"]
+    course.waiting_list_count = info["waiting_list_count"]
+
+    # this is important even if there is no change,
+    # to auto update the `last_updated` field to now.
+    course.save()
+
+    return (increased, info)
+
+
+@dataclass(slots=True)
+class TrackedCourse:
+    """A compact, read-only view of a tracked `Course`
+    with the pks of the users tracking it (aka, trackers)."""
+
+    pk: int
+    crn: str
+    term: str
+    department: str
+    available_seats: int
+    waiting_list_count: int
+    trackers: Set[int] = field(default_factory=set)
+
+
+def compare_course(course: Course, course_info: Dict) -> Tuple[bool, Dict]:
+    """Compare the last saved status of `course` against
+    its latest `course_info` from the API data.
+
+    Returns:
+        Tuple: first element is true if there is an increase,
+        the second element is a dict of the fields latest & old info.
+    """
+
     # renaming keys for back compatibility
     info = {
         "available_seats": course_info["seatsAvailable"],
@@ -366,52 +645,661 @@ def check_changes(course: Course) -> Tuple:
     # add the old numbers to returned info
     info["available_seats_old"] = course.available_seats
     info["waiting_list_count_old"] = course.waiting_list_count
+    # and what the notification shows of the section
+    info["subjectCourse"] = course_info.get("subjectCourse", "")
+    info["sequenceNumber"] = course_info.get("sequenceNumber", "")
 
-    # update the course obj with new numbers
-    course.available_seats = info["available_seats"]
-    course.waiting_list_count = info["waiting_list_count"]
+    return (increased, info)
 
-    # this is important even if there is no change,
-    # to auto update the `last_updated` field to now.
-    course.save()
 
-    return (increased, info)
+class ChangeEntry(TypedDict):
+    """One changed course in the `send_notification` payload,
+    everything the messages need without loading the `Course`."""
+
+    pk: int
+    crn: str
+    subjectCourse: str
+    sequenceNumber: str
+    available_seats: int
+    available_seats_old: int
+    waiting_list_count: int
+    waiting_list_count_old: int
+    # unix times of the stages it went through, see `notifier.tracing`
+    trace: Dict[str, float]
 
 
-def collect_tracked_courses() -> Dict[str, List[Course | set[User]]]:
+# bump it when `ChangeEntry` changes in a non-compatible way
+PAYLOAD_VERSION = 1
+
+
+def change_entry(course: Course | TrackedCourse, info: Dict) -> ChangeEntry:
+    """Make a `ChangeEntry` of what `compare_course` returned."""
+
+    return ChangeEntry(
+        pk=course.pk,
+        crn=course.crn,
+        subjectCourse=info["subjectCourse"],
+        sequenceNumber=info["sequenceNumber"],
+        available_seats=info["available_seats"],
+        available_seats_old=info["available_seats_old"],
+        waiting_list_count=info["waiting_list_count"],
+        waiting_list_count_old=info["waiting_list_count_old"],
+        trace=tracing.stamps(info),
+    )
+
+
+def dump_changes(entries: List[ChangeEntry], enqueued_on: float | None = None) -> str:
+    """Serialize the `send_notification` payload."""
+
+    return json.dumps(
+        {"version": PAYLOAD_VERSION, "enqueued_on": enqueued_on, "changes": entries},
+        separators=(",", ":"),
+    )
+
+
+def load_changes(payload: str) -> List[ChangeEntry]:
+    """Deserialize what `dump_changes` returns.
+
+    Payloads queued before it existed, a `str()` of
+    `[{'course_pk': .., 'status': {..}}]`, are still read.
+    """
+
+    if payload.startswith("{"):
+        data = json.loads(payload)
+        if data["version"] != PAYLOAD_VERSION:
+            raise ValueError(f"Unknown payload version: {data['version']}")
+
+        return data["changes"]
+
+    legacy = ast.literal_eval(payload)
+    courses = Course.objects.in_bulk([item["course_pk"] for item in legacy])
+    entries = []
+    for item in legacy:
+        course = courses.get(item["course_pk"])
+        if course is None:
+            continue
+
+        section = course.raw or {}
+        entries.append(
+            change_entry(
+                course,
+                {
+                    **item["status"],
+                    "subjectCourse": section.get("subjectCourse", ""),
+                    "sequenceNumber": section.get("sequenceNumber", ""),
+                },
+            )
+        )
+
+    return entries
+
+
+def load_enqueued_on(payload: str) -> float | None:
+    """The unix time `payload` was enqueued, if `dump_changes` was given it."""
+
+    if not payload.startswith("{"):
+        return None
+
+    return json.loads(payload).get("enqueued_on")
+
+
+def group_by_tracker(
+    changed_courses: Iterable[Tuple[TrackedCourse, Dict]],
+) -> Dict[int, List[ChangeEntry]]:
+    """Group the `ChangeEntry` of the changed courses by their trackers' pks."""
+
+    courses_by_tracker = defaultdict(list)
+    for course, info in changed_courses:
+        entry = change_entry(course, info)
+        for tracker_pk in course.trackers:
+            courses_by_tracker[tracker_pk].append(entry)
+
+    return courses_by_tracker
+
+
+def enqueue_notification(tracker_pk: int, entries: List[ChangeEntry]) -> None:
+    """Create the `send_notification` task of one tracker."""
+
+    async_task(
+        "notifier.utils.send_notification",
+        tracker_pk,
+        dump_changes(entries, time.time()),
+        task_name=f"sending-notification-{tracker_pk}",
+        group="change_notification",
+    )
+
+
+# the most courses of one department `check_changes_batch`
+# and `consume_changes` delete at once
+DELETE_AT_MOST = 5
+
+
+@dataclass
+class CourseUpdates:
+    """The writes of comparing many courses, see `compare_courses`."""
+
+    stamp: datetime = field(default_factory=now)
+    # the courses with new seats
+    changed: List[Course] = field(default_factory=list)
+    # the pks of all compared courses, and of the ones to delete
+    checked: List[int] = field(default_factory=list)
+    removed: List[int] = field(default_factory=list)
+
+    def save(self) -> None:
+        if self.changed:
+            Course.objects.bulk_update(
+                self.changed, ["available_seats", "waiting_list_count"]
+            )
+
+        # as `check_changes`, `last_updated` is when it was last checked
+        for i in range(0, len(self.checked), 1000):
+            Course.objects.filter(pk__in=self.checked[i : i + 1000]).update(
+                last_updated=self.stamp
+            )
+
+        if self.removed:
+            Course.objects.filter(pk__in=self.removed).delete()
+            logger.warning(
+                "Courses %s not found, they might have been removed from source, "
+                "They're deleted.",
+                self.removed,
+            )
+
+
+def compare_courses(
+    courses: Iterable[Course | TrackedCourse],
+) -> Tuple[
+    List[Tuple[Course | TrackedCourse, Dict]],
+    Dict[Tuple[str, str], float],
+    CourseUpdates,
+]:
+    """The comparing of `check_changes_batch`, without saving anything,
+    so the caller can save the `CourseUpdates` within its own transaction.
+
+    Returns:
+        Tuple: the same as `check_changes_batch`, then the `CourseUpdates`.
+    """
+
+    groups: Dict[Tuple[str, str], List[Course | TrackedCourse]] = defaultdict(list)
+    for course in courses:
+        groups[(course.term, course.department)].append(course)
+
+    increased_courses = []
+    timings = {}
+    updates = CourseUpdates()
+
+    for (term, department), group in groups.items():
+        t_start = time.perf_counter()
+        try:
+            index = fetch_index(term, department)
+        except ValueError as exc:
+            logger.warning("Skipping %s-%s: %s", term, department, exc)
+            continue
+
+        if not len(index):
+            # not fetched yet, or an empty response, it's not a removal
+            logger.warning("Skipping %s-%s: no cached sections", term, department)
+            continue
+
+        missing = []
+        for course in group:
+            course_info = index.get(course.crn)
+            if not course_info:
+                missing.append(course.pk)
+                continue
+
+            updates.checked.append(course.pk)
+            increased, info = compare_course(course, course_info)
+            if increased:
+                increased_courses.append((course, info))
+
+            if (
+                info["available_seats"] != course.available_seats
+                or info["waiting_list_count"] != course.waiting_list_count
+            ):
+                course.available_seats = info["available_seats"]
+                course.waiting_list_count = info["waiting_list_count"]
+                updates.changed.append(
+                    Course(
+                        pk=course.pk,
+                        available_seats=course.available_seats,
+                        waiting_list_count=course.waiting_list_count,
+                    )
+                )
+
+        if len(missing) > DELETE_AT_MOST:
+            # likely a truncated response, rather than removed sections
+            logger.warning(
+                "%d courses of %s-%s not found, not deleting them.",
+                len(missing),
+                term,
+                department,
+            )
+        else:
+            updates.removed.extend(missing)
+
+        timings[(term, department)] = time.perf_counter() - t_start
+
+    return (increased_courses, timings, updates)
+
+
+def check_changes_batch(
+    courses: Iterable[Course | TrackedCourse],
+) -> Tuple[List[Tuple[Course | TrackedCourse, Dict]], Dict[Tuple[str, str], float]]:
+    """Like `check_changes` but for many courses at once.
+
+    Courses are grouped by (term, department), so each department's
+    data is loaded once, then all the changed courses are written
+    with a single `bulk_update`. Courses no longer in the source are deleted,
+    unless more than `DELETE_AT_MOST` of a department are missing.
+
+    Args:
+        courses (Iterable[Course | TrackedCourse]): objs of `Course` model
+            or the ones from `collect_tracked_courses`
+
+    Returns:
+        Tuple: first element is a list of (course, info) that has an increase,
+        the second element is the checking duration of each (term, department).
+    """
+
+    increased_courses, timings, updates = compare_courses(courses)
+    updates.save()
+
+    return (increased_courses, timings)
+
+
+def collect_tracked_courses(
+    keys: Optional[Iterable[Tuple[str, str]]] = None,
+    partitions: Optional[Iterable[Tuple[str, str]]] = None,
+) -> Dict[Tuple[str, str], TrackedCourse]:
     """
     Collect all tracked courses and group with each course
-    its `User` objects (aka, trackers).
+    its users' pks (aka, trackers), in a single query.
+
+    Args:
+        keys (Iterable[Tuple[str, str]]): only collect these (crn, term)
+        partitions (Iterable[Tuple[str, str]]): only collect
+            the courses of these (term, department)
 
     Returns:
-        set: A set of all `Course` objects
+        dict: `TrackedCourse` objs keyed by (crn, term)
     """
-    courses_dict = {}
+    courses_dict: Dict[Tuple[str, str], TrackedCourse] = {}
+
+    queryset = RegisterCourse.objects.all()
+    if partitions is not None:
+        partitions = set(partitions)
+        if not partitions:
+            return courses_dict
+
+        queryset = queryset.filter(
+            course__term__in={term for term, _ in partitions},
+            course__department__in={department for _, department in partitions},
+        )
+
+    if keys is not None:
+        keys = set(keys)
+        if not keys:
+            return courses_dict
+
+        queryset = queryset.filter(
+            course__crn__in={crn for crn, _ in keys},
+            course__term__in={term for _, term in keys},
+        )
+
+    rows = queryset.values_list(
+        "course_id",
+        "course__crn",
+        "course__term",
+        "course__department",
+        "course__available_seats",
+        "course__waiting_list_count",
+        "tracking_list__user_id",
+    ).iterator(chunk_size=5000)
+
+    for pk, crn, term, department, seats, waitlist, user_pk in rows:
+        if keys is not None and (crn, term) not in keys:
+            continue
+        if partitions is not None and (term, department) not in partitions:
+            continue
 
-    for rc in RegisterCourse.objects.all():
         try:
-            courses_dict[rc.course.crn]["trackers"].add(rc.tracking_list.user)
+            courses_dict[(crn, term)].trackers.add(user_pk)
         except KeyError:
-            courses_dict[rc.course.crn] = {
-                "course": rc.course,
-                "trackers": {rc.tracking_list.user},
-            }
+            courses_dict[(crn, term)] = TrackedCourse(
+                pk, crn, term, department, seats, waitlist, {user_pk}
+            )
 
     return courses_dict
 
 
+def partition_cursors(
+    key: str, partitions: Iterable[Tuple[str, str]]
+) -> Dict[Tuple[str, str], Cursor]:
+    """The `Cursor` of each (term, department) for the consumer `key`.
+
+    A missing one starts where the slowest of the consumer's partitions is,
+    or where its single cursor was before partitioning, so the changes
+    logged meanwhile aren't skipped. Otherwise, for a new consumer,
+    at the end of the log, as the courses it's about to track are
+    already up to date.
+    """
+
+    names = {
+        f"{key}:{term}-{department}": (term, department)
+        for term, department in partitions
+    }
+    cursors = {
+        names[cursor.key]: cursor for cursor in Cursor.objects.filter(key__in=names)
+    }
+
+    missing = [name for name, partition in names.items() if partition not in cursors]
+    if missing:
+        # the partitions not consumed for long aren't tracked anymore
+        start = Cursor.objects.filter(
+            key__startswith=f"{key}:", updated_on__gte=now() - timedelta(hours=1)
+        ).aggregate(Min("position"))["position__min"]
+        if start is None:
+            start = (
+                Cursor.objects.filter(key=key)
+                .values_list("position", flat=True)
+                .first()
+            )
+        if start is None:
+            head = CatalogChange.objects.order_by("-pk").values_list("pk", flat=True)
+            start = head.first() or 0
+
+        Cursor.objects.bulk_create(
+            (Cursor(key=name, position=start) for name in missing),
+            ignore_conflicts=True,
+        )
+        for cursor in Cursor.objects.filter(key__in=missing):
+            cursors[names[cursor.key]] = cursor
+
+    return cursors
+
+
+# how long a `CatalogChange` may take to commit after it's created, the
+# refreshes commit out of pk order, so the cursors stay this far behind
+SETTLE_SECONDS = int(os.environ.get("CATALOG_SETTLE_SECONDS", 30))
+# the last pk read of each consumer in this process, to count a change once
+_read_up_to: Dict[str, int] = {}
+
+
+def consume_changes(
+    key: str = "notifier",
+    limit: int = 10_000,
+    partitions: Optional[Iterable[Tuple[str, str]]] = None,
+    owner: Optional[str] = None,
+) -> Tuple[List[Tuple[TrackedCourse, Dict]], int]:
+    """Read the `CatalogChange` log after the cursors of `key`, and compare
+    only the tracked courses having changes against their last saved status.
+
+    The courses new status and the cursors are saved together, so a change
+    is consumed once. Removed sections are deleted, like `check_changes` does,
+    unless more than `DELETE_AT_MOST` of a department are removed.
+
+    The cursors only move past the changes older than `SETTLE_SECONDS`,
+    so a change committed after one of a higher pk is still read.
+    The newer ones are read again by the next calls, they don't
+    notify twice, as the courses are already updated by then.
+
+    Args:
+        partitions: the (term, department) to consume, all tracked ones by default
+        owner: if given, nothing is saved unless it still holds
+            the leases of `partitions`, see `notifier.leases`
+
+    Returns:
+        Tuple: first element is a list of (course, info) that has an increase,
+        the second element is the number of changes not read before.
+    """
+
+    if partitions is None:
+        partitions = scheduler.demand().keys()
+    partitions = set(partitions)
+    if not partitions:
+        return ([], 0)
+
+    cursors = partition_cursors(key, partitions)
+    in_partitions = Q()
+    for term, department in partitions:
+        in_partitions |= Q(term=term, department=department)
+
+    rows = list(
+        CatalogChange.objects.filter(
+            in_partitions,
+            pk__gt=min(cursor.position for cursor in cursors.values()),
+        )
+        .order_by("pk")
+        .values_list(
+            "pk",
+            "crn",
+            "term",
+            "department",
+            "kind",
+            "seats_available",
+            "wait_available",
+            "fetched_on",
+            "created_on",
+        )[:limit]
+    )
+    if not rows:
+        return ([], 0)
+
+    # only the latest change of each section matters
+    latest = {}
+    count = 0
+    settled = 0
+    settled_on = now() - timedelta(seconds=SETTLE_SECONDS)
+    for pk, crn, term, department, kind, seats, waitlist, *stamps in rows:
+        if pk > cursors[(term, department)].position:
+            latest[(crn, term)] = (kind, seats, waitlist, *stamps)
+            count += pk > _read_up_to.get(key, 0)
+        if stamps[-1] < settled_on:
+            settled = pk
+
+    increased_courses = []
+    to_update = []
+    to_delete = defaultdict(list)
+    stamp = now()
+    indexes = {}
+
+    for key_, course in collect_tracked_courses(latest.keys()).items():
+        kind, seats, waitlist, fetched_on, stored_on = latest[key_]
+        if kind == CatalogChange.KindEnum.REMOVED:
+            to_delete[(course.term, course.department)].append(course.pk)
+            continue
+
+        section = {"seatsAvailable": seats, "waitAvailable": waitlist}
+        group = (course.term, course.department)
+        if group not in indexes:
+            obj = (
+                Cache.objects.defer("data", "packed", "blob")
+                .filter(term=course.term, department=course.department)
+                .first()
+            )
+            indexes[group] = catalog.index_for(obj) if obj else None
+        # for the names only, the seats are the logged ones
+        names = indexes[group].get(course.crn) if indexes[group] else {}
+        section["subjectCourse"] = names.get("subjectCourse", "")
+        section["sequenceNumber"] = names.get("sequenceNumber", "")
+
+        increased, info = compare_course(course, section)
+        if increased:
+            # to trace the notifying latency, see `notifier.tracing`
+            info["fetched_on"] = fetched_on
+            info["stored_on"] = stored_on
+            info["detected_on"] = stamp
+            increased_courses.append((course, info))
+
+        course.available_seats = seats
+        course.waiting_list_count = waitlist
+        to_update.append(
+            Course(
+                pk=course.pk,
+                available_seats=seats,
+                waiting_list_count=waitlist,
+                last_updated=stamp,
+            )
+        )
+
+    removed = []
+    for (term, department), pks in to_delete.items():
+        if len(pks) > DELETE_AT_MOST:
+            # likely a truncated response, rather than removed sections
+            logger.warning(
+                "%d courses of %s-%s were removed from source, not deleting them.",
+                len(pks),
+                term,
+                department,
+            )
+        else:
+            removed.extend(pks)
+
+    with transaction.atomic():
+        if owner:
+            leases.ensure_owned(owner, partitions)
+
+        Course.objects.bulk_update(
+            to_update, ["available_seats", "waiting_list_count", "last_updated"]
+        )
+        if removed:
+            Course.objects.filter(pk__in=removed).delete()
+            logger.warning(
+                "Courses %s were removed from source, They're deleted.", removed
+            )
+
+        # every partition has been read up to the last settled row
+        for cursor in cursors.values():
+            cursor.position = max(cursor.position, settled)
+            cursor.updated_on = stamp
+        Cursor.objects.bulk_update(cursors.values(), ["position", "updated_on"])
+
+    _read_up_to[key] = max(_read_up_to.get(key, 0), rows[-1][0])
+
+    return (increased_courses, count)
+
+
+def reconcile(
+    key: str = "notifier",
+    partitions: Optional[Iterable[Tuple[str, str]]] = None,
+    owner: Optional[str] = None,
+):
+    """Compare all tracked courses against the cached data, then move
+    the cursors of `key` to the end of the `CatalogChange` log,
+    since the cached data already includes those changes.
+
+    Args:
+        partitions & owner: the same as `consume_changes`
+
+    Returns:
+        Tuple: the same as `check_changes_batch`,
+        then the number of compared courses.
+    """
+
+    if partitions is None:
+        partitions = scheduler.demand().keys()
+    partitions = set(partitions)
+
+    # read the head before the data, changes after it will be consumed later,
+    # the same settled head as `consume_changes`
+    head = (
+        CatalogChange.objects.filter(
+            created_on__lt=now() - timedelta(seconds=SETTLE_SECONDS)
+        )
+        .order_by("-pk")
+        .values_list("pk", flat=True)
+        .first()
+    )
+    courses = collect_tracked_courses(partitions=partitions)
+
+    # reading the data may request it from the API, so not in the transaction
+    increased_courses, timings, updates = compare_courses(courses.values())
+
+    if owner:
+        # the comparing may have taken longer than a lease lasts
+        leases.renew(owner)
+
+    with transaction.atomic():
+        if owner:
+            leases.ensure_owned(owner, partitions)
+
+        updates.save()
+
+        cursors = partition_cursors(key, partitions)
+        for cursor in cursors.values():
+            cursor.position = head or 0
+            cursor.updated_on = now()
+        Cursor.objects.bulk_update(cursors.values(), ["position", "updated_on"])
+        # the single cursor before partitioning, not needed anymore
+        Cursor.objects.filter(key=key).delete()
+
+    return (increased_courses, timings, len(courses))
+
+
+def refresh_tracked(partitions: Optional[Iterable[Tuple[str, str]]] = None) -> None:
+    """Trigger a refresh of the cached data of all tracked departments,
+    or only `partitions`, as the `CatalogChange` log only grows
+    when they're refreshed."""
+
+    pairs = set(partitions if partitions is not None else scheduler.demand().keys())
+    queryset = Cache.objects.defer("data", "packed", "blob").filter(
+        term__in={term for term, _ in pairs},
+        department__in={department for _, department in pairs},
+    )
+    for obj in queryset:
+        if (obj.term, obj.department) in pairs:
+            obj.refresh()
+
+
+def prune_changes(days: int = 1) -> int:
+    """Delete the `CatalogChange` older than `days`,
+    which were consumed by all cursors."""
+
+    position = Cursor.objects.aggregate(Min("position"))["position__min"] or 0
+    deleted, _ = CatalogChange.objects.filter(
+        pk__lte=position, created_on__lt=now() - timedelta(days=days)
+    ).delete()
+
+    return deleted
+
+
 def send_notification(user_pk: int, info: str) -> None:
-    """Send a notification for every channel in `TrackingList.channels`"""
+    """Send a notification for every channel in `TrackingList.channels`
+
+    Args:
+        user_pk (int): the tracker's pk
+        info (str): made by `dump_changes`
+    """
 
     tracking_list = TrackingList.objects.get(user__pk=user_pk)
     user = tracking_list.user
     channels = tracking_list.channels
-    # deserialize the dict back
-    info_dict: List[Dict] = eval(info)
-
-    # inject `Course` objects and `course_api` into `info_dict`
-    for c_info in info_dict:
-        c_info["course"] = Course.objects.get(pk=c_info["course_pk"])
+    changes = load_changes(info)
+    enqueued_on = load_enqueued_on(info)
+
+    # the same shape the messages & email template have been using
+    info_dict: List[Dict] = [
+        {
+            "course": {
+                "pk": change["pk"],
+                "crn": change["crn"],
+                "raw": {
+                    "subjectCourse": change["subjectCourse"],
+                    "sequenceNumber": change["sequenceNumber"],
+                    "course_number": change["subjectCourse"],
+                    "section_number": change["sequenceNumber"],
+                },
+            },
+            "status": {
+                "available_seats": change["available_seats"],
+                "available_seats_old": change["available_seats_old"],
+                "waiting_list_count": change["waiting_list_count"],
+                "waiting_list_count_old": change["waiting_list_count_old"],
+            },
+        }
+        for change in changes
+    ]
 
     if ChannelEnum.TELEGRAM in channels:
         try:
@@ -419,6 +1307,9 @@ def send_notification(user_pk: int, info: str) -> None:
                 chat_id=user.telegram_profile.id,
                 msg=formatter_change_md(info_dict),
             )
+            tracing.record(
+                user.pk, changes, ChannelEnum.TELEGRAM, bool(success), enqueued_on
+            )
             if not success:
                 logger.info("Deleting TrackingList for user: %s - %s", user, success)
                 user.tracking_list.delete()
@@ -434,7 +1325,7 @@ def send_notification(user_pk: int, info: str) -> None:
             res = send_mail(
                 subject="Petroly Radar Detected Changes -  We couldn't send it by Telegram"
                 "Please check your Petroly settings",
-                message=info,
+                message=formatter_change_text(info_dict),
                 html_message=loader.render_to_string(
                     "notifier/email_changes.html",
                     context={
@@ -447,64 +1338,10 @@ def send_notification(user_pk: int, info: str) -> None:
                 from_email=None,
             )
             logger.info("Changes email was sent: %s", res)
+            tracing.record(user.pk, changes, ChannelEnum.EMAIL, bool(res), enqueued_on)
         except Exception as exc:
             logger.error("Couldn't send email: %s", exc)
 
-    # After sending notifications, let's try to register (if enabled)
-    # User mignt not have a Banner obj yet
-    try:
-        if not (user.banner.active and user.banner.scheduler):
-            return
-    except ObjectDoesNotExist:
-        return
-
-    # List of RegisterCourse pks, that is opened and has strategy to be registred
-    register_courses = (
-        RegisterCourse.objects.filter(tracking_list=tracking_list)
-        .exclude(strategy=RegisterCourse.RegisterStrategyEnum.OFF)
-        .filter(course__in=[i["course"] for i in info_dict])
-        .values_list("pk", flat=True)
-    )
-
-    if not register_courses:
-        return
-
-    try:
-        success = bot_utils.send_telegram_message(
-            chat_id=user.telegram_profile.id,
-            msg="We detected courses need to be registered\n"
-            "We will execute each Register Strategy one by one",
-        )
-        if not success:
-            logger.info("Deleting TrackingList for user: %s - %s", user, success)
-            user.tracking_list.delete()
-
-    except Exception as exc:
-        logger.error("Couldn't send to Telegram: %s - %s", user, exc)
-
-    # for c_info in info_dict:
-    #     if (
-    #         c_info["course"] in register_courses
-    #         and c_info["course"] in tracking_list.courses.all()
-    #     ):
-    #         # Prevent adding more than one section per course
-    #         for course in courses:
-    #             if course.raw["subjectCourse"] == c_info["course"].raw["subjectCourse"]:
-    #                 break
-    #         courses.append(c_info["course"])
-    # grouped_by_term = defaultdict(list)
-    # for c in courses:
-    #     grouped_by_term[c.term].append(c.crn)
-
-    if Status.is_up("register"):
-        async_task(
-            "notifier.utils.register_for_user",
-            user_pk,
-            set(register_courses),
-            task_name=f"register-{user_pk}",
-            group="register_course",
-        )
-
 
 def formatter_md(courses: List[Course]) -> str:
     """helper method to create a formatted message for each course in the tracking list"""
@@ -525,16 +1362,16 @@ def formatter_md(courses: List[Course]) -> str:
     return result.replace("-", "\\-")
 
 
-def formatter_change_md(info: List[Dict[str, Course | Dict]]) -> str:
+def formatter_change_md(info: List[Dict[str, Dict]]) -> str:
     """helper method to create a formatted message for each course in the tracking list"""
     # for each course we will create a message format
 
     result = "Changes detected 🥳\nClick on the CRN number to copy it\n\n"
     for course in info:
         result += messages.CHANGES_DETECTED.format(
-            crn=course["course"].crn,
-            course_number=course["course"].raw["subjectCourse"],
-            section_number=course["course"].raw["sequenceNumber"],
+            crn=course["course"]["crn"],
+            course_number=course["course"]["raw"]["subjectCourse"],
+            section_number=course["course"]["raw"]["sequenceNumber"],
             available_seats=course["status"]["available_seats"],
             available_seats_old=course["status"]["available_seats_old"],
             waiting_list_count=course["status"]["waiting_list_count"],
@@ -544,9 +1381,27 @@ def formatter_change_md(info: List[Dict[str, Course | Dict]]) -> str:
     return result.replace("-", "\\-")
 
 
+def formatter_change_text(info: List[Dict[str, Dict]]) -> str:
+    """The plain text version of `formatter_change_md`, for the email"""
+
+    result = "Changes detected\n\n"
+    for course in info:
+        result += messages.CHANGES_DETECTED_TEXT.format(
+            crn=course["course"]["crn"],
+            course_number=course["course"]["raw"]["subjectCourse"],
+            section_number=course["course"]["raw"]["sequenceNumber"],
+            available_seats=course["status"]["available_seats"],
+            available_seats_old=course["status"]["available_seats_old"],
+            waiting_list_count=course["status"]["waiting_list_count"],
+            waiting_list_count_old=course["status"]["waiting_list_count_old"],
+        )
+
+    return result
+
+
 def instructor_info_from_name(name: str, department: str) -> Dict:
     """Find a matching instructor
-    in our `Instructor` model.
+    in our `Instructor` model, see `notifier.instructors`.
 
     Args:
         name (str): the name as from API
@@ -556,51 +1411,7 @@ def instructor_info_from_name(name: str, department: str) -> Dict:
         Dict: Some info
     """
 
-    names = name.split(" ")
-    match department:
-        case SubjectEnum.ACCT | SubjectEnum.MKT | SubjectEnum.BUS | SubjectEnum.ECON:
-            department = DepartmentEnum.ACFN
-
-        case SubjectEnum.MIS | SubjectEnum.OM:
-            department = DepartmentEnum.ISOM
-
-        case SubjectEnum.ENGL | SubjectEnum.CGS:
-            department = DepartmentEnum.ELD
-
-        case SubjectEnum.SWE:
-            department = DepartmentEnum.ICS
-
-        case SubjectEnum.STAT:
-            department = DepartmentEnum.MATH
-
-        case SubjectEnum.ISE:
-            department = DepartmentEnum.SE
-
-        case SubjectEnum.ISE:
-            department = DepartmentEnum.SE
-
-        case SubjectEnum.GEOL:
-            department = DepartmentEnum.ERTH
-
-        case SubjectEnum.GEOP:
-            department = DepartmentEnum.CPG
-
-    filters = Q(department=department)
-
-    for name_ in names:
-        if "dr" not in name_.lower() and "mr" not in name_.lower():
-            # ignore `dr` and `mr` from using in filtering
-            filters &= Q(name__icontains=name_)
-
-    queryset = Instructor.objects.filter(filters)
-    if len(queryset) == 1:
-        return {
-            "pk": crete_global_id(InstructorNode, queryset[0].pk),
-            "profilePic": queryset[0].profile_pic.url,
-            "rating": queryset[0].avg()["overall_float"],
-        }
-
-    return {}
+    return instructors.match(name, department)
 
 
 def not_stale_all_cache():
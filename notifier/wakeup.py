@@ -0,0 +1,159 @@
+"""
+Waking the notifier up as soon as new data is stored,
+instead of only every fixed number of seconds.
+
+`signal` is called by `request_data` once a refresh stored changed data,
+and `Waiter.wait` blocks the notifier until a signal or the timeout:
+    - on Postgres, with `LISTEN/NOTIFY` on `CHANNEL`,
+        it works across processes and machines.
+    - otherwise (SQLite, dev), with a UDP datagram to a multicast
+        `GROUP` on `NOTIFIER_WAKEUP_PORT`, kept within this host,
+        so every notifier on it receives a copy.
+"""
+
+import logging
+import os
+import select
+import socket
+import time
+
+from django.db import connection, connections, transaction
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "notifier_refresh"
+# a site-local multicast group, the datagrams never leave the host
+GROUP = "239.255.80.1"
+LOOPBACK = socket.inet_aton("127.0.0.1")
+
+
+def _port() -> int:
+    return int(os.environ.get("NOTIFIER_WAKEUP_PORT", 50515))
+
+
+def _is_postgres() -> bool:
+    return connection.vendor == "postgresql"
+
+
+def signal(term: str, department: str) -> None:
+    """Wake up the notifiers, once the current transaction commits."""
+
+    payload = f"{term}-{department}"
+
+    def send():
+        try:
+            if _is_postgres():
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT pg_notify(%s, %s)", [CHANNEL, payload])
+            else:
+                with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+                    sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, LOOPBACK)
+                    sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 0)
+                    sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 1)
+                    sock.sendto(payload.encode(), (GROUP, _port()))
+
+        except Exception as exc:
+            # the notifier still wakes up on its timer
+            logger.warning("Couldn't signal the notifier: %s", exc)
+
+    transaction.on_commit(send)
+
+
+class Waiter:
+    """Blocks until a `signal` or a timeout, see `wait`.
+
+    `port` is where the signals are received without Postgres,
+    `NOTIFIER_WAKEUP_PORT` by default, 0 for any free port, see `self.port`.
+    """
+
+    def __init__(self, port: int | None = None) -> None:
+        self.sock = None
+        self.listener = None
+        self.port = None
+
+        try:
+            if _is_postgres():
+                # a connection of its own, which only listens
+                self.listener = connections.create_connection("default")
+                self.listener.ensure_connection()
+                self.listener.connection.autocommit = True
+                with self.listener.connection.cursor() as cursor:
+                    cursor.execute(f"LISTEN {CHANNEL}")
+            else:
+                self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                # all the notifiers of this host listen on the same port
+                self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                self.sock.bind(("", _port() if port is None else port))
+                self.sock.setsockopt(
+                    socket.IPPROTO_IP,
+                    socket.IP_ADD_MEMBERSHIP,
+                    socket.inet_aton(GROUP) + LOOPBACK,
+                )
+                self.sock.setblocking(False)
+                self.port = self.sock.getsockname()[1]
+
+        except Exception as exc:
+            logger.warning("Waking up on signals is disabled: %s", exc)
+            self.close()
+
+    def _fileno(self):
+        if self.listener is not None:
+            return self.listener.connection
+        return self.sock
+
+    def _drain(self) -> int:
+        """Consume all pending signals, returns how many."""
+
+        if self.listener is not None:
+            raw = self.listener.connection
+            raw.poll()
+            count = len(raw.notifies)
+            raw.notifies.clear()
+            return count
+
+        count = 0
+        while True:
+            try:
+                self.sock.recv(1024)
+                count += 1
+            except BlockingIOError:
+                return count
+
+    def clear(self) -> None:
+        """Forget the pending signals, e.g., right before consuming the changes."""
+
+        if self._fileno() is not None:
+            self._drain()
+
+    def wait(self, timeout: float) -> bool:
+        """Block for up to `timeout` seconds.
+
+        Returns:
+            bool: True if it's woken up by a signal
+        """
+
+        source = self._fileno()
+        if source is None:
+            time.sleep(timeout)
+            return False
+
+        # signals which arrived during the last cycle count right away
+        if self._drain():
+            return True
+
+        deadline = time.monotonic() + timeout
+        while (left := deadline - time.monotonic()) > 0:
+            ready, _, _ = select.select([source], [], [], left)
+            # readable without a signal, e.g., other messages of the connection
+            if ready and self._drain():
+                return True
+
+        return False
+
+    def close(self) -> None:
+        if self.listener is not None:
+            self.listener.close()
+            self.listener = None
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
@@ -37,6 +37,11 @@ CHANGES_DETECTED = """**{course_number}-{section_number}**  - `{crn}`
 Available Seats: {available_seats_old} ➡️  {available_seats}
 Waiting list: {waiting_list_count_old} ➡️  {waiting_list_count}\n\n"""
 
+# Text
+CHANGES_DETECTED_TEXT = """{course_number}-{section_number} - CRN {crn}
+Available Seats: {available_seats_old} -> {available_seats}
+Waiting list: {waiting_list_count_old} -> {waiting_list_count}\n\n"""
+
 # MD
 TRACKED_COURSES = """**{course_number}-{section_number}**  - `{crn}`
 Available Seats: {available_seats}
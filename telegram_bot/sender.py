@@ -0,0 +1,275 @@
+"""
+One long-lived Telegram sender per process.
+
+It owns one `telegram.Bot` with one pool of HTTPS connections, and
+runs it on a background event loop, so the sync callers (qcluster
+tasks, the notifier, the admin) reuse the same client instead of
+building an `Application` for each message.
+
+`Sender.send` waits for its one message, so a caller sending
+several messages one by one sends them one after the other; messages
+sent from several threads, or given at once to `Sender.send_many`,
+are sent concurrently. Either way they're spaced to stay within
+Telegram's limits: `TELEGRAM_RATE` messages per second overall (30 by
+default) and one message per second to the same chat. A `RetryAfter`
+pauses all sending for the requested time then retries the message.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Tuple
+
+from django.conf import settings
+from telegram import Bot, error
+from telegram.constants import ParseMode
+from telegram.request import HTTPXRequest
+
+logger = logging.getLogger(__name__)
+
+# seconds between two messages to the same chat
+PER_CHAT = 1.0
+# attempts of one message when Telegram keeps answering `RetryAfter`
+MAX_ATTEMPTS = 3
+# log the throughput every this number of messages
+REPORT_EVERY = 100
+
+
+class RateLimiter:
+    """
+    Hands out send times, spaced by `1 / rate` overall and by
+    `per_chat` for the same chat. It's only used from the sender's
+    loop, so reserving a slot needs no lock.
+    """
+
+    def __init__(self, rate: float, per_chat: float = PER_CHAT) -> None:
+        self.interval = 1 / rate
+        self.per_chat = per_chat
+        self.next_slot = 0.0
+        self.paused_until = 0.0
+        self.chats: Dict[int, float] = {}
+
+    def reserve_chat(self, chat_id: int, now: float) -> float:
+        """Reserve the next allowed time to send to `chat_id`,
+        returns how long to wait for it."""
+
+        if len(self.chats) > 10_000:
+            self.chats = {k: v for k, v in self.chats.items() if v > now}
+
+        slot = max(now, self.paused_until, self.chats.get(chat_id, 0))
+        self.chats[chat_id] = slot + self.per_chat
+
+        return slot - now
+
+    def reserve(self, now: float) -> float:
+        """Reserve the next allowed time to send to any chat,
+        returns how long to wait for it."""
+
+        slot = max(now, self.next_slot, self.paused_until)
+        self.next_slot = slot + self.interval
+
+        return slot - now
+
+    def pause(self, seconds: float, now: float) -> None:
+        """Stop all sending for `seconds`, as asked by `RetryAfter`."""
+
+        self.paused_until = max(self.paused_until, now + seconds)
+
+    async def wait(self, chat_id: int) -> None:
+        loop = asyncio.get_running_loop()
+
+        delay = self.reserve_chat(chat_id, loop.time())
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        # the global slot is taken only once the chat is free,
+        # so a busy chat doesn't hold the messages of others
+        delay = self.reserve(loop.time())
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+@dataclass
+class Stats:
+    """Counters of a sender since it started."""
+
+    started: float = field(default_factory=time.monotonic)
+    sent: int = 0
+    blocked: int = 0
+    failed: int = 0
+    retried: int = 0
+
+    def throughput(self) -> float:
+        """Sent messages per second"""
+
+        return self.sent / max(time.monotonic() - self.started, 1e-9)
+
+
+def _seconds(retry_after) -> float:
+    # `RetryAfter.retry_after` is becoming a `timedelta`
+    if hasattr(retry_after, "total_seconds"):
+        return retry_after.total_seconds()
+
+    return float(retry_after)
+
+
+class Sender:
+    """A `Bot` running on its own event loop thread."""
+
+    def __init__(self, token: str, rate: float, pool_size: int) -> None:
+        self.pid = os.getpid()
+        self.limiter = RateLimiter(rate)
+        self.stats = Stats()
+        self.semaphore: asyncio.Semaphore | None = None
+        self.pool_size = pool_size
+
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(
+            target=self.loop.run_forever, name="telegram-sender", daemon=True
+        )
+        self.thread.start()
+
+        self.bot = Bot(
+            token,
+            request=HTTPXRequest(connection_pool_size=pool_size),
+        )
+        # initialized by the first message, on the loop, see `_started`
+        self.starting: asyncio.Future | None = None
+
+    async def _start(self) -> None:
+        # it must be created within the loop it's used in
+        self.semaphore = asyncio.Semaphore(self.pool_size)
+        await self.bot.initialize()
+
+    async def _started(self) -> None:
+        """Initialize the bot once, the concurrent messages wait for it,
+        and the next message retries if it failed."""
+
+        if self.starting is None:
+            self.starting = asyncio.ensure_future(self._start())
+
+        try:
+            await asyncio.shield(self.starting)
+        except Exception:
+            self.starting = None
+            raise
+
+    def run(self, coro):
+        """Run `coro` on the sender's loop, and wait for its result."""
+
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    async def _send(self, chat_id: int, text: str, **kwargs) -> bool:
+        await self._started()
+
+        async with self.semaphore:
+            for attempt in range(1, MAX_ATTEMPTS + 1):
+                await self.limiter.wait(chat_id)
+                try:
+                    await self.bot.send_message(chat_id=chat_id, text=text, **kwargs)
+                    break
+
+                except error.RetryAfter as exc:
+                    if attempt == MAX_ATTEMPTS:
+                        self.stats.failed += 1
+                        raise
+
+                    self.stats.retried += 1
+                    logger.warning("Telegram asked to wait %s seconds", exc.retry_after)
+                    self.limiter.pause(
+                        _seconds(exc.retry_after), asyncio.get_running_loop().time()
+                    )
+
+                except error.Forbidden as exc:
+                    self.stats.blocked += 1
+                    logger.error("The user %s might have blocked us - %s", chat_id, exc)
+                    return False
+
+                except Exception:
+                    self.stats.failed += 1
+                    raise
+
+        self.stats.sent += 1
+        if self.stats.sent % REPORT_EVERY == 0:
+            self.report()
+
+        return True
+
+    def send(
+        self, chat_id: int, text: str, parse_mode=ParseMode.MARKDOWN_V2, **kwargs
+    ) -> bool:
+        """Send one message and wait for it.
+
+        returs True if no `error.Forbidden` was raised
+        """
+
+        return self.run(self._send(chat_id, text, parse_mode=parse_mode, **kwargs))
+
+    def send_many(
+        self, messages: Iterable[Tuple[int, str]], parse_mode=ParseMode.MARKDOWN_V2
+    ) -> List[bool | BaseException]:
+        """Send many (chat_id, text) messages concurrently.
+
+        Returns the result of each message in the same order,
+        or the exception it raised.
+        """
+
+        async def gather():
+            return await asyncio.gather(
+                *(
+                    self._send(chat_id, text, parse_mode=parse_mode)
+                    for chat_id, text in messages
+                ),
+                return_exceptions=True,
+            )
+
+        t_start = time.perf_counter()
+        results = self.run(gather())
+        elapsed = time.perf_counter() - t_start
+        logger.info(
+            "Sent %d messages within %0.2f, %0.1f/s",
+            len(results),
+            elapsed,
+            len(results) / max(elapsed, 1e-9),
+        )
+
+        return results
+
+    def report(self) -> None:
+        logger.info(
+            "Telegram sender: %d sent, %d blocked, %d failed, %d retried, %0.2f/s",
+            self.stats.sent,
+            self.stats.blocked,
+            self.stats.failed,
+            self.stats.retried,
+            self.stats.throughput(),
+        )
+
+
+_sender: Sender | None = None
+_lock = threading.Lock()
+
+
+def get_sender() -> Sender:
+    """The sender of this process, created on the first use.
+
+    A forked process (e.g., a qcluster worker) gets its own,
+    since the loop thread doesn't survive the fork. Its bot is
+    initialized by its first message, not under the lock, so a slow
+    Telegram doesn't block the other threads here.
+    """
+
+    global _sender
+
+    with _lock:
+        if _sender is None or _sender.pid != os.getpid():
+            _sender = Sender(
+                settings.TELEGRAM_TOKEN,
+                rate=float(os.environ.get("TELEGRAM_RATE", 30)),
+                pool_size=int(os.environ.get("TELEGRAM_POOL_SIZE", 16)),
+            )
+
+        return _sender
@@ -1,3 +1,64 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.test import SimpleTestCase
+from telegram import error
+
+from .sender import RateLimiter, Sender
+
+
+class RateLimiterTestCase(SimpleTestCase):
+    """
+    To test spacing the messages within Telegram's limits.
+    """
+
+    def test_global_rate(self) -> None:
+        limiter = RateLimiter(rate=10)
+        delays = [limiter.reserve(now=0) for _ in range(3)]
+
+        self.assertEqual(delays, [0, 0.1, 0.2])
+        self.assertEqual(limiter.reserve(now=5), 0)
+
+    def test_per_chat(self) -> None:
+        limiter = RateLimiter(rate=10, per_chat=1)
+
+        self.assertEqual(limiter.reserve_chat(1, now=0), 0)
+        self.assertEqual(limiter.reserve_chat(1, now=0), 1)
+        self.assertEqual(limiter.reserve_chat(2, now=0), 0)
+        self.assertEqual(limiter.reserve_chat(1, now=1.5), 0.5)
+
+    def test_pause(self) -> None:
+        limiter = RateLimiter(rate=10)
+        limiter.pause(3, now=0)
+
+        self.assertEqual(limiter.reserve_chat(1, now=1), 2)
+        self.assertEqual(limiter.reserve(now=1), 2)
+
+
+class SenderTestCase(SimpleTestCase):
+    """
+    To test the shared sender's bot initialization.
+    """
+
+    def setUp(self) -> None:
+        self.sender = Sender("123:abc", rate=1000, pool_size=2)
+        self.sender.bot = mock.AsyncMock()
+
+    def tearDown(self) -> None:
+        self.sender.loop.call_soon_threadsafe(self.sender.loop.stop)
+
+    def test_lazy_start(self) -> None:
+        self.sender.bot.initialize.assert_not_awaited()
+
+        self.assertTrue(self.sender.send(1, "hi"))
+        self.assertTrue(self.sender.send(2, "hi"))
+        self.sender.bot.initialize.assert_awaited_once()
+
+    def test_start_retried(self) -> None:
+        self.sender.bot.initialize.side_effect = [error.NetworkError("down"), None]
+
+        with self.assertRaises(error.NetworkError):
+            self.sender.send(1, "hi")
+        self.assertTrue(self.sender.send(1, "hi"))
+
+        self.assertEqual(self.sender.bot.initialize.await_count, 2)
+        self.sender.bot.send_message.assert_awaited_once()
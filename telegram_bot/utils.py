@@ -9,23 +9,21 @@ import re
 import logging
 from io import BytesIO
 from typing import Awaitable, Dict, List, Tuple, overload
-from asgiref.sync import sync_to_async, async_to_sync
+from asgiref.sync import sync_to_async
 
-from telegram import error
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
-from telegram.ext import Application
 from telegram.constants import ParseMode
-from django.conf import settings
 from django.contrib.auth import get_user_model
 from PIL import Image, ImageFont, ImageDraw
 import requests
 
+from notifier import registry
 from notifier import utils as notifier_utils
-from notifier.models import Course, Term, TrackingList
-from data import SubjectEnum
+from notifier.models import Course, TrackingList
 from telegram_bot import messages
 
 from .models import TelegramProfile, Token
+from .sender import get_sender
 
 
 User = get_user_model()
@@ -79,12 +77,11 @@ def format_courses(courses: List[Course]):
     return msg
 
 
-@async_to_sync
-async def send_telegram_message(
+def send_telegram_message(
     chat_id: int, msg: str, parse_mode=ParseMode.MARKDOWN_V2
 ) -> bool:
     """Useful to send one-time message.
-    To make this method as sync
+    It's sent through this process's shared `sender.Sender`
 
     Args:
         chat_id (int): like user's id
@@ -92,63 +89,50 @@ async def send_telegram_message(
 
     returs True if no `error.Forbidden` was raised
     """
-    async with Application.builder().token(settings.TELEGRAM_TOKEN).build() as app:
-        try:
-            await app.bot.send_message(chat_id=chat_id, text=msg, parse_mode=parse_mode)
-            return True
-
-        except error.Forbidden as exc:
-            logger.error("The user %s might have blocked us - %s", chat_id, exc)
-            return False
+    return get_sender().send(chat_id, msg, parse_mode=parse_mode)
 
 
 def mass_send_telegram_message(chat_ids: List[int], message: str) -> None:
-    """send many message to many users
+    """send many message to many users, concurrently
+    within Telegram's limits
 
     Args:
         chat_ids (List[int]): list of users to send them
         message (str): the message to send
     """
 
-    for chat_id in chat_ids:
-        try:
-            send_telegram_message(chat_id, message)
-
-        except Exception as exc:
-            logger.error("Couldn't send to Telegram: %s - %s", chat_id, exc)
+    chat_ids = list(chat_ids)
+    results = get_sender().send_many((chat_id, message) for chat_id in chat_ids)
+    for chat_id, result in zip(chat_ids, results):
+        if isinstance(result, BaseException):
+            logger.error("Couldn't send to Telegram: %s - %s", chat_id, result)
 
 
-@async_to_sync
-async def send_telegram_changes(chat_id: int, msg: str):
+def send_telegram_changes(chat_id: int, msg: str) -> bool:
     """Sending the changes notification.
-    To make this method as sync
+    It's sent through this process's shared `sender.Sender`
 
     Args:
         chat_id (int): like user's id
         msg (str): a MD text message
-    """
-    async with Application.builder().token(settings.TELEGRAM_TOKEN).build() as app:
-        try:
-            await app.bot.send_message(
-                chat_id=chat_id,
-                text=msg,
-                parse_mode=ParseMode.MARKDOWN_V2,
-                reply_markup=InlineKeyboardMarkup(
-                    [
-                        [
-                            InlineKeyboardButton(
-                                text="Go to Banner Now",
-                                url="https://banner9-registration.kfupm.edu.sa/StudentRegistrationSsb/ssb/term/termSelection?mode=registration",
-                            )
-                        ]
-                    ]
-                ),
-            )
-            return True
 
-        except error.Forbidden as exc:
-            logger.error("The user %s might have blocked us - %s", chat_id, exc)
-            return False
+    returs True if no `error.Forbidden` was raised
+    """
+    return get_sender().send(
+        chat_id,
+        msg,
+        parse_mode=ParseMode.MARKDOWN_V2,
+        reply_markup=InlineKeyboardMarkup(
+            [
+                [
+                    InlineKeyboardButton(
+                        text="Go to Banner Now",
+                        url="https://banner9-registration.kfupm.edu.sa/StudentRegistrationSsb/ssb/term/termSelection?mode=registration",
+                    )
+                ]
+            ]
+        ),
+    )
 
 
 @sync_to_async
@@ -198,15 +182,13 @@ async def get_terms(user_id: int) -> List[Tuple[str, str]]:
 @sync_to_async
 def fetch_terms() -> List[Tuple[str, str]]:
     """a function to format term objects into accpetable format for InlineKEyboardButton callback data"""
-    return [(term.short, term.long) for term in Term.objects.filter(allowed=True)]
+    return registry.allowed_terms()
 
 
 @sync_to_async
 def get_departments() -> List[str]:
     """a function to retrieve all stored departments"""
-    result = SubjectEnum.values
-    result.pop(0)
-    return result
+    return list(registry.SUBJECT_LIST[1:])
 
 
 @sync_to_async